@@ -1,66 +1,83 @@
-import sys
+import re
 
 from typing import Optional, Never
 
-from .descriptors import (
-    UserWantsToDelete,
-    UserWantsToGoBackToMainMenu,
-    UserWantsToLoad,
-    UserWantsToListSavedGames,
-    UserSetMaxRounds,
-    UserWantsToDisplayGameRules
-)
+from .descriptors import SessionFlag
+from .enums import GameEvent, UserIntent
+from .regex_patterns import SAVE_POINT
+from .session_state import SessionState
+from ..model.metrics import INVALID_INPUTS_TOTAL, metrics
 from ..model.model import game_cache, dbms, Cache, DBMS
-from ..model.custom_dtypes import SavedGames
 from ..view.view import message_renderer, panel_renderer, Message, Panel
 
 
-def quit_game() -> Never:
-    """Print game stats,
-    close the DB connection and quit the game.
+class QuitGame(SystemExit):
+    """Raised when the user quits the game.
+
+    'message' is the good bye message, the game loop prints it and
+    the game server sends it to the user. The DB connection is closed
+    by whoever runs the game, in the terminal that's 'main.py', and
+    the game server keeps it open for the other users.
     """
-    print(message_renderer.render_exit_message(
+
+    message: str
+
+    def __init__(self, message: str) -> None:
+        super().__init__()
+        self.message = message
+
+
+def quit_game() -> Never:
+    """Quit the game with the game stats."""
+    dbms.flush_autosave()
+    raise QuitGame(message_renderer.render_exit_message(
         game_cache.game_stats
     ))
-    dbms.close_db_connection()
-    sys.exit()
 
 
 def get_invalid_user_input_message(user_input: str) -> str:
     """Return a generic error message."""
+    metrics.count(
+        INVALID_INPUTS_TOTAL, 'panel', UserState._session_state.panel
+    )
     return message_renderer.render_generic_error_message(user_input)
 
 
 class UserState:
     """Represent the user's state during the game process.
 
-    This class contains a bunch of descriptor objects
-    that are shared amongst the game controllers.
-    All the property methods of this class set or return
-    a state of their corresponding attributes.
+    The state belongs to the current game session, the controllers
+    are shared by all the sessions, see 'use_session_state'. Every
+    decision is a 'SessionFlag', and the controllers report what
+    the input has led to with 'emit', the session moves to the
+    next panel by that event.
     """
 
-    _user_wants_to_delete = UserWantsToDelete()
-    _user_wants_to_go_back_to_main_menu = UserWantsToGoBackToMainMenu()
-    _user_wants_to_load = UserWantsToLoad()
-    _user_wants_to_list_saved_games = UserWantsToListSavedGames()
-    _user_wants_to_display_game_rules = UserWantsToDisplayGameRules()
-    _user_set_max_rounds = UserSetMaxRounds()
+    _session_state: SessionState = SessionState('')
+
+    _user_wants_to_delete = SessionFlag(UserIntent.DELETE)
+    _user_wants_to_load = SessionFlag(UserIntent.LOAD)
+    _user_wants_to_list_saved_games = SessionFlag(
+        UserIntent.LIST_SAVED_GAMES
+    )
+    _user_wants_to_display_game_rules = SessionFlag(
+        UserIntent.DISPLAY_GAME_RULES
+    )
+
+    @staticmethod
+    def use_session_state(session_state: SessionState) -> None:
+        """Make the state of a session the current one."""
+        UserState._session_state = session_state
+
+    def emit(self, event: GameEvent) -> None:
+        """Report what the user's input has led to."""
+        self._session_state.event = event
 
     @property
     def user_wants_to_delete(self) -> bool:
         """See the class docs."""
         return self._user_wants_to_delete
 
-    @property
-    def user_wants_to_go_back_to_main_menu(self) -> bool:
-        """See the class docs."""
-        return self._user_wants_to_go_back_to_main_menu
-
-    @user_wants_to_go_back_to_main_menu.setter
-    def user_wants_to_go_back_to_main_menu(self, value: bool) -> None:
-        self._user_wants_to_go_back_to_main_menu = value
-
     @property
     def user_wants_to_load(self) -> bool:
         """See the class docs."""
@@ -76,15 +93,6 @@ class UserState:
         """See the class docs."""
         return self._user_wants_to_display_game_rules
 
-    @property
-    def user_set_max_rounds(self) -> bool:
-        """See the class docs."""
-        return self._user_set_max_rounds
-
-    @user_set_max_rounds.setter
-    def user_set_max_rounds(self, value: bool) -> None:
-        self._user_set_max_rounds = value
-
 
 class MainMenuController(UserState):
     """This class handles requests that come
@@ -115,21 +123,22 @@ class MainMenuController(UserState):
             )
         if self._user_wants_to_list_saved_games:
             self._user_wants_to_list_saved_games = False
-            saved_games: SavedGames = self.__game_cache.saved_games
-            if saved_games == []:
-                saved_games = self.__dbms.get_saved_games_data()
+            # The DB is asked only once, after that the catalog is
+            # kept up to date by the save and delete operations.
+            if not self.__game_cache.saved_games.is_loaded:
+                self.__dbms.get_saved_games_data()
             return (
                 self
                 .__panel_renderer
                 .render_main_menu_panel_with_saved_game_list(
-                    saved_games
+                    self.__game_cache.saved_games
                 )
             )
-        deleted_game_id: str = self.__game_cache.deleted_game_id
-        if deleted_game_id:
-            self.__game_cache.clear_deleted_game_id()
-            return self.__panel_renderer.render_main_menu_panel_with_game_id(
-                deleted_game_id
+        deleted_game_ids: list[str] = self.__game_cache.deleted_game_ids
+        if deleted_game_ids:
+            self.__game_cache.clear_deleted_game_ids()
+            return self.__panel_renderer.render_main_menu_panel_with_game_ids(
+                deleted_game_ids
             )
         return self.__panel_renderer.render_main_menu_panel()
 
@@ -140,10 +149,12 @@ class MainMenuController(UserState):
     def delete_saved_game(self) -> None:
         """Set the user's decision to delete a saved game to 'True'."""
         self._user_wants_to_delete = True
+        self.emit(GameEvent.DELETE_SAVED_GAME)
 
     def load_saved_game(self) -> None:
         """Set the user's decision to load a saved game to 'True'."""
         self._user_wants_to_load = True
+        self.emit(GameEvent.LOAD_SAVED_GAME)
 
     def display_game_rules(self) -> None:
         """Set the user's decision to display the game rules to 'True'."""
@@ -151,15 +162,15 @@ class MainMenuController(UserState):
 
     def start_new_game(self) -> None:
         """Start a new game."""
-        # If the user wants to start a new game,
-        # then I don't have to do anything.
-        return
+        # If the user wants to start a new game, then the user
+        # only needs to be moved to the round amount panel.
+        self.emit(GameEvent.START_NEW_GAME)
 
     def quit_game_from_main_menu(self) -> Never:
-        """Close the DB connection and quit the game from the main menu."""
-        print(self.__message_renderer.render_main_menu_exit_message())
-        self.__dbms.close_db_connection()
-        sys.exit()
+        """Quit the game from the main menu."""
+        raise QuitGame(
+            self.__message_renderer.render_main_menu_exit_message()
+        )
 
 
 class GameIdInputPanelController(UserState):
@@ -183,29 +194,55 @@ class GameIdInputPanelController(UserState):
         return self.__panel_renderer.render_game_id_input_panel()
 
     def process_user_intentions(self, user_input: str) -> Optional[str]:
-        """Load or delete a saved game from the DB according
+        """Load or delete saved games from the DB according
         to the user's decision.
         """
+        # The user can type several game ids at once, and
+        # the same id can be typed more than once, so I drop
+        # duplicates here but keep the order they were typed in.
+        save_points: list[tuple[str, str]] = list(dict.fromkeys(
+            re.findall(SAVE_POINT, user_input)
+        ))
+        game_ids: list[str] = list(dict.fromkeys(
+            game_id for game_id, _ in save_points
+        ))
         if self._user_wants_to_load:
-            return self.initialize_load_process(user_input)
+            if len(save_points) > 1:
+                return (
+                    self
+                    .__message_renderer
+                    .render_load_saved_game_error_message(
+                        'You can load only one game at a time!'
+                    )
+                )
+            version: str = save_points[0][1]
+            return self.initialize_load_process(
+                game_ids, int(version) if version else None
+            )
         if self._user_wants_to_delete:
-            return self.initialize_delete_process(user_input)
+            return self.initialize_delete_process(game_ids)
         return None
 
     def quit_to_main_menu_from_game_id_input_panel(self) -> None:
         """Set the user's intent to go back to the main menu."""
-        self._user_wants_to_go_back_to_main_menu = True
+        self.emit(GameEvent.QUIT_TO_MAIN_MENU)
         # If the user was trying to load or delete a saved game but
         # wasn't able to, then he'll go back to the main menu, 
-        # so I need to clear his initial decision here,
-        # or I can place it in the 'main.py' file.
+        # so I need to clear his initial decision here.
         self._user_wants_to_load = False
         self._user_wants_to_delete = False
 
-    def initialize_load_process(self, user_input: str) -> Optional[str]:
-        """Start the saved game session restoration process."""
+    def initialize_load_process(
+            self, game_ids: list[str],
+            version: Optional[int] = None) -> Optional[str]:
+        """Start the saved game session restoration process.
+
+        The latest save point of the game is loaded
+        unless 'version' is set. The user has typed one game id,
+        'process_user_intentions' rejects more of them.
+        """
         error_message: Optional[str] = self.__dbms.restore_saved_game_session(
-            user_input
+            game_ids[0], version
         )
         if error_message:
             return (
@@ -215,18 +252,24 @@ class GameIdInputPanelController(UserState):
                     error_message
                 )
             )
-        # 'user_set_max_rounds' should be here
-        # because when the user has loaded a saved game
-        # he will continue to play it,
-        # and he doesn't need to set this value.
-        self._user_set_max_rounds = True
+        # When the user has loaded a saved game he will
+        # continue to play it, so he goes straight to the ingame
+        # panel and doesn't need to set the number of rounds.
         self._user_wants_to_load = False
+        self.emit(GameEvent.GAME_LOADED)
         return None
 
-    def initialize_delete_process(self, user_input: str) -> Optional[str]:
-        """Start the saved game deletion process."""
-        error_message: Optional[str] = self.__dbms.delete_saved_game(
-            user_input
+    def initialize_delete_process(
+            self, game_ids: list[str]) -> Optional[str]:
+        """Start the saved games deletion process.
+
+        All the games are deleted at once. If some of the game ids
+        don't exist, the user stays on the game id input panel and
+        gets an error for each of them, the other games are
+        deleted anyway.
+        """
+        error_message: Optional[str] = self.__dbms.delete_saved_games(
+            game_ids
         )
         if error_message:
             return (
@@ -237,7 +280,7 @@ class GameIdInputPanelController(UserState):
                 )
             )
         self._user_wants_to_delete = False
-        self._user_wants_to_go_back_to_main_menu = True
+        self.emit(GameEvent.GAMES_DELETED)
         return None
 
 
@@ -248,13 +291,15 @@ class IngamePanelController(UserState):
 
     __game_cache: Cache
     __dbms: DBMS
+    __message_renderer: Message
     __panel_renderer: Panel
 
     def __init__(
             self, game_cache: Cache, dbms: DBMS,
-            panel_renderer: Panel) -> None:
+            message_renderer: Message, panel_renderer: Panel) -> None:
         self.__game_cache = game_cache
         self.__dbms = dbms
+        self.__message_renderer = message_renderer
         self.__panel_renderer = panel_renderer
 
     def get_input_panel(self) -> str:
@@ -267,6 +312,7 @@ class IngamePanelController(UserState):
             self.__game_cache.game_stats,
             self.__game_cache.max_rounds_per_game,
             self.__game_cache.saved_games_count,
+            self.__dbms.get_max_saved_games(),
             saved_game_id,
         )
 
@@ -281,18 +327,26 @@ class IngamePanelController(UserState):
         """Save game results."""
         err: Optional[str] = self.__dbms.save_game_data()
         if err:
-            return err
+            return self.__message_renderer.render_save_game_error_message(err)
         return None
 
     def quit_to_main_menu(self) -> None:
         """Quit to the main menu."""
-        self._user_set_max_rounds = False
-        self._user_wants_to_go_back_to_main_menu = True
+        self.emit(GameEvent.QUIT_TO_MAIN_MENU)
+        self.__dbms.flush_autosave()
         self.__game_cache.clear_game_stats()
 
     def continue_default_game(self, user_input: str) -> None:
         """Continue a game session."""
         self.get_round_results(user_input)
+        if (self.__game_cache.current_round
+                != self.__game_cache.max_rounds_per_game):
+            self.__dbms.autosave_game_data()
+            return
+        # The last round is autosaved together with the game results.
+        self.__game_cache.get_game_winner()
+        self.__dbms.flush_autosave(game_ended=True)
+        self.emit(GameEvent.GAME_OVER)
 
     def get_round_results(self, user_input: str) -> None:
         """Calculate round results."""
@@ -308,7 +362,8 @@ class ContinueGamePanelController(UserState):
     __panel_renderer: Panel
     __game_cache: Cache
 
-    def __init__(self, game_cache: Cache, panel_renderer: Panel) -> None:
+    def __init__(self, game_cache: Cache,
+                 panel_renderer: Panel) -> None:
         self.__panel_renderer = panel_renderer
         self.__game_cache = game_cache
 
@@ -329,7 +384,7 @@ class ContinueGamePanelController(UserState):
 
     def quit_to_main_menu(self) -> None:
         """Quit to the main menu."""
-        self._user_wants_to_go_back_to_main_menu = True
+        self.emit(GameEvent.QUIT_TO_MAIN_MENU)
         self.__game_cache.clear_game_stats()
 
     def continue_playing(self) -> None:
@@ -339,18 +394,7 @@ class ContinueGamePanelController(UserState):
         before the user starts a new game.
         """
         self.__game_cache.clear_round_stats()
-
-    def get_game_results(self) -> None:
-        """Calculate game session results."""
-        self.__game_cache.get_game_winner()
-
-    def check_if_the_last_round(self) -> bool:
-        """Return 'True' if a round is the
-        last one in the current game, 'False'
-        otherwise.
-        """
-        return (self.__game_cache.current_round ==
-                self.__game_cache.max_rounds_per_game)
+        self.emit(GameEvent.PLAY_AGAIN)
 
 
 class RoundAmountPanelContoller(UserState):
@@ -373,7 +417,7 @@ class RoundAmountPanelContoller(UserState):
 
     def quit_to_main_menu(self) -> None:
         """Quit to the main menu."""
-        self._user_wants_to_go_back_to_main_menu = True
+        self.emit(GameEvent.QUIT_TO_MAIN_MENU)
         self.__game_cache.clear_game_stats()
 
     def start_game(self, user_input: str) -> None:
@@ -381,13 +425,11 @@ class RoundAmountPanelContoller(UserState):
         the amount of rounds for one game.
         """
         numeric_user_input: int = int(user_input)
-        self._user_set_max_rounds = True
+        self.emit(GameEvent.ROUNDS_SET)
         self.__game_cache.max_rounds_per_game = numeric_user_input
         self.__game_cache.set_win_condition(numeric_user_input)
 
 
-user_state = UserState()
-
 # DI is an interesting thing I ain't gonna lie, but what am I
 # supposed to do with this messy object creation?
 
@@ -409,6 +451,7 @@ game_id_input_panel_controller = GameIdInputPanelController(
 ingame_panel_controller = IngamePanelController(
     game_cache=game_cache,
     dbms=dbms,
+    message_renderer=message_renderer,
     panel_renderer=panel_renderer
 )
 continue_game_panel_controller = ContinueGamePanelController(
@@ -1,113 +1,28 @@
 from typing import final
 
-
-@final
-class UserWantsToLoad:
-    """Shares a state of the '_user_wants_to_load' 
-    attribute amongst the game controllers.
-    """
-
-    __user_wants_to_load: bool
-
-    def __init__(self):
-        self.__user_wants_to_load = False
-
-    def __get__(self, instance, owner=None) -> bool:
-        return self.__user_wants_to_load
-
-    def __set__(self, instance, value: bool) -> None:
-        self.__user_wants_to_load = value
-
-
-@final
-class UserWantsToDelete:
-    """Shares a state of the '_user_wants_to_delete' 
-    attribute amongst the game controllers.
-    """
-
-    __user_wants_to_delete: bool
-
-    def __init__(self):
-        self.__user_wants_to_delete = False
-
-    def __get__(self, instance, owner=None) -> bool:
-        return self.__user_wants_to_delete
-
-    def __set__(self, instance, value: bool) -> None:
-        self.__user_wants_to_delete = value
-
-
-@final
-class UserWantsToGoBackToMainMenu:
-    """Shares a state of the 
-    '_user_wants_to_go_back_to_main_menu' attribute
-    amongst the game controllers.
-    """
-
-    __user_wants_to_go_back_to_main_menu: bool
-
-    def __init__(self):
-        self.__user_wants_to_go_back_to_main_menu = False
-
-    def __get__(self, instance, owner=None) -> bool:
-        return self.__user_wants_to_go_back_to_main_menu
-
-    def __set__(self, instance, value: bool) -> None:
-        self.__user_wants_to_go_back_to_main_menu = value
-
-
-@final
-class UserWantsToListSavedGames:
-    """Shares a state of the 
-    '_user_wants_to_list_saved_games' attribute
-    amongst the game controllers.
-    """
-
-    __user_wants_to_list_saved_games: bool
-
-    def __init__(self):
-        self.__user_wants_to_list_saved_games = False
-
-    def __get__(self, instance, owner=None) -> bool:
-        return self.__user_wants_to_list_saved_games
-
-    def __set__(self, instance, value: bool) -> None:
-        self.__user_wants_to_list_saved_games = value
+from .enums import UserIntent
 
 
 @final
-class UserSetMaxRounds:
-    """Shares a state of the 
-    '_user_set_max_rounds' attribute amongst 
-    the game controllers.
-    """
-
-    __user_set_max_rounds: bool
-
-    def __init__(self):
-        self.__user_set_max_rounds = False
+class SessionFlag:
+    """Keeps one of the user's decisions as a bit of the state
+    of the current game session, see 'SessionState'.
 
-    def __get__(self, instance, owner=None) -> bool:
-        return self.__user_set_max_rounds
-
-    def __set__(self, instance, value: bool) -> None:
-        self.__user_set_max_rounds = value
-
-
-@final
-class UserWantsToDisplayGameRules:
-    """Shares a state of the 
-    '_user_wants_to_display_game_rules'
-    attribute amongst the game controllers.
+    The controllers are shared by all the sessions, but the
+    decisions aren't, so they can't be stored on the descriptor
+    or on the controller itself.
     """
 
-    __user_wants_to_display_game_rules: bool
+    __intent: UserIntent
 
-    def __init__(self):
-        self.__user_wants_to_display_game_rules = False
+    def __init__(self, intent: UserIntent) -> None:
+        self.__intent = intent
 
     def __get__(self, instance, owner=None) -> bool:
-        return self.__user_wants_to_display_game_rules
+        return bool(instance._session_state.intents & self.__intent)
 
     def __set__(self, instance, value: bool) -> None:
-        self.__user_wants_to_display_game_rules = value
+        if value:
+            instance._session_state.intents |= self.__intent
+        else:
+            instance._session_state.intents &= ~self.__intent
@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import Enum, IntFlag, auto
 
 
 class MainMenuPanelChoice(Enum):
@@ -9,3 +9,28 @@ class MainMenuPanelChoice(Enum):
     LIST_SAVED_GAMES = '4'
     DISPLAY_GAME_RULES = '5'
     QUIT_GAME = '6'
+
+
+class UserIntent(IntFlag):
+    """The user's decisions that outlive one input,
+    they are kept as bits of 'SessionState.intents'.
+    """
+    LOAD = auto()
+    DELETE = auto()
+    LIST_SAVED_GAMES = auto()
+    DISPLAY_GAME_RULES = auto()
+
+
+class GameEvent(Enum):
+    """What an input has led to, the session moves to the next
+    panel by this event, see 'router.transitions.py'.
+    """
+    START_NEW_GAME = auto()
+    LOAD_SAVED_GAME = auto()
+    DELETE_SAVED_GAME = auto()
+    GAME_LOADED = auto()
+    GAMES_DELETED = auto()
+    ROUNDS_SET = auto()
+    GAME_OVER = auto()
+    PLAY_AGAIN = auto()
+    QUIT_TO_MAIN_MENU = auto()
@@ -2,7 +2,11 @@ from typing import Final
 
 
 MAX_ROUNDS_PER_GAME: Final[str] = '(3|5|7|9)'
-ROCK_PAPER_SCISSORS: Final[str] = '(r|p|s)'
 UUID_: Final[str] = (
     '[a-z0-9]{8}-[a-z0-9]{4}-[a-z0-9]{4}-[a-z0-9]{4}-[a-z0-9]{12}'
 )
+# A game id can be followed by '@' and the number of a save point.
+SAVE_POINT: Final[str] = f'({UUID_})(?:@([0-9]+))?'
+GAME_IDS: Final[str] = (
+    f'{UUID_}(?:@[0-9]+)?(?:[ ,]+{UUID_}(?:@[0-9]+)?)*'
+)
@@ -0,0 +1,29 @@
+from typing import Any, Optional
+
+from .enums import GameEvent
+
+
+class SessionState:
+    """The state of one game session.
+
+    'panel' is the panel the session waits for the input on,
+    'intents' are the user's decisions ('UserIntent' bits), 'event'
+    is what the last input has led to, 'cache' and 'autosave' are
+    the session's parts of the game cache and of the autosaver while
+    the session isn't the current one.
+    """
+
+    __slots__ = ('panel', 'intents', 'event', 'cache', 'autosave')
+
+    panel: str
+    intents: int
+    event: Optional[GameEvent]
+    cache: Optional[dict[str, Any]]
+    autosave: Optional[dict[str, Any]]
+
+    def __init__(self, panel: str) -> None:
+        self.panel = panel
+        self.intents = 0
+        self.event = None
+        self.cache = None
+        self.autosave = None
@@ -0,0 +1,37 @@
+from typing import Callable
+
+from .controller.controller import QuitGame
+from .model.profiling import profiler
+from .session import GameSession
+
+# ---------------------------------------------------------------
+# The game flow is ->
+# 1) If you want to bypass a phase you should emit an event
+# (see 'router.transitions.py') and return something that
+# evaluates to 'False'.
+# 2) If you return something that is 'True' (in the case of this game
+# it will be an error message) then it indicates that an error 
+# has occurend on the 'game server' side, and this phase is not finished yet.
+# ---------------------------------------------------------------
+
+
+def run_game_loop(read_user_input: Callable[[str], str],
+                  show_error: Callable[[str], None]) -> None:
+    """Play the game until the user quits.
+
+    'read_user_input' gets the panel, shows it and returns
+    the user's input, 'show_error' shows an error message.
+    It's 'input' and 'print' when the game is played in a terminal.
+    The phases themselves are in 'GameSession'.
+    """
+    session = GameSession()
+    session.resume()
+    with profiler.profile_loop():
+        try:
+            while True:
+                if error := session.handle(
+                        read_user_input(session.render_panel())):
+                    show_error(error)
+        except QuitGame as game_quit:
+            print(game_quit.message)
+            raise
@@ -0,0 +1,114 @@
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+from typing import Iterable, Iterator, Optional, TextIO
+
+from .game_loop import run_game_loop
+
+
+class EndOfScript(Exception):
+    """Raised when there are no more commands in the script."""
+
+
+class ScriptedInput:
+    """Feed commands from a script to the game loop
+    as if the user typed them.
+
+    Panels are written to 'output' together with the commands,
+    so the transcript looks like a terminal session. Nothing
+    is written if 'output' is 'None'.
+    """
+
+    __commands: Iterator[str]
+    __output: Optional[TextIO]
+    __commands_count: int
+
+    def __init__(self, commands: Iterable[str],
+                 output: Optional[TextIO] = None) -> None:
+        self.__commands = iter(commands)
+        self.__output = output
+        self.__commands_count = 0
+
+    @property
+    def commands_count(self) -> int:
+        """Return how many commands have been fed."""
+        return self.__commands_count
+
+    def __call__(self, panel: str) -> str:
+        command: Optional[str] = next(self.__commands, None)
+        if command is None:
+            raise EndOfScript
+        command = command.rstrip('\r\n')
+        self.__commands_count += 1
+        if self.__output is not None:
+            self.__output.write(f'{panel}{command}\n')
+        return command
+
+    def show_error(self, error: str) -> None:
+        """Write an error message to the output."""
+        if self.__output is not None:
+            self.__output.write(f'{error}\n')
+
+
+def run_script(commands: Iterable[str],
+               output: Optional[TextIO] = None) -> tuple[int, float]:
+    """Play the commands through the routers and return how many
+    commands were processed and how long it took in seconds.
+
+    The script ends when the commands run out or when
+    one of them quits the game.
+    """
+    scripted_input = ScriptedInput(commands, output)
+    started_at: float = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if output is None:
+            output = stack.enter_context(open(os.devnull, 'w'))
+        # The panels are built even if they aren't written, building
+        # a panel is a part of the phase transition, e.g. the main
+        # menu panel resets the user's last choice.
+        stack.enter_context(contextlib.redirect_stdout(output))
+        try:
+            run_game_loop(scripted_input, scripted_input.show_error)
+        except (EndOfScript, SystemExit):
+            pass
+    return scripted_input.commands_count, time.perf_counter() - started_at
+
+
+if __name__ == '__main__':
+    # Replay a recorded session at full speed ->
+    # python -m app.headless session.txt [--render] [--repeat 100]
+    parser = argparse.ArgumentParser(
+        description='Feed commands from a script through the game '
+                    'without a terminal and report the throughput.'
+    )
+    parser.add_argument(
+        'script', nargs='?', default='-',
+        help='a file with one command per line, stdin by default'
+    )
+    parser.add_argument(
+        '--render', action='store_true',
+        help='write the panels and the commands to stdout'
+    )
+    parser.add_argument(
+        '--repeat', type=int, default=1,
+        help='play the script this many times in a row'
+    )
+    args = parser.parse_args()
+    if args.script == '-':
+        script: list[str] = sys.stdin.readlines()
+    else:
+        with open(args.script) as script_file:
+            script = script_file.readlines()
+
+    commands_count, elapsed_seconds = run_script(
+        (command for _ in range(args.repeat) for command in script),
+        sys.stdout if args.render else None
+    )
+    print(
+        f'Processed {commands_count} commands in {elapsed_seconds:.3f}s '
+        f'({commands_count / (elapsed_seconds or 1e-9):.0f} commands/s)',
+        file=sys.stderr
+    )
@@ -0,0 +1,230 @@
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+from .constants import AUTOSAVE_EVERY_ROUNDS, AUTOSAVE_EVERY_SECONDS
+from .events import event_sink
+
+
+class Autosaver(ABC):
+    """An abstract autosave policy of a game session."""
+
+    @abstractmethod
+    def round_played(self) -> bool:
+        """Count a played round and return 'True'
+        if the session must be autosaved.
+        """
+
+    @abstractmethod
+    def game_ended(self) -> None:
+        """Remember that the game results must be autosaved."""
+
+    @property
+    @abstractmethod
+    def has_unsaved_changes(self) -> bool:
+        """Return 'True' if rounds were played or the game
+        has ended after the last save.
+        """
+
+    @abstractmethod
+    def save(self, game_data: dict[str, Any]) -> None:
+        """Write game data in the background.
+
+        This method is called from the game loop, so it doesn't
+        wait for the DB.
+        """
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Start counting rounds and time from scratch
+        after the session has been saved or loaded.
+        """
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Wait until the pending autosave is written."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Write the pending autosave and stop the autosaver."""
+
+    @abstractmethod
+    def get_session_state(self) -> dict[str, Any]:
+        """Return what the autosaver has counted for
+        the current game session.
+        """
+
+    @abstractmethod
+    def set_session_state(self, state: Optional[dict[str, Any]]) -> None:
+        """Switch to another game session, 'None' starts
+        counting from scratch.
+        """
+
+
+class NullAutosaver(Autosaver):
+    """An autosaver that never saves.
+
+    It is used when autosave is disabled.
+    """
+
+    def round_played(self) -> bool:
+        return False
+
+    def game_ended(self) -> None:
+        return
+
+    @property
+    def has_unsaved_changes(self) -> bool:
+        return False
+
+    def save(self, game_data: dict[str, Any]) -> None:
+        return
+
+    def reset(self) -> None:
+        return
+
+    def flush(self) -> None:
+        return
+
+    def close(self) -> None:
+        return
+
+    def get_session_state(self) -> dict[str, Any]:
+        return {}
+
+    def set_session_state(self, state: Optional[dict[str, Any]]) -> None:
+        return
+
+
+class BackgroundAutosaver(Autosaver):
+    """Autosave the session every 'every_rounds' rounds and/or
+    every 'every_seconds' seconds, 0 turns a condition off.
+
+    The rounds and the time are counted for the current session,
+    the server swaps them with 'get_session_state' and
+    'set_session_state' like the rest of the session.
+
+    Autosaves are written by one background thread, so at most one
+    write is in flight. Only the latest game data of every game is
+    kept while a write is in flight, a newer autosave of a game
+    replaces its pending one, because it contains everything
+    the pending one does. 'flush' waits for the autosaves
+    of all the sessions.
+
+    A write that raises is reported as an 'autosave_failed' event
+    and the thread goes on, otherwise 'flush' would wait forever.
+    """
+
+    __write: Callable[[dict[str, Any]], None]
+    __every_rounds: int
+    __every_seconds: float
+    __rounds_since_save: int
+    __game_ended: bool
+    __last_save_time: float
+    __pending: dict[str, dict[str, Any]]
+    __writing: bool
+    __closed: bool
+    __condition: threading.Condition
+    __writer: threading.Thread
+
+    def __init__(
+            self, write: Callable[[dict[str, Any]], None],
+            every_rounds: int = AUTOSAVE_EVERY_ROUNDS,
+            every_seconds: float = AUTOSAVE_EVERY_SECONDS) -> None:
+        self.__write = write
+        self.__every_rounds = every_rounds
+        self.__every_seconds = every_seconds
+        self.__rounds_since_save = 0
+        self.__game_ended = False
+        self.__last_save_time = time.monotonic()
+        self.__pending = {}
+        self.__writing = False
+        self.__closed = False
+        self.__condition = threading.Condition()
+        self.__writer = threading.Thread(
+            target=self.__run, name='autosave-writer', daemon=True
+        )
+        self.__writer.start()
+
+    def round_played(self) -> bool:
+        self.__rounds_since_save += 1
+        return (
+            0 < self.__every_rounds <= self.__rounds_since_save
+            or 0 < self.__every_seconds
+            <= time.monotonic() - self.__last_save_time
+        )
+
+    def game_ended(self) -> None:
+        self.__game_ended = True
+
+    @property
+    def has_unsaved_changes(self) -> bool:
+        return self.__rounds_since_save > 0 or self.__game_ended
+
+    def save(self, game_data: dict[str, Any]) -> None:
+        self.reset()
+        with self.__condition:
+            self.__pending[game_data['game_id']] = game_data
+            self.__condition.notify_all()
+
+    def reset(self) -> None:
+        self.__rounds_since_save = 0
+        self.__game_ended = False
+        self.__last_save_time = time.monotonic()
+
+    def flush(self) -> None:
+        with self.__condition:
+            self.__condition.wait_for(
+                lambda: not self.__pending and not self.__writing
+            )
+
+    def close(self) -> None:
+        if self.__closed:
+            return
+        self.flush()
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+        self.__writer.join()
+
+    def get_session_state(self) -> dict[str, Any]:
+        return {
+            'rounds_since_save': self.__rounds_since_save,
+            'game_ended': self.__game_ended,
+            'last_save_time': self.__last_save_time,
+        }
+
+    def set_session_state(self, state: Optional[dict[str, Any]]) -> None:
+        if state is None:
+            self.reset()
+            return
+        self.__rounds_since_save = state['rounds_since_save']
+        self.__game_ended = state['game_ended']
+        self.__last_save_time = state['last_save_time']
+
+    def __run(self) -> None:
+        while True:
+            with self.__condition:
+                self.__condition.wait_for(
+                    lambda: bool(self.__pending) or self.__closed
+                )
+                if not self.__pending:
+                    return
+                # The autosaves are written in the order they came in.
+                game_data: dict[str, Any] = self.__pending.pop(
+                    next(iter(self.__pending))
+                )
+                self.__writing = True
+            try:
+                self.__write(game_data)
+            except Exception as error:
+                event_sink.emit('autosave_failed', {
+                    'game_id': game_data.get('game_id'),
+                    'error': repr(error),
+                })
+            finally:
+                with self.__condition:
+                    self.__writing = False
+                    self.__condition.notify_all()
@@ -0,0 +1,80 @@
+from typing import Iterable, Iterator, Optional
+
+from .custom_dtypes import GameId, SavedGame, SavedGames
+
+
+class SavedGamesCatalog:
+    """Keep saved games in memory while the game is running.
+
+    Saved games are indexed by their game ids, so looking up
+    and removing a game doesn't require scanning all of them,
+    and they keep the order they were added in.
+
+    The catalog also knows whether it has been loaded from the DB.
+    An empty catalog that has been loaded means that the user
+    really doesn't have any saved games, so there is no need
+    to ask the DB about them again.
+
+    Every change bumps the version of the catalog, so whatever is
+    built from the catalog (e.g. the rendered list of saved games)
+    can be kept until the catalog changes.
+    """
+
+    __saved_games: dict[GameId, SavedGame]
+    __is_loaded: bool
+    __version: int
+
+    def __init__(self) -> None:
+        self.__saved_games = {}
+        self.__is_loaded = False
+        self.__version = 0
+
+    def __len__(self) -> int:
+        return len(self.__saved_games)
+
+    def __contains__(self, game_id: object) -> bool:
+        return game_id in self.__saved_games
+
+    def __iter__(self) -> Iterator[SavedGame]:
+        return iter(self.__saved_games.values())
+
+    @property
+    def is_loaded(self) -> bool:
+        """Return 'True' if the catalog reflects the DB state."""
+        return self.__is_loaded
+
+    @property
+    def version(self) -> int:
+        """Return the number of changes made to the catalog."""
+        return self.__version
+
+    def load(self, saved_games: SavedGames) -> None:
+        """Replace the catalog content with saved games from the DB."""
+        self.__saved_games = {
+            saved_game[0]: saved_game for saved_game in saved_games
+        }
+        self.__is_loaded = True
+        self.__version += 1
+
+    def add(self, saved_game: SavedGame) -> None:
+        """Add a saved game or replace the one with the same game id."""
+        self.__saved_games[saved_game[0]] = saved_game
+        self.__version += 1
+
+    def get(self, game_id: GameId) -> Optional[SavedGame]:
+        """Return a saved game by its game id."""
+        return self.__saved_games.get(game_id)
+
+    def remove(self, game_ids: Iterable[GameId]) -> list[GameId]:
+        """Remove saved games and return ids that were in the catalog."""
+        removed_game_ids: list[GameId] = []
+        for game_id in game_ids:
+            if self.__saved_games.pop(game_id, None) is not None:
+                removed_game_ids.append(game_id)
+        if removed_game_ids:
+            self.__version += 1
+        return removed_game_ids
+
+    def to_list(self) -> SavedGames:
+        """Return saved games in the order they were added in."""
+        return list(self.__saved_games.values())
@@ -1,11 +1,152 @@
+import os
+
 from typing import Final
 
 
-DSN: Final[str] = (
+DSN: Final[str] = os.environ.get('RPS_DSN', (
     'host=postgres-serv '
     'dbname=applicationdb '
     'user=postgres '
     'password=mysecretpassword '
     'port=5432'
+))
+# Saved games are spread over these databases if they are set,
+# see 'model.sharding.py'. DSNs are separated with semicolons.
+SHARD_DSNS: Final[tuple[str, ...]] = tuple(
+    dsn.strip()
+    for dsn in os.environ.get('RPS_SHARD_DSNS', '').split(';')
+    if dsn.strip()
 )
+SHARD_VIRTUAL_NODES: Final[int] = 64
+SHARD_MOVE_BATCH_SIZE: Final[int] = 500
+# The player whose games are saved, listed and counted. Every player
+# can keep MAX_SAVED_GAMES games unless a different limit is set for
+# them, see 'model.players.py'.
+PLAYER_NAME: Final[str] = os.environ.get('RPS_PLAYER', 'default')
+# The game server asks every user for their player name.
+PLAYER_NAME_MAX_LENGTH: Final[int] = 32
+# Games saved before players were introduced belong to this player.
+DEFAULT_PLAYER_NAME: Final[str] = 'default'
 MAX_SAVED_GAMES: Final[int] = 5
+# Every save of a game is kept as a save point, every
+# HISTORY_KEYFRAME_INTERVAL-th one is a full snapshot and the others
+# are deltas, so loading any save point reads at most this many rows.
+HISTORY_KEYFRAME_INTERVAL: Final[int] = 16
+# The latest save points of this many games are kept in memory
+# as the bases of the deltas, see 'model.snapshot.py'.
+SAVE_POINTS_MAX_GAMES: Final[int] = 1024
+
+# 'classic', 'rpsls' or 'cyclic-N' with an odd N, see 'model.rules.py'.
+GAME_VARIANT: Final[str] = os.environ.get('RPS_GAME_VARIANT', 'classic')
+
+# Game events for offline analytics. The sink is disabled
+# unless a path to the events file is set.
+EVENT_LOG_PATH: Final[str] = os.environ.get('RPS_EVENT_LOG_PATH', '')
+EVENT_LOG_GZIP: Final[bool] = os.environ.get('RPS_EVENT_LOG_GZIP') == '1'
+EVENT_LOG_MAX_BYTES: Final[int] = int(
+    os.environ.get('RPS_EVENT_LOG_MAX_BYTES', 64 * 1024 * 1024)
+)
+EVENT_LOG_ROTATE_SECONDS: Final[float] = float(
+    os.environ.get('RPS_EVENT_LOG_ROTATE_SECONDS', 60 * 60)
+)
+EVENT_LOG_FLUSH_SECONDS: Final[float] = float(
+    os.environ.get('RPS_EVENT_LOG_FLUSH_SECONDS', 1)
+)
+EVENT_LOG_BUFFER_SIZE: Final[int] = 1024 * 1024
+EVENT_LOG_MAX_PENDING: Final[int] = int(
+    os.environ.get('RPS_EVENT_LOG_MAX_PENDING', 100_000)
+)
+
+# A scoreboard shared by all the game processes on one machine.
+# It is disabled unless a shared memory block name is set.
+SCOREBOARD_NAME: Final[str] = os.environ.get('RPS_SCOREBOARD_NAME', '')
+SCOREBOARD_SLOTS: Final[int] = int(
+    os.environ.get('RPS_SCOREBOARD_SLOTS', 64)
+)
+
+# Saved games that haven't been loaded or saved for this long are
+# deleted by the expiry job. Saved games never expire if it is 0.
+SAVED_GAMES_TTL_SECONDS: Final[int] = int(
+    os.environ.get('RPS_SAVED_GAMES_TTL_SECONDS', 0)
+)
+EXPIRY_INTERVAL_SECONDS: Final[float] = float(
+    os.environ.get('RPS_EXPIRY_INTERVAL_SECONDS', 5 * 60)
+)
+EXPIRY_BATCH_SIZE: Final[int] = int(
+    os.environ.get('RPS_EXPIRY_BATCH_SIZE', 500)
+)
+EXPIRY_BATCH_PAUSE_SECONDS: Final[float] = 0.05
+
+# Saves and deletes are published on this channel, so that every game
+# process sharing the DB keeps its saved games cache up to date,
+# see 'model.notifications.py'. Nothing is published if it is empty.
+SAVED_GAMES_CHANNEL: Final[str] = os.environ.get('RPS_SAVED_GAMES_CHANNEL', '')
+NOTIFICATIONS_POLL_SECONDS: Final[float] = 1
+
+# The game session is saved in the background every AUTOSAVE_EVERY_ROUNDS
+# rounds and/or every AUTOSAVE_EVERY_SECONDS seconds (checked after
+# a round), and when the game ends. Autosave is off if both are 0.
+AUTOSAVE_EVERY_ROUNDS: Final[int] = int(
+    os.environ.get('RPS_AUTOSAVE_EVERY_ROUNDS', 0)
+)
+AUTOSAVE_EVERY_SECONDS: Final[float] = float(
+    os.environ.get('RPS_AUTOSAVE_EVERY_SECONDS', 0)
+)
+
+# The address of the game server, see 'app.server.py'.
+SERVER_HOST: Final[str] = os.environ.get('RPS_SERVER_HOST', '127.0.0.1')
+SERVER_PORT: Final[int] = int(os.environ.get('RPS_SERVER_PORT', 7777))
+# A command longer than this closes the connection.
+SERVER_MAX_LINE_BYTES: Final[int] = 4096
+# Redraw only the lines of the panels that have changed with ANSI
+# escape sequences, see 'view.terminal.py'. Off unless it is '1'.
+ANSI_RENDERING: Final[bool] = os.environ.get('RPS_ANSI_RENDERING') == '1'
+# The screen height of the game server clients, it can't be
+# asked over a plain TCP connection.
+SERVER_SCREEN_ROWS: Final[int] = 24
+# 'text' panels for people or 'json' lines for bots, see 'view.view.py'.
+VIEW_FORMAT: Final[str] = os.environ.get('RPS_VIEW', 'text')
+# Prometheus metrics of the routers, the controllers, the DB layer
+# and the rendering, see 'model.metrics.py'. They are written into
+# METRICS_FILE every METRICS_FILE_INTERVAL_SECONDS seconds and/or served
+# on METRICS_PORT, and they aren't collected at all if neither is set.
+METRICS_FILE: Final[str] = os.environ.get('RPS_METRICS_FILE', '')
+METRICS_FILE_INTERVAL_SECONDS: Final[float] = float(
+    os.environ.get('RPS_METRICS_FILE_INTERVAL_SECONDS', 10)
+)
+METRICS_HOST: Final[str] = '127.0.0.1'
+METRICS_PORT: Final[int] = int(os.environ.get('RPS_METRICS_PORT', 0))
+# The upper bounds of the latency histogram buckets in seconds.
+METRICS_BUCKETS: Final[tuple[float, ...]] = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1
+)
+# Every SQL statement of the game is timed and fingerprinted if the
+# slow query log path is set, see 'model.tracing.py'. Statements that
+# take SLOW_QUERY_MS milliseconds or longer are written into the log
+# (all of them if it is 0), with their 'EXPLAIN ANALYZE' plans if
+# SLOW_QUERY_EXPLAIN is on; it can be switched with SIGUSR1 as well.
+SLOW_QUERY_LOG_PATH: Final[str] = os.environ.get('RPS_SLOW_QUERY_LOG', '')
+SLOW_QUERY_MS: Final[float] = float(
+    os.environ.get('RPS_SLOW_QUERY_MS', 50)
+)
+SLOW_QUERY_EXPLAIN: Final[bool] = (
+    os.environ.get('RPS_SLOW_QUERY_EXPLAIN') == '1'
+)
+# Profile the game into PROFILE_DIR if it is set, see
+# 'model.profiling.py'. PROFILE_MODES are 'cpu' (cProfile) and/or
+# 'memory' (tracemalloc), the profiles and a summary are written every
+# PROFILE_EVERY_COMMANDS commands and when the game exits.
+PROFILE_DIR: Final[str] = os.environ.get('RPS_PROFILE_DIR', '')
+PROFILE_MODES: Final[frozenset[str]] = frozenset(
+    mode.strip()
+    for mode in os.environ.get('RPS_PROFILE', 'cpu,memory').split(',')
+    if mode.strip()
+)
+PROFILE_EVERY_COMMANDS: Final[int] = int(
+    os.environ.get('RPS_PROFILE_EVERY_COMMANDS', 1000)
+)
+PROFILE_TOP: Final[int] = 15
+# Allocation sites are the lines that allocate, more frames
+# only make tracing slower.
+PROFILE_TRACEMALLOC_FRAMES: Final[int] = 1
@@ -5,4 +5,5 @@ GameId = NewType('GameId: str', str)
 GamesWon = NewType('GamesWon: int', int)
 GamesLost = NewType('GamesLost: int', int)
 
-SavedGames = list[tuple[GameId, GamesLost, GamesWon]]
+SavedGame = tuple[GameId, GamesLost, GamesWon]
+SavedGames = list[SavedGame]
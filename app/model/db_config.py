@@ -1,6 +1,9 @@
 import psycopg2
 
+from psycopg2.extensions import connection
+
 from .constants import DSN
+from .schema import create_schema
 
 # I've never worked with psycopg2 directly, and I don't know
 # if I'll need to use it like this in the future. Because of that
@@ -8,29 +11,16 @@ from .constants import DSN
 # I have no idea how to create, manage and move those connectors and cursors
 # properly, and, what's the most important, idk if I need to know :P
 
-conn = psycopg2.connect(dsn=DSN)
-
-cur = conn.cursor()
 
-cur.execute("""create table if not exists game_data (
-    game_id uuid primary key,
-    games_won smallint not null,
-    games_lost smallint not null,
-    max_rounds_per_game smallint not null
-);
-""")
 
-cur.execute("""create table if not exists round_data (
-    game_id uuid unique not null,
-    round smallint not null,
-    rounds_lost smallint not null,
-    total_draws smallint not null,
-    rounds_won smallint not null,
-    user_choice varchar(1) not null,
-    computer_choice varchar(1) not null,
-    foreign key (game_id) references game_data on delete cascade,
-    primary key (game_id, round)
-);
-""")
+def connect(dsn: str = DSN) -> connection:
+    """Connect to the DB and create the game tables if they
+    aren't there yet.
 
-conn.commit()
+    Nothing connects when the game modules are imported, the DB layer
+    calls this when it's used for the first time, so the layers that
+    don't need the DB (e.g. in the benchmarks) work without it.
+    """
+    conn: connection = psycopg2.connect(dsn=dsn)
+    create_schema(conn)
+    return conn
@@ -1,8 +1,25 @@
-from enum import Enum
+from enum import Enum, IntEnum
 
 
-class CacheChoice(Enum):
-    """Enums for the 'IngameCache' class."""
-    ROCK = 'r'
-    PAPER = 'p'
-    SCISSORS = 's'
+class RoundOutcome(Enum):
+    """Enums for the 'GameRules' class.
+
+    Outcomes are always from the user's point of view.
+    """
+    WON = 'won'
+    LOST = 'lost'
+    DRAW = 'draw'
+
+
+class ScoreboardCounter(IntEnum):
+    """Enums for the 'SharedScoreboard' class.
+
+    Values are offsets of the counters inside of a worker slot,
+    per-move counters go right after them.
+    """
+    GAMES_WON = 0
+    GAMES_LOST = 1
+    ROUNDS = 2
+    ROUNDS_WON = 3
+    ROUNDS_LOST = 4
+    DRAWS = 5
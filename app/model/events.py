@@ -0,0 +1,256 @@
+import atexit
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, BinaryIO, Optional
+
+from .constants import (
+    EVENT_LOG_BUFFER_SIZE,
+    EVENT_LOG_FLUSH_SECONDS,
+    EVENT_LOG_GZIP,
+    EVENT_LOG_MAX_BYTES,
+    EVENT_LOG_MAX_PENDING,
+    EVENT_LOG_PATH,
+    EVENT_LOG_ROTATE_SECONDS
+)
+
+
+class EventSink(ABC):
+    """An abstract game event sink."""
+
+    @abstractmethod
+    def emit(self, event: str, data: dict[str, Any]) -> None:
+        """Record a game event.
+
+        This method is called from the game loop,
+        so it must be as cheap as possible.
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """Write all the pending events and release the sink."""
+
+
+class NullEventSink(EventSink):
+    """A sink that drops every event.
+
+    It is used when the event log is disabled.
+    """
+
+    def emit(self, event: str, data: dict[str, Any]) -> None:
+        return
+
+    def close(self) -> None:
+        return
+
+
+class JsonlEventSink(EventSink):
+    """Write game events into newline-delimited JSON files.
+
+    Emitting an event only appends it to an in-memory queue,
+    a background thread serializes queued events and writes them
+    in batches through a large buffer. The current file is rotated
+    when it grows bigger than 'max_bytes' (uncompressed) or gets
+    older than 'rotate_seconds', rotated files get the time they were
+    opened at as a suffix, e.g. 'events.jsonl.20240101T120000123'.
+
+    At most 'max_pending' events are queued, if the thread can't
+    keep up, the oldest ones are dropped. A write that fails (e.g. the
+    disk is full) is reported once and retried with a new file
+    every 'flush_seconds', the events of the failed batch are lost.
+    The dropped and lost events are counted and the count is written
+    into the log as an 'events_dropped' event.
+    """
+
+    __path: str
+    __use_gzip: bool
+    __max_bytes: int
+    __rotate_seconds: float
+    __flush_seconds: float
+    __buffer_size: int
+    __pending: deque[tuple[float, str, dict[str, Any]]]
+    __dropped_count: int
+    __dropped_lock: threading.Lock
+    __lost_count: int
+    __reported_count: int
+    __raw_file: Optional[BinaryIO]
+    __file: Optional[BinaryIO]
+    __file_opened_at: float
+    __file_size: int
+    __wakeup: threading.Event
+    __closed: bool
+    __flusher: threading.Thread
+
+    def __init__(
+            self, path: str, use_gzip: bool = False,
+            max_bytes: int = EVENT_LOG_MAX_BYTES,
+            rotate_seconds: float = EVENT_LOG_ROTATE_SECONDS,
+            flush_seconds: float = EVENT_LOG_FLUSH_SECONDS,
+            buffer_size: int = EVENT_LOG_BUFFER_SIZE,
+            max_pending: int = EVENT_LOG_MAX_PENDING) -> None:
+        self.__path = path + '.gz' if use_gzip else path
+        self.__use_gzip = use_gzip
+        self.__max_bytes = max_bytes
+        self.__rotate_seconds = rotate_seconds
+        self.__flush_seconds = flush_seconds
+        self.__buffer_size = buffer_size
+        self.__pending = deque(maxlen=max_pending)
+        # Events are emitted by the game, the autosave and the shard
+        # threads, so dropped ones are counted under the lock. Only
+        # the flusher thread counts lost ones.
+        self.__dropped_count = 0
+        self.__dropped_lock = threading.Lock()
+        self.__lost_count = 0
+        self.__reported_count = 0
+        self.__raw_file = None
+        self.__file = None
+        self.__file_opened_at = 0.0
+        self.__file_size = 0
+        self.__wakeup = threading.Event()
+        self.__closed = False
+        self.__flusher = threading.Thread(
+            target=self.__run, name='event-sink-flusher', daemon=True
+        )
+        self.__flusher.start()
+
+    @property
+    def dropped_count(self) -> int:
+        """Return the number of events that were never written."""
+        return self.__dropped_count + self.__lost_count
+
+    def emit(self, event: str, data: dict[str, Any]) -> None:
+        pending = self.__pending
+        if len(pending) == pending.maxlen:
+            with self.__dropped_lock:
+                self.__dropped_count += 1
+        pending.append((time.time(), event, data))
+
+    def close(self) -> None:
+        if self.__closed:
+            return
+        self.__closed = True
+        self.__wakeup.set()
+        self.__flusher.join()
+        try:
+            self.__write_pending()
+            self.__close_file()
+        except OSError as error:
+            self.__report_error(error)
+            self.__discard_file()
+
+    def __run(self) -> None:
+        is_failing: bool = False
+        while not self.__closed:
+            self.__wakeup.wait(self.__flush_seconds)
+            try:
+                self.__write_pending()
+                if self.__file is not None:
+                    self.__file.flush()
+            except OSError as error:
+                if not is_failing:
+                    self.__report_error(error)
+                is_failing = True
+                self.__discard_file()
+            else:
+                is_failing = False
+
+    def __write_pending(self) -> None:
+        lines: list[bytes] = []
+        pending = self.__pending
+        while pending:
+            timestamp, event, data = pending.popleft()
+            lines.append(json.dumps(
+                {'ts': timestamp, 'event': event, **data},
+                separators=(',', ':')
+            ).encode())
+        events_count: int = len(lines)
+        dropped_count: int = self.dropped_count
+        if dropped_count > self.__reported_count:
+            lines.append(json.dumps({
+                'ts': time.time(),
+                'event': 'events_dropped',
+                'count': dropped_count - self.__reported_count,
+            }, separators=(',', ':')).encode())
+        if not lines:
+            return
+        lines.append(b'')
+        chunk: bytes = b'\n'.join(lines)
+        try:
+            if self.__file is None or self.__needs_rotation():
+                self.__rotate()
+            self.__file.write(chunk)
+        except OSError:
+            self.__lost_count += events_count
+            raise
+        self.__file_size += len(chunk)
+        self.__reported_count = dropped_count
+
+    def __needs_rotation(self) -> bool:
+        return (self.__file_size >= self.__max_bytes
+                or time.time() - self.__file_opened_at
+                >= self.__rotate_seconds)
+
+    def __rotate(self) -> None:
+        if self.__file is not None:
+            self.__close_file()
+            os.replace(self.__path, self.__get_rotated_path())
+        self.__raw_file = open(
+            self.__path, 'ab', buffering=self.__buffer_size
+        )
+        self.__file = (
+            gzip.GzipFile(fileobj=self.__raw_file, mode='ab')
+            if self.__use_gzip else self.__raw_file
+        )
+        self.__file_opened_at = time.time()
+        self.__file_size = 0
+
+    def __get_rotated_path(self) -> str:
+        opened_at: float = self.__file_opened_at
+        return (
+            f'{self.__path}.'
+            f'{time.strftime("%Y%m%dT%H%M%S", time.localtime(opened_at))}'
+            f'{int(opened_at % 1 * 1000):03d}'
+        )
+
+    def __report_error(self, error: OSError) -> None:
+        print(
+            f'Game events can\'t be written into {self.__path}, '
+            f'they are dropped until it works again: {error}',
+            file=sys.stderr
+        )
+
+    def __discard_file(self) -> None:
+        """Forget the file after a failed write,
+        the next batch opens it again.
+        """
+        for file in (self.__file, self.__raw_file):
+            if file is None:
+                continue
+            try:
+                file.close()
+            except OSError:
+                pass
+        self.__raw_file = None
+        self.__file = None
+
+    def __close_file(self) -> None:
+        if self.__file is None:
+            return
+        self.__file.close()
+        # 'GzipFile' doesn't close a file object it didn't open.
+        self.__raw_file.close()
+        self.__raw_file = None
+        self.__file = None
+
+
+event_sink: EventSink = (
+    JsonlEventSink(EVENT_LOG_PATH, EVENT_LOG_GZIP)
+    if EVENT_LOG_PATH else NullEventSink()
+)
+atexit.register(event_sink.close)
@@ -0,0 +1,192 @@
+import argparse
+import threading
+import time
+
+from typing import Callable, Final, Optional
+
+from psycopg2.extensions import connection
+
+from .constants import (
+    EXPIRY_BATCH_PAUSE_SECONDS,
+    EXPIRY_BATCH_SIZE,
+    EXPIRY_INTERVAL_SECONDS,
+    SAVED_GAMES_CHANNEL,
+    SAVED_GAMES_TTL_SECONDS
+)
+from .notifications import ORIGIN
+
+# The key of the advisory lock held by the job that deletes
+# stale games of a DB, its bytes spell 'rps-exp'.
+EXPIRY_LOCK_KEY: Final[int] = 0x7270732d657870
+
+
+class SavedGamesJanitor:
+    """Delete saved games that haven't been accessed for a long time.
+
+    Stale games are deleted in small batches, every batch is a separate
+    transaction that finds its rows through the 'last_accessed' index
+    and skips rows that are locked by concurrent saves, so the job never
+    holds locks for long and never waits for the game to release them.
+
+    Every game process with a TTL starts the job, but only one of them
+    per DB runs it -> the one that has taken the advisory lock, the
+    others try to take it every interval. The lock is released when
+    its connection is closed, so another process takes over after
+    the leader has exited. Other processes learn about their expired
+    games from the notifications, see 'model.notifications.py'.
+    """
+
+    __connect: Callable[[], connection]
+    __conn: Optional[connection]
+    __ttl_seconds: int
+    __batch_size: int
+    __on_expired: Optional[Callable[[str, list[str]], None]]
+    __is_leader: bool
+    __stopped: threading.Event
+
+    def __init__(
+            self, connect: Callable[[], connection],
+            ttl_seconds: int = SAVED_GAMES_TTL_SECONDS,
+            batch_size: int = EXPIRY_BATCH_SIZE,
+            on_expired: Optional[
+                Callable[[str, list[str]], None]
+            ] = None) -> None:
+        self.__connect = connect
+        self.__conn = None
+        self.__ttl_seconds = ttl_seconds
+        self.__batch_size = batch_size
+        self.__on_expired = on_expired
+        self.__is_leader = False
+        self.__stopped = threading.Event()
+
+    @property
+    def _conn(self) -> connection:
+        # The job connects when it runs for the first time.
+        if self.__conn is None:
+            self.__conn = self.__connect()
+        return self.__conn
+
+    def try_lead(self) -> bool:
+        """Take the advisory lock of the job if no other process
+        holds it and return 'True' if this process runs the job.
+        """
+        if not self.__is_leader:
+            # The lock belongs to the session, so it outlives
+            # the transaction and is taken only once.
+            with self._conn.cursor() as cur:
+                cur.execute(
+                    'SELECT pg_try_advisory_lock(%s)', (EXPIRY_LOCK_KEY,)
+                )
+                self.__is_leader = cur.fetchone()[0]
+            self._conn.commit()
+        return self.__is_leader
+
+    def delete_expired_batch(self) -> list[str]:
+        """Delete one batch of stale games and return their ids.
+
+        Games of all the players are deleted, their ids are passed
+        to 'on_expired' player by player.
+        """
+        with self._conn.cursor() as cur:
+            cur.execute(
+                """WITH expired AS (
+                    DELETE FROM game_data
+                    WHERE ctid IN (
+                        SELECT ctid FROM game_data
+                        WHERE last_accessed < now() - make_interval(
+                            secs => %(ttl_seconds)s
+                        )
+                        ORDER BY last_accessed
+                        LIMIT %(batch_size)s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING game_id, player_id
+                )
+                SELECT game_id, player_id, CASE WHEN %(channel)s <> '' THEN pg_notify(
+                    %(channel)s, json_build_object(
+                        'origin', %(origin)s,
+                        'event', 'delete',
+                        'game_id', game_id,
+                        'player_id', player_id
+                    )::text
+                ) END
+                FROM expired""",
+                {
+                    'ttl_seconds': self.__ttl_seconds,
+                    'batch_size': self.__batch_size,
+                    'channel': SAVED_GAMES_CHANNEL,
+                    'origin': ORIGIN
+                }
+            )
+            expired_games: list[tuple] = cur.fetchall()
+        self._conn.commit()
+        expired_game_ids: list[str] = [row[0] for row in expired_games]
+        if self.__on_expired is not None:
+            players_game_ids: dict[str, list[str]] = {}
+            for game_id, player_id, _ in expired_games:
+                players_game_ids.setdefault(player_id, []).append(game_id)
+            for player_id, game_ids in players_game_ids.items():
+                self.__on_expired(player_id, game_ids)
+        return expired_game_ids
+
+    def delete_expired(self) -> int:
+        """Delete all the stale games batch by batch
+        and return how many of them were deleted.
+        """
+        deleted_games_count: int = 0
+        while not self.__stopped.is_set():
+            expired_game_ids: list[str] = self.delete_expired_batch()
+            deleted_games_count += len(expired_game_ids)
+            if len(expired_game_ids) < self.__batch_size:
+                break
+            # Let concurrent saves through between the batches.
+            time.sleep(EXPIRY_BATCH_PAUSE_SECONDS)
+        return deleted_games_count
+
+    def run(self, interval_seconds: float = EXPIRY_INTERVAL_SECONDS) -> None:
+        """Delete stale games every 'interval_seconds' until stopped,
+        if this process is the one that runs the job.
+        """
+        while not self.__stopped.is_set():
+            if self.try_lead():
+                self.delete_expired()
+            self.__stopped.wait(interval_seconds)
+
+    def start(self) -> threading.Thread:
+        """Run the job in a background thread."""
+        thread = threading.Thread(
+            target=self.run, name='saved-games-janitor', daemon=True
+        )
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        """Stop the job after the current batch."""
+        self.__stopped.set()
+
+
+if __name__ == '__main__':
+    # The job can run as a separate process ->
+    # python -m app.model.expiry [--ttl 86400] [--once]
+    from .db_config import connect
+
+    parser = argparse.ArgumentParser(
+        description='Delete saved games that have not been accessed lately.'
+    )
+    parser.add_argument(
+        '--ttl', type=int, default=SAVED_GAMES_TTL_SECONDS,
+        help='the number of seconds after which a saved game expires'
+    )
+    parser.add_argument(
+        '--once', action='store_true',
+        help='delete stale games once and exit'
+    )
+    args = parser.parse_args()
+    if args.ttl <= 0:
+        parser.error('the TTL must be set with --ttl '
+                     'or RPS_SAVED_GAMES_TTL_SECONDS')
+    janitor = SavedGamesJanitor(connect, ttl_seconds=args.ttl)
+    if args.once:
+        print(f'Deleted {janitor.delete_expired()} stale games')
+    else:
+        janitor.run()
@@ -0,0 +1,343 @@
+import atexit
+import bisect
+import inspect
+import os
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Final, Optional, TypeVar
+
+from .constants import (
+    METRICS_BUCKETS,
+    METRICS_FILE,
+    METRICS_FILE_INTERVAL_SECONDS,
+    METRICS_HOST,
+    METRICS_PORT
+)
+
+T = TypeVar('T')
+
+ROUTER_SECONDS: Final[str] = 'rps_router_seconds'
+CONTROLLER_SECONDS: Final[str] = 'rps_controller_seconds'
+DBMS_SECONDS: Final[str] = 'rps_dbms_seconds'
+RENDER_SECONDS: Final[str] = 'rps_render_seconds'
+QUERY_SECONDS: Final[str] = 'rps_query_seconds'
+QUERY_ROWS_TOTAL: Final[str] = 'rps_query_rows_total'
+INVALID_INPUTS_TOTAL: Final[str] = 'rps_invalid_inputs_total'
+METRICS_HELP: Final[dict[str, str]] = {
+    ROUTER_SECONDS: 'Time to route one command on a panel.',
+    CONTROLLER_SECONDS: 'Time of one controller action.',
+    DBMS_SECONDS: 'Time of one call of the DB layer.',
+    RENDER_SECONDS: 'Time to render one panel or message.',
+    QUERY_SECONDS: 'Time of one SQL statement, see model.tracing.py.',
+    QUERY_ROWS_TOTAL: 'Rows returned or changed by SQL statements.',
+    INVALID_INPUTS_TOTAL: 'Commands that no route of a panel accepts.',
+}
+CONTENT_TYPE: Final[str] = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Metrics(ABC):
+    """An abstract metrics registry.
+
+    The code is instrumented when the objects are created, by
+    wrapping their methods, so instrumentation never has to be
+    checked for on the hot paths.
+    """
+
+    @abstractmethod
+    def time_calls(self, func: Callable[..., T], metric: str,
+                   label: str, value: str) -> Callable[..., T]:
+        """Return 'func' that observes how long every call takes
+        in the 'metric' histogram with the 'label=value' label.
+        """
+
+    def instrument(self, obj: T, metric: str, label: str) -> T:
+        """Time calls of every public method of the object,
+        the methods are labeled with their names.
+
+        Generator methods are left alone, only creating
+        the generator would be timed.
+        """
+        for name in dir(type(obj)):
+            method: Any = inspect.getattr_static(obj, name)
+            if (not name.startswith('_')
+                    and inspect.isfunction(method)
+                    and not inspect.isgeneratorfunction(method)):
+                setattr(obj, name, self.time_calls(
+                    getattr(obj, name), metric, label, name
+                ))
+        return obj
+
+    @abstractmethod
+    def observe(self, metric: str, label: str, value: str,
+                seconds: float) -> None:
+        """Add the time to the 'metric' histogram
+        with the 'label=value' label.
+        """
+
+    @abstractmethod
+    def count(self, metric: str, label: str, value: str,
+              amount: int = 1) -> None:
+        """Increase the 'metric' counter with the 'label=value' label."""
+
+    @abstractmethod
+    def render(self) -> str:
+        """Return the metrics in the Prometheus text format."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Write the metrics for the last time and stop exporting them."""
+
+
+class NullMetrics(Metrics):
+    """Metrics that aren't collected.
+
+    Nothing is wrapped, so they cost nothing. They are used
+    when neither the metrics file nor the port is set.
+    """
+
+    def time_calls(self, func: Callable[..., T], metric: str,
+                   label: str, value: str) -> Callable[..., T]:
+        return func
+
+    def instrument(self, obj: T, metric: str, label: str) -> T:
+        return obj
+
+    def observe(self, metric: str, label: str, value: str,
+                seconds: float) -> None:
+        return
+
+    def count(self, metric: str, label: str, value: str,
+              amount: int = 1) -> None:
+        return
+
+    def render(self) -> str:
+        return ''
+
+    def close(self) -> None:
+        return
+
+
+class LatencyHistogram:
+    """Count observations in buckets with fixed upper bounds.
+
+    The buckets aren't cumulative here, they are summed up
+    when the histogram is rendered.
+    """
+
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    bounds: tuple[float, ...]
+    counts: list[int]
+    sum: float
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # The last bucket is '+Inf'.
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.sum += seconds
+
+    def get_upper_bound(self, percent: float) -> float:
+        """Return the upper bound of the bucket that the percentile
+        falls into, it is 'inf' for the last bucket.
+        """
+        rank: float = sum(self.counts) * percent / 100
+        total: int = 0
+        for bound, bucket_count in zip(self.bounds, self.counts):
+            total += bucket_count
+            if total and total >= rank:
+                return bound
+        return float('inf')
+
+
+class PrometheusMetrics(Metrics):
+    """Collect latency histograms and counters in memory and export
+    them in the Prometheus text format.
+
+    The metrics are written into 'file_path' (through a temporary
+    file, so a collector never reads half of it) every
+    'file_interval_seconds' seconds and when the game exits, and/or
+    served on 'http://host:port/metrics'.
+
+    Observations are made by the game thread only (the query tracer
+    makes them under its own lock), the exporters just read the
+    numbers, so there are no locks on the hot path. A scrape may see
+    a histogram that is one observation behind its sum.
+    """
+
+    __buckets: tuple[float, ...]
+    __histograms: dict[tuple[str, str, str], LatencyHistogram]
+    __counters: dict[tuple[str, str, str], int]
+    __file_path: str
+    __file_interval_seconds: float
+    __wakeup: threading.Event
+    __closed: bool
+    __writer: Optional[threading.Thread]
+    __http_server: Optional[ThreadingHTTPServer]
+
+    def __init__(self, file_path: str = '', port: int = 0,
+                 host: str = METRICS_HOST,
+                 file_interval_seconds: float = METRICS_FILE_INTERVAL_SECONDS,
+                 buckets: tuple[float, ...] = METRICS_BUCKETS) -> None:
+        self.__buckets = buckets
+        self.__histograms = {}
+        self.__counters = {}
+        self.__file_path = file_path
+        self.__file_interval_seconds = file_interval_seconds
+        self.__wakeup = threading.Event()
+        self.__closed = False
+        self.__writer = None
+        self.__http_server = None
+        if file_path:
+            self.__writer = threading.Thread(
+                target=self.__run_writer, name='metrics-writer', daemon=True
+            )
+            self.__writer.start()
+        if port:
+            self.__http_server = ThreadingHTTPServer(
+                (host, port), self.__get_request_handler()
+            )
+            threading.Thread(
+                target=self.__http_server.serve_forever,
+                name='metrics-server', daemon=True
+            ).start()
+
+    def time_calls(self, func: Callable[..., T], metric: str,
+                   label: str, value: str) -> Callable[..., T]:
+        observe: Callable[[float], None] = self.__get_histogram(
+            metric, label, value
+        ).observe
+        perf_counter: Callable[[], float] = time.perf_counter
+
+        @wraps(func)
+        def timed(*args: Any, **kwargs: Any) -> T:
+            started_at: float = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(perf_counter() - started_at)
+
+        return timed
+
+    def observe(self, metric: str, label: str, value: str,
+                seconds: float) -> None:
+        self.__get_histogram(metric, label, value).observe(seconds)
+
+    def count(self, metric: str, label: str, value: str,
+              amount: int = 1) -> None:
+        key: tuple[str, str, str] = (metric, label, value)
+        self.__counters[key] = self.__counters.get(key, 0) + amount
+
+    def render(self) -> str:
+        lines: list[str] = []
+        last_metric: str = ''
+        # 'sorted' copies the items at once, so the game
+        # thread can keep adding new ones in the meantime.
+        for (metric, label, value), histogram in sorted(
+                self.__histograms.items()):
+            if metric != last_metric:
+                lines += self.__get_header(metric, 'histogram')
+                last_metric = metric
+            labels: str = f'{label}="{escape_label_value(value)}"'
+            counts: list[int] = list(histogram.counts)
+            total: int = 0
+            for bound, bucket_count in zip(
+                    (*histogram.bounds, '+Inf'), counts):
+                total += bucket_count
+                lines.append(
+                    f'{metric}_bucket{{{labels},le="{bound}"}} {total}'
+                )
+            lines.append(f'{metric}_sum{{{labels}}} {histogram.sum}')
+            lines.append(f'{metric}_count{{{labels}}} {total}')
+        for (metric, label, value), counter in sorted(
+                self.__counters.items()):
+            if metric != last_metric:
+                lines += self.__get_header(metric, 'counter')
+                last_metric = metric
+            lines.append(
+                f'{metric}{{{label}="{escape_label_value(value)}"}} '
+                f'{counter}'
+            )
+        lines.append('')
+        return '\n'.join(lines)
+
+    def close(self) -> None:
+        if self.__closed:
+            return
+        self.__closed = True
+        if self.__http_server is not None:
+            self.__http_server.shutdown()
+            self.__http_server.server_close()
+        if self.__writer is not None:
+            self.__wakeup.set()
+            self.__writer.join()
+            self.__write_file()
+
+    def __get_histogram(self, metric: str, label: str,
+                        value: str) -> LatencyHistogram:
+        histogram: Optional[LatencyHistogram] = self.__histograms.get(
+            (metric, label, value)
+        )
+        if histogram is None:
+            histogram = self.__histograms[(metric, label, value)] = (
+                LatencyHistogram(self.__buckets)
+            )
+        return histogram
+
+    @staticmethod
+    def __get_header(metric: str, metric_type: str) -> list[str]:
+        return [
+            f'# HELP {metric} {METRICS_HELP.get(metric, metric)}',
+            f'# TYPE {metric} {metric_type}',
+        ]
+
+    def __run_writer(self) -> None:
+        while not self.__closed:
+            self.__wakeup.wait(self.__file_interval_seconds)
+            self.__write_file()
+
+    def __write_file(self) -> None:
+        temp_path: str = f'{self.__file_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as metrics_file:
+            metrics_file.write(self.render())
+        os.replace(temp_path, self.__file_path)
+
+    def __get_request_handler(self) -> type[BaseHTTPRequestHandler]:
+        metrics: PrometheusMetrics = self
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body: bytes = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+        return MetricsRequestHandler
+
+
+def escape_label_value(value: str) -> str:
+    return (
+        value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    )
+
+
+metrics: Metrics = (
+    PrometheusMetrics(METRICS_FILE, METRICS_PORT)
+    if METRICS_FILE or METRICS_PORT else NullMetrics()
+)
+atexit.register(metrics.close)
@@ -1,39 +1,76 @@
+import atexit
+import functools
+import heapq
 import random
 import uuid
 
 from abc import ABC, abstractmethod
-from typing import Any, Final, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Final, Optional
 
 import psycopg2
-import psycopg2.extras
 
-from .custom_dtypes import GameId, GamesLost, GamesWon, SavedGames
-from .db_config import conn, cur
-from .enums import CacheChoice
-from .constants import MAX_SAVED_GAMES
+from psycopg2.extensions import connection, cursor
+
+from .autosave import Autosaver, BackgroundAutosaver, NullAutosaver
+from .catalog import SavedGamesCatalog
+from .custom_dtypes import (
+    GameId,
+    GamesLost,
+    GamesWon,
+    SavedGame,
+    SavedGames
+)
+from .db_config import connect
+from .enums import RoundOutcome as RO
+from .events import event_sink
+from .constants import (
+    AUTOSAVE_EVERY_ROUNDS,
+    AUTOSAVE_EVERY_SECONDS,
+    DSN,
+    HISTORY_KEYFRAME_INTERVAL,
+    MAX_SAVED_GAMES,
+    PLAYER_NAME,
+    SAVED_GAMES_CHANNEL,
+    SAVED_GAMES_TTL_SECONDS,
+    SCOREBOARD_NAME,
+    SHARD_DSNS
+)
+from .expiry import SavedGamesJanitor
+from .metrics import DBMS_SECONDS, metrics
+from .notifications import ORIGIN as NOTIFICATIONS_ORIGIN
+from .notifications import SavedGamesListener
+from .players import get_player_id
+from .rules import game_rules
+from .scoreboard import NullScoreboard, Scoreboard, SharedScoreboard
+from .sharding import HashRing
+from .snapshot import (
+    SavePoints,
+    apply_delta,
+    pack_delta,
+    pack_snapshot,
+    unpack_snapshot
+)
+from .tracing import query_tracer
 
 
 class Cache(ABC):
 
-    _CHOICE: Final[list[str]] = [choice.value for choice in CacheChoice]
+    _CHOICE: Final[tuple[str, ...]] = game_rules.moves
 
     @property
     @abstractmethod
-    def saved_games(self) -> SavedGames:
-        """Return a list of saved games."""
-
-    @saved_games.setter
-    @abstractmethod
-    def saved_games(self, list_: SavedGames) -> None:
-        ...
+    def saved_games(self) -> SavedGamesCatalog:
+        """Return a catalog of saved games."""
 
     @abstractmethod
     def clear_saved_game_id(self) -> None:
         """Reset cached game id."""
 
     @abstractmethod
-    def clear_deleted_game_id(self) -> None:
-        """Remove deleted game id from the cache."""
+    def clear_deleted_game_ids(self) -> None:
+        """Remove deleted game ids from the cache."""
 
     @abstractmethod
     def clear_round_stats(self) -> None:
@@ -41,7 +78,7 @@ class Cache(ABC):
 
     @abstractmethod
     def clear_game_stats(self) -> None:
-        """Reset cached game stats."""
+        """Reset cached game stats and end the current session."""
 
     @staticmethod
     @abstractmethod
@@ -65,12 +102,22 @@ class Cache(ABC):
 
     @property
     @abstractmethod
-    def deleted_game_id(self) -> str:
-        """Return deleted game id."""
+    def session_game_id(self) -> str:
+        """Return the game id the current session is saved under."""
+
+    @session_game_id.setter
+    @abstractmethod
+    def session_game_id(self, game_id: str) -> None:
+        ...
+
+    @property
+    @abstractmethod
+    def deleted_game_ids(self) -> list[str]:
+        """Return deleted game ids."""
 
-    @deleted_game_id.setter
+    @deleted_game_ids.setter
     @abstractmethod
-    def deleted_game_id(self, game_id: str) -> None:
+    def deleted_game_ids(self, game_ids: list[str]) -> None:
         ...
 
     @property
@@ -158,33 +205,103 @@ class Cache(ABC):
         """Cache a win condition for one game."""
 
     @abstractmethod
-    def update_saved_games_count(self) -> None:
+    def update_saved_games_count(self, delta: int) -> None:
         """Update a value of the '__saved_games_count' attribute."""
 
     @abstractmethod
     def set_saved_games_count(self) -> None:
         """Cache a count of saved games."""
 
+    @abstractmethod
+    def use_player(self, player_id: str) -> None:
+        """Switch to the saved games of another player."""
+
+    @abstractmethod
+    def queue_saved_game(self, player_id: str, saved_game: SavedGame,
+                         is_new_game: bool) -> None:
+        """Remember a game of a player that was saved by another
+        process or by the autosave thread.
+
+        This method and the 'queue_deleted_saved_games' one are called
+        from other threads (the autosave one, the expiry job and the
+        notifications listener), so the changes are applied to the
+        cache later, by the game thread.
+        """
+
+    @abstractmethod
+    def queue_deleted_saved_games(self, player_id: str,
+                                  game_ids: list[str]) -> None:
+        """Remember saved games of a player that were deleted
+        by another process or by the expiry job.
+        """
+
+    @abstractmethod
+    def to_bytes(self) -> bytes:
+        """Return a snapshot of the current game session."""
+
+    @abstractmethod
+    def from_bytes(self, snapshot: bytes) -> None:
+        """Restore a game session from its snapshot."""
+
+    @abstractmethod
+    def get_session_state(self) -> dict[str, Any]:
+        """Return the state of the current game session.
+
+        Saved games aren't a part of it, they are shared
+        by all the sessions of the player.
+        """
+
+    @abstractmethod
+    def set_session_state(self, state: Optional[dict[str, Any]]) -> None:
+        """Switch to another game session, 'None' starts a new one."""
+
+
+class PlayerGames:
+    """The saved games of one player, all the sessions
+    of the player share them.
+
+    'count' is the number of saved games until the catalog is
+    loaded, it is 'None' until it is read from the DB.
+    """
+
+    __slots__ = ('catalog', 'count')
+
+    catalog: SavedGamesCatalog
+    count: Optional[int]
+
+    def __init__(self) -> None:
+        self.catalog = SavedGamesCatalog()
+        self.count = None
+
 
 class GameCache(Cache):
-    """Store game data while the game is running."""
+    """Store game data while the game is running.
+
+    The saved games are kept for every player that has played
+    in this process, the current player's ones are used.
+    """
 
     __saved_game_id: str
-    __deleted_game_id: str
+    __session_game_id: str
+    __deleted_game_ids: list[str]
     __current_game_winner: str
     __max_rounds_per_game: int
     __win_condition: Optional[int]
-    __saved_games: SavedGames
-    __saved_games_count: int
+    __player_id: str
+    __player_games: PlayerGames
+    __players_games: dict[str, PlayerGames]
+    __pending_changes: deque[tuple[str, str, Any]]
     __round_stats: dict[str, Any]
     __game_stats: dict[str, Any]
 
     def __init__(self) -> None:
         self.__saved_game_id = ''
-        self.__deleted_game_id = ''
+        self.__session_game_id = ''
+        self.__deleted_game_ids = []
         self.__current_game_winner = ''
-        self.__saved_games = []
-        self.__saved_games_count = 0
+        self.__players_games = {}
+        self.use_player(get_player_id(PLAYER_NAME))
+        self.__pending_changes = deque()
         self.__max_rounds_per_game = 0
         self.__win_condition = None
         self.__round_stats = {
@@ -201,19 +318,15 @@ class GameCache(Cache):
         }
 
     @property
-    def saved_games(self) -> SavedGames:
-        return self.__saved_games
-
-    @saved_games.setter
-    def saved_games(
-            self, list_: SavedGames) -> None:
-        self.__saved_games = list_
+    def saved_games(self) -> SavedGamesCatalog:
+        self.__apply_pending_changes()
+        return self.__player_games.catalog
 
     def clear_saved_game_id(self) -> None:
         self.__saved_game_id = ''
 
-    def clear_deleted_game_id(self) -> None:
-        self.__deleted_game_id = ''
+    def clear_deleted_game_ids(self) -> None:
+        self.__deleted_game_ids = []
 
     def clear_round_stats(self) -> None:
         self.__round_stats = self.get_clear_round_stats()
@@ -222,6 +335,9 @@ class GameCache(Cache):
         self.__game_stats = self.get_clear_game_stats()
         self.__round_stats = self.get_clear_round_stats()
         self.__current_game_winner = ''
+        # The next game is a new session, so
+        # it must not overwrite the previous one.
+        self.__session_game_id = ''
 
     @staticmethod
     def get_clear_round_stats() -> dict:
@@ -250,12 +366,21 @@ class GameCache(Cache):
         self.__saved_game_id = game_id
 
     @property
-    def deleted_game_id(self) -> str:
-        return self.__deleted_game_id
+    def session_game_id(self) -> str:
+        self.__apply_pending_changes()
+        return self.__session_game_id
+
+    @session_game_id.setter
+    def session_game_id(self, game_id: str) -> None:
+        self.__session_game_id = game_id
+
+    @property
+    def deleted_game_ids(self) -> list[str]:
+        return self.__deleted_game_ids
 
-    @deleted_game_id.setter
-    def deleted_game_id(self, game_id: str) -> None:
-        self.__deleted_game_id = game_id
+    @deleted_game_ids.setter
+    def deleted_game_ids(self, game_ids: list[str]) -> None:
+        self.__deleted_game_ids = game_ids
 
     @property
     def round_stats(self) -> dict:
@@ -291,7 +416,12 @@ class GameCache(Cache):
 
     @property
     def saved_games_count(self) -> int:
-        return self.__saved_games_count
+        self.__apply_pending_changes()
+        if self.__player_games.catalog.is_loaded:
+            return len(self.__player_games.catalog)
+        if self.__player_games.count is None:
+            self.set_saved_games_count()
+        return self.__player_games.count
 
     def set_round_stats(self, data: dict) -> None:
         self.__round_stats |= data
@@ -317,21 +447,27 @@ class GameCache(Cache):
         computer_choice: str = self.computer_choice
         self.set_prev_round_choices(user_input, computer_choice)
 
-        choices: tuple = (user_input, computer_choice)
-        match choices:
-            case choices if user_input == computer_choice:
+        round_outcome: str = game_rules.resolve_round(
+            user_input, computer_choice
+        )
+        match round_outcome:
+            case RO.DRAW.value:
                 self.__round_stats['total_draws'] += 1
-            case (
-                    (CacheChoice.SCISSORS.value, CacheChoice.ROCK.value) |
-                    (CacheChoice.ROCK.value, CacheChoice.PAPER.value) |
-                    (CacheChoice.PAPER.value, CacheChoice.SCISSORS.value)
-                ):
+            case RO.LOST.value:
                 self.__round_stats['rounds_lost'] += 1
                 self.__round_stats['round'] += 1
             case _:
                 self.__round_stats['rounds_won'] += 1
                 self.__round_stats['round'] += 1
 
+        event_sink.emit('round_resolved', {
+            'round': self.__round_stats['round'],
+            'user_choice': user_input,
+            'computer_choice': computer_choice,
+            'outcome': round_outcome,
+        })
+        scoreboard.record_round(round_outcome, user_input, computer_choice)
+
     def get_game_winner(self) -> None:
         current_game_winner: str = ''
         if self.__round_stats['rounds_won'] == self.__win_condition:
@@ -342,17 +478,133 @@ class GameCache(Cache):
             current_game_winner = 'computer'
         self.current_game_winner = current_game_winner
 
+        event_sink.emit('game_finished', {
+            'winner': current_game_winner,
+            'max_rounds_per_game': self.__max_rounds_per_game,
+            'rounds_won': self.__round_stats['rounds_won'],
+            'rounds_lost': self.__round_stats['rounds_lost'],
+            'total_draws': self.__round_stats['total_draws'],
+            **self.__game_stats,
+        })
+        scoreboard.record_game(current_game_winner == 'user')
+
     def calculate_win_condition(self, number_from_user: int) -> int:
         return number_from_user // 2 + 1
 
     def set_win_condition(self, number_from_user: int) -> None:
         self.__win_condition = self.calculate_win_condition(number_from_user)
 
-    def update_saved_games_count(self) -> None:
-        self.__saved_games_count = len(self.__saved_games)
+    def update_saved_games_count(self, delta: int) -> None:
+        # The count is only needed until the catalog is loaded,
+        # after that the catalog knows how many games there are.
+        # It is read from the DB when it is needed for the first time.
+        if self.__player_games.count is not None:
+            self.__player_games.count += delta
 
     def set_saved_games_count(self) -> None:
-        self.__saved_games_count = dbms.get_current_saved_games_count()
+        self.__player_games.count = dbms.get_current_saved_games_count()
+
+    def use_player(self, player_id: str) -> None:
+        if player_id not in self.__players_games:
+            self.__players_games[player_id] = PlayerGames()
+        self.__player_id = player_id
+        self.__player_games = self.__players_games[player_id]
+
+    def queue_saved_game(self, player_id: str, saved_game: SavedGame,
+                         is_new_game: bool) -> None:
+        self.__pending_changes.append(
+            ('save', player_id, (saved_game, is_new_game))
+        )
+
+    def queue_deleted_saved_games(self, player_id: str,
+                                  game_ids: list[str]) -> None:
+        self.__pending_changes.append(('delete', player_id, game_ids))
+
+    def __apply_pending_changes(self) -> None:
+        while self.__pending_changes:
+            change, player_id, data = self.__pending_changes.popleft()
+            # The games of a player who hasn't played in this
+            # process are read from the DB when they start.
+            player_games: Optional[PlayerGames] = (
+                self.__players_games.get(player_id)
+            )
+            if player_games is None:
+                continue
+            match change:
+                case 'save':
+                    saved_game, is_new_game = data
+                    player_games.catalog.add(saved_game)
+                    if player_games.count is not None:
+                        player_games.count += is_new_game
+                case 'delete':
+                    player_games.catalog.remove(data)
+                    if player_games.count is not None:
+                        player_games.count -= len(data)
+                    # A session whose game has expired or has been
+                    # deleted by another process is saved as a new
+                    # game, so the max number of saved games is checked.
+                    if (player_id == self.__player_id
+                            and self.__session_game_id in data):
+                        self.__session_game_id = ''
+
+    def to_bytes(self) -> bytes:
+        return pack_snapshot({
+            'game_id': self.__session_game_id,
+            'variant': game_rules.variant,
+            'max_rounds_per_game': self.__max_rounds_per_game,
+            'current_game_winner': self.__current_game_winner,
+            **self.__game_stats,
+            **self.__round_stats,
+        })
+
+    def from_bytes(self, snapshot: bytes) -> None:
+        state: dict[str, Any] = unpack_snapshot(snapshot)
+        if state['variant'] != game_rules.variant:
+            raise ValueError(
+                f'This game was played in the {state["variant"]} variant, '
+                f'but the current one is {game_rules.variant}'
+            )
+        self.set_game_stats(state)
+        self.__round_stats = {
+            key: state[key] for key in self.get_clear_round_stats()
+        }
+        self.__current_game_winner = state['current_game_winner']
+        self.__session_game_id = state['game_id']
+
+    def get_session_state(self) -> dict[str, Any]:
+        return {
+            'saved_game_id': self.__saved_game_id,
+            'session_game_id': self.__session_game_id,
+            'deleted_game_ids': self.__deleted_game_ids,
+            'current_game_winner': self.__current_game_winner,
+            'max_rounds_per_game': self.__max_rounds_per_game,
+            'win_condition': self.__win_condition,
+            'round_stats': self.__round_stats,
+            'game_stats': self.__game_stats,
+        }
+
+    def set_session_state(self, state: Optional[dict[str, Any]]) -> None:
+        if state is None:
+            state = {
+                'saved_game_id': '',
+                'session_game_id': '',
+                'deleted_game_ids': [],
+                'current_game_winner': '',
+                'max_rounds_per_game': 0,
+                'win_condition': None,
+                'round_stats': self.get_clear_round_stats(),
+                'game_stats': self.get_clear_game_stats(),
+            }
+        # Every session has its own stats dicts, so they are
+        # swapped here, not copied.
+        self.__saved_game_id = state['saved_game_id']
+        self.__session_game_id = state['session_game_id']
+        self.__deleted_game_ids = state['deleted_game_ids']
+        self.__current_game_winner = state['current_game_winner']
+        self.__max_rounds_per_game = state['max_rounds_per_game']
+        self.__win_condition = state['win_condition']
+        self.__round_stats = state['round_stats']
+        self.__game_stats = state['game_stats']
 
 
 class DBMS(ABC):
@@ -364,19 +616,42 @@ class DBMS(ABC):
         user is exiting the game.
         """
 
+    @abstractmethod
+    def rollback(self) -> None:
+        """Roll back the transaction of a statement that has failed,
+        so that the connection can be used again.
+        """
+
     @abstractmethod
     def save_game_data(self) -> Optional[str]:
         """Save game data into the DB."""
 
     @abstractmethod
-    def restore_saved_game_session(self, game_id: str) -> Optional[str]:
+    def autosave_game_data(self) -> None:
+        """Save game data in the background if it's time to,
+        this method is called after every round.
+        """
+
+    @abstractmethod
+    def flush_autosave(self, game_ended: bool = False) -> None:
+        """Autosave the rounds that haven't been saved yet, or the
+        game results if the game has ended, and wait until
+        the autosave is written.
+        """
+
+    @abstractmethod
+    def restore_saved_game_session(
+            self, game_id: str,
+            version: Optional[int] = None) -> Optional[str]:
         """Get game data from the DB and 
         send it into the 'IngameCache' class.
+
+        The latest save point is loaded unless 'version' is set.
         """
 
     @abstractmethod
-    def delete_saved_game(self, game_id: str) -> Optional[str]:
-        """Remove a specific saved game from the DB."""
+    def delete_saved_games(self, game_ids: list[str]) -> Optional[str]:
+        """Remove specific saved games from the DB."""
 
     @abstractmethod
     def get_saved_games_data(self) -> SavedGames:
@@ -386,6 +661,19 @@ class DBMS(ABC):
     def get_current_saved_games_count(self) -> int:
         "Return a number of saved games."
 
+    @abstractmethod
+    def get_max_saved_games(self) -> int:
+        """Return how many games the player can keep."""
+
+    @abstractmethod
+    def use_player(self, player_name: str) -> None:
+        """Store and show the games of another player from now on."""
+
+    @property
+    @abstractmethod
+    def player_id(self) -> str:
+        """Return the id of the player whose games are stored."""
+
     @property
     @abstractmethod
     def str_uuid_value(self) -> str:
@@ -395,137 +683,682 @@ class DBMS(ABC):
 class Postgres(DBMS):
     """Provides methods to work with 
     the PostgreSQL DB via psycopg2.
+
+    The public methods keep the game cache in sync with the DB,
+    and the SQL itself lives in the protected methods, so that
+    subclasses can change where the data is stored.
+
+    Only the games of one player are visible through an instance
+    at a time, the server switches the player with 'use_player'.
+
+    The connection is opened with 'connect' when the DB is used for
+    the first time, so creating an instance doesn't need the DB.
     """
 
+    __connect: Callable[[], connection]
+    __player_name: str
+    __registered_player_ids: set[str]
+    __conn: Optional[connection] = None
+    __cur: Optional[cursor] = None
+    _player_id: str
+    _max_saved_games: dict[str, int]
+
+    def __init__(self, connect: Callable[[], connection],
+                 player_name: str = PLAYER_NAME) -> None:
+        self.__connect = connect
+        self.__player_name = player_name
+        self.__registered_player_ids = set()
+        self._player_id = get_player_id(player_name)
+        self._max_saved_games = {}
+
+    @property
+    def _conn(self) -> connection:
+        if self.__conn is None:
+            self.__open_connection()
+        return self.__conn
+
+    @property
+    def _cur(self) -> cursor:
+        if self.__cur is None:
+            self.__open_connection()
+        return self.__cur
+
+    def __open_connection(self) -> None:
+        self.__conn = self.__connect()
+        self.__cur = self.__conn.cursor(
+            cursor_factory=query_tracer.cursor_factory
+        )
+        self._register_player(self.__player_name)
+        self.__registered_player_ids.add(self._player_id)
+
     def close_db_connection(self) -> None:
-        cur.close()
-        conn.close()
+        autosaver.close()
+        event_sink.close()
+        scoreboard.close()
+        self._close_connections()
+
+    def rollback(self) -> None:
+        try:
+            self._rollback()
+        except psycopg2.Error:
+            # The connection is gone, so is the failed transaction.
+            pass
 
     def get_current_saved_games_count(self) -> int:
-        cur.execute('SELECT count(*) FROM game_data')
-        return cur.fetchone()[0]
+        return self._count_saved_games()
+
+    def get_max_saved_games(self) -> int:
+        # The limit is shown after every round, so it is read once
+        # per player, a new limit is used the next time the game starts.
+        max_saved_games: Optional[int] = self._max_saved_games.get(
+            self._player_id
+        )
+        if max_saved_games is None:
+            max_saved_games = self._select_max_saved_games()
+            if max_saved_games is None:
+                max_saved_games = MAX_SAVED_GAMES
+            self._max_saved_games[self._player_id] = max_saved_games
+        return max_saved_games
+
+    def use_player(self, player_name: str) -> None:
+        self._set_player(player_name)
+        game_cache.use_player(self._player_id)
+
+    @property
+    def player_id(self) -> str:
+        return self._player_id
 
     @property
     def str_uuid_value(self) -> str:
         return str(uuid.uuid4())
 
     def save_game_data(self) -> Optional[str]:
-        if self.get_current_saved_games_count() >= MAX_SAVED_GAMES:
-            return '\n**You have reached the max number of saved games!**'
-
-        game_id: GameId = GameId(self.str_uuid_value)
-        cur.execute(
-            """INSERT INTO game_data VALUES (
-                %(game_id)s, 
-                %(games_won)s,
-                %(games_lost)s, 
-                %(max_rounds_per_game)s
-            )""",
-            {
-                'game_id': game_id, 
-                **game_cache.game_stats,
-                'max_rounds_per_game': game_cache.max_rounds_per_game,
-            }
+        # An autosave that is still being written
+        # must not overwrite this save.
+        autosaver.flush()
+        game_id: Optional[GameId] = self.__get_session_game_id()
+        if game_id is None:
+            return 'You have reached the max number of saved games!'
+
+        is_new_game, version = self.__write_game_data(
+            self.__get_game_data(game_id)
         )
-        cur.execute(
-            """INSERT INTO round_data VALUES (
-                %(game_id)s, 
-                %(round)s, 
-                %(rounds_lost)s, 
-                %(total_draws)s, 
-                %(rounds_won)s, 
-                %(user_choice)s, 
-                %(computer_choice)s
-            )""",
-            {'game_id': game_id, **game_cache.round_stats}
-        )
-        conn.commit()
+        autosaver.reset()
 
-        game_cache.saved_game_id = game_id
-        game_cache.saved_games.append(
+        # The save point is shown with the game id, so that
+        # the player can load it later.
+        game_cache.saved_game_id = f'{game_id}@{version}'
+        game_cache.saved_games.add(
             (
                 game_id,
                 GamesLost(game_cache.game_stats['games_lost']),
                 GamesWon(game_cache.game_stats['games_won'])
             )
         )
-        game_cache.update_saved_games_count()
+        if is_new_game:
+            game_cache.update_saved_games_count(1)
+        event_sink.emit('game_saved', {
+            'game_id': game_id,
+            'version': version,
+            'overwritten': not is_new_game,
+            'autosave': False,
+            **game_cache.game_stats,
+            **game_cache.round_stats,
+        })
         return None
 
-    def restore_saved_game_session(self, game_id: str) -> Optional[str]:
-        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-            cur.execute(
-                """
-                WITH t AS (
-                    SELECT 
-                        game_id, 
-                        games_won, 
-                        games_lost,
-                        max_rounds_per_game
-                    FROM game_data 
-                    WHERE game_id = %s
-                )
-                SELECT 
-                    games_won, 
-                    games_lost, 
-                    max_rounds_per_game, 
-                    round, 
-                    rounds_lost, 
-                    total_draws, 
-                    rounds_won, 
-                    user_choice, 
-                    computer_choice 
-                FROM 
-                    t 
-                JOIN 
-                    round_data 
-                USING(game_id)
-                """, (game_id,))
-
-            loaded_game_data: Optional[dict] = cur.fetchone()
-            if not loaded_game_data:
-                return f'There is no game with this game id -> {game_id}'
+    def autosave_game_data(self) -> None:
+        if autosaver.round_played():
+            self.__autosave()
 
-            game_cache.set_game_stats(
-                dict(list(loaded_game_data.items())[:3])
+    def flush_autosave(self, game_ended: bool = False) -> None:
+        if game_ended:
+            autosaver.game_ended()
+        if autosaver.has_unsaved_changes:
+            self.__autosave()
+        autosaver.flush()
+
+    def write_autosave(self, game_data: dict[str, Any]) -> None:
+        """Write an autosave, this method is
+        called by the autosave thread.
+        """
+        try:
+            is_new_game, version = self.__write_game_data(game_data)
+        except psycopg2.Error as error:
+            # The game goes on, the next autosave will try again.
+            self.rollback()
+            event_sink.emit('autosave_failed', {
+                'game_id': game_data['game_id'],
+                'error': str(error),
+            })
+            return
+        # The game thread owns the cache, so the change is queued.
+        game_cache.queue_saved_game(
+            game_data['player_id'],
+            (
+                game_data['game_id'],
+                GamesLost(game_data['games_lost']),
+                GamesWon(game_data['games_won'])
+            ),
+            is_new_game
+        )
+        event_sink.emit('game_saved', {
+            'game_id': game_data['game_id'],
+            'version': version,
+            'overwritten': not is_new_game,
+            'autosave': True,
+            'games_won': game_data['games_won'],
+            'games_lost': game_data['games_lost'],
+        })
+
+    def __write_game_data(
+            self, game_data: dict[str, Any]) -> tuple[bool, int]:
+        """Save game data as the next save point of the game and
+        return whether the game is new and the save point version.
+        """
+        # The save point is stored as a delta from the previous one
+        # if this process has written or loaded it, otherwise the DB
+        # decides that a full snapshot is needed.
+        base_version: int = -1
+        delta: Optional[bytes] = None
+        base: Optional[tuple[int, bytes]] = save_points.get(
+            game_data['game_id']
+        )
+        if base is not None:
+            base_version = base[0]
+            delta = pack_delta(base[1], game_data['snapshot'])
+        is_new_game, version = self._upsert_game({
+            **game_data,
+            'base_version': base_version,
+            'delta': delta,
+        })
+        save_points.put(game_data['game_id'], version, game_data['snapshot'])
+        return is_new_game, version
+
+    def __autosave(self) -> None:
+        game_id: Optional[GameId] = self.__get_session_game_id()
+        if game_id is None:
+            # A new session isn't autosaved if the player has no free
+            # slots, the slots are checked again after the next period.
+            autosaver.reset()
+            return
+        autosaver.save(self.__get_game_data(game_id))
+
+    def __get_session_game_id(self) -> Optional[GameId]:
+        """Return the id the session is saved under,
+        or 'None' if a new session can't be saved.
+        """
+        # A session that has been loaded or saved before is
+        # overwritten in place, so it doesn't take a new slot.
+        game_id: GameId = GameId(game_cache.session_game_id)
+        if not game_id:
+            # The loaded catalog is kept in sync with the DB,
+            # so the games aren't counted there once more.
+            saved_games_count: int = (
+                game_cache.saved_games_count
+                if game_cache.saved_games.is_loaded
+                else self.get_current_saved_games_count()
             )
+            if saved_games_count >= self.get_max_saved_games():
+                return None
+            game_id = GameId(self.str_uuid_value)
+            game_cache.session_game_id = game_id
+        return game_id
 
-            game_cache.set_round_stats(
-                dict(list(loaded_game_data.items())[3:])
+    def __get_game_data(self, game_id: GameId) -> dict[str, Any]:
+        return {
+            'game_id': game_id, 
+            'player_id': self.player_id,
+            **game_cache.game_stats,
+            'max_rounds_per_game': game_cache.max_rounds_per_game,
+            'snapshot': game_cache.to_bytes(),
+        }
+
+    def restore_saved_game_session(
+            self, game_id: str,
+            version: Optional[int] = None) -> Optional[str]:
+        saved_game: Optional[tuple[int, bytes]] = (
+            self._load_snapshot(game_id) if version is None
+            else self._load_save_point(game_id, version)
+        )
+        event_sink.emit('game_loaded', {
+            'game_id': game_id,
+            'version': version,
+            'found': saved_game is not None,
+        })
+        if saved_game is None:
+            if version is None:
+                return f'There is no game with this game id -> {game_id}'
+            return (
+                f'There is no save point {version} '
+                f'of the game with this game id -> {game_id}'
             )
+        version, snapshot = saved_game
+
+        try:
+            game_cache.from_bytes(snapshot)
+        except ValueError as error:
+            return str(error)
+        # Snapshots of the games saved before the session
+        # game id was stored in them don't have it.
+        game_cache.session_game_id = game_id
+        save_points.put(game_id, version, snapshot)
+        autosaver.reset()
+        return None
 
+    def delete_saved_games(self, game_ids: list[str]) -> Optional[str]:
+        deleted_game_ids: set[str] = self._delete_games(game_ids)
+
+        if deleted_game_ids:
+            game_cache.deleted_game_ids = [
+                game_id for game_id in game_ids
+                if game_id in deleted_game_ids
+            ]
+            game_cache.saved_games.remove(deleted_game_ids)
+            game_cache.update_saved_games_count(-len(deleted_game_ids))
+            save_points.discard(deleted_game_ids)
+
+        missing_game_ids: list[str] = [
+            game_id for game_id in game_ids
+            if game_id not in deleted_game_ids
+        ]
+        event_sink.emit('games_deleted', {
+            'game_ids': sorted(deleted_game_ids),
+            'missing_game_ids': missing_game_ids,
+        })
+        if missing_game_ids:
+            return '\n'.join(
+                f'There is no game with this game id -> {game_id}'
+                for game_id in missing_game_ids
+            )
         return None
 
-    def delete_saved_game(self, game_id: str) -> Optional[str]:
-        cur.execute(
-            'SELECT game_id FROM game_data WHERE game_id = %s', (game_id,)
+    def get_saved_games_data(self) -> SavedGames:
+        data: SavedGames = self._select_saved_games()
+        game_cache.saved_games.load(data)
+        return data
+
+    def _set_player(self, player_name: str) -> None:
+        """Run the queries as another player."""
+        if player_name == self.__player_name:
+            return
+        self.__player_name = player_name
+        self._player_id = get_player_id(player_name)
+        # A player is registered when the connection is opened
+        # if it isn't open yet.
+        if (self.__conn is not None
+                and self._player_id not in self.__registered_player_ids):
+            self._register_player(player_name)
+            self.__registered_player_ids.add(self._player_id)
+
+    def _close_connections(self) -> None:
+        """Close the DB connections."""
+        if self.__conn is None:
+            return
+        self.__cur.close()
+        self.__conn.close()
+
+    def _rollback(self) -> None:
+        """Roll back the failed transactions."""
+        self._conn.rollback()
+
+    def _register_player(self, player_name: str) -> None:
+        """Add the player to the DB if they aren't there yet."""
+        self._cur.execute(
+            """INSERT INTO players (player_id, name) VALUES (%s, %s)
+            ON CONFLICT (player_id) DO NOTHING""",
+            (self._player_id, player_name)
         )
+        self._conn.commit()
 
-        if not cur.fetchone():
-            return f'There is no game with this game id -> {game_id}'
+    def _select_max_saved_games(self) -> Optional[int]:
+        """Return the player's own limit of saved games."""
+        self._cur.execute(
+            'SELECT max_saved_games FROM players WHERE player_id = %s',
+            (self._player_id,)
+        )
+        player_data: Optional[tuple] = self._cur.fetchone()
+        self._conn.commit()
+        return None if player_data is None else player_data[0]
+
+    def _count_saved_games(self) -> int:
+        """Return a number of saved games."""
+        self._cur.execute(
+            'SELECT count(*) FROM game_data WHERE player_id = %s',
+            (self._player_id,)
+        )
+        saved_games_count: int = self._cur.fetchone()[0]
+        # Reads end their transaction as well, an idle transaction
+        # would block the schema update of another game process.
+        self._conn.commit()
+        return saved_games_count
+
+    def _upsert_game(self, game_data: dict[str, Any]) -> tuple[bool, int]:
+        """Insert or overwrite a saved game, add a save point to its
+        history and return whether the game has been inserted
+        and the version of the save point.
+
+        The save point is the delta from 'base_version' if it directly
+        follows it, and a full snapshot if it doesn't, if there is no
+        delta or if it's time for a keyframe.
+        """
+        # Other game processes learn about the save from the
+        # notification, see 'model.notifications.py'.
+        self._cur.execute(
+            """WITH saved AS (
+            INSERT INTO game_data (
+                game_id,
+                player_id,
+                games_won,
+                games_lost,
+                max_rounds_per_game,
+                snapshot
+            ) VALUES (
+                %(game_id)s, 
+                %(player_id)s,
+                %(games_won)s,
+                %(games_lost)s, 
+                %(max_rounds_per_game)s,
+                %(snapshot)s
+            )
+            ON CONFLICT (game_id) DO UPDATE SET
+                games_won = EXCLUDED.games_won,
+                games_lost = EXCLUDED.games_lost,
+                max_rounds_per_game = EXCLUDED.max_rounds_per_game,
+                snapshot = EXCLUDED.snapshot,
+                last_accessed = now(),
+                version = game_data.version + 1
+            RETURNING
+                game_id, player_id, games_lost, games_won, version,
+                xmax = 0 AS inserted
+            ), save_point AS (
+                SELECT game_id, version, (
+                    %(delta)s IS NULL
+                    OR version <> %(base_version)s + 1
+                    OR version %% %(keyframe_interval)s = 0
+                ) AS keyframe
+                FROM saved
+            ), history AS (
+                INSERT INTO game_history (game_id, version, keyframe, data)
+                SELECT game_id, version, keyframe,
+                    CASE WHEN keyframe THEN %(snapshot)s ELSE %(delta)s END
+                FROM save_point
+            )
+            SELECT inserted, version, CASE WHEN %(channel)s <> '' THEN pg_notify(
+                %(channel)s, json_build_object(
+                    'origin', %(origin)s,
+                    'event', 'save',
+                    'game_id', game_id,
+                    'player_id', player_id,
+                    'games_lost', games_lost,
+                    'games_won', games_won,
+                    'inserted', inserted
+                )::text
+            ) END
+            FROM saved""",
+            {
+                **game_data,
+                'keyframe_interval': HISTORY_KEYFRAME_INTERVAL,
+                'channel': SAVED_GAMES_CHANNEL,
+                'origin': NOTIFICATIONS_ORIGIN
+            }
+        )
+        is_new_game, version, _ = self._cur.fetchone()
+        self._conn.commit()
+        return is_new_game, version
+
+    def _load_snapshot(self, game_id: str) -> Optional[tuple[int, bytes]]:
+        """Return the version and the snapshot of a saved game."""
+        # Loading a game also keeps it from expiring.
+        self._cur.execute(
+            """UPDATE game_data SET last_accessed = now()
+            WHERE game_id = %s AND player_id = %s
+            RETURNING version, snapshot""",
+            (game_id, self._player_id)
+        )
+        loaded_game_data: Optional[tuple] = self._cur.fetchone()
+        self._conn.commit()
+        if loaded_game_data is None:
+            return None
+        return loaded_game_data[0], bytes(loaded_game_data[1])
+
+    def _load_save_point(
+            self, game_id: str, version: int) -> Optional[tuple[int, bytes]]:
+        """Return the version and the snapshot of a save point."""
+        # The save point is rebuilt from the closest keyframe before
+        # it, so at most 'HISTORY_KEYFRAME_INTERVAL' rows are read.
+        self._cur.execute(
+            """WITH game AS (
+                UPDATE game_data SET last_accessed = now()
+                WHERE game_id = %(game_id)s AND player_id = %(player_id)s
+                RETURNING game_id
+            )
+            SELECT version, data FROM game_history JOIN game USING (game_id)
+            WHERE version <= %(version)s AND version >= (
+                SELECT max(version) FROM game_history
+                WHERE game_id = %(game_id)s
+                AND version <= %(version)s
+                AND keyframe
+            )
+            ORDER BY version""",
+            {
+                'game_id': game_id,
+                'player_id': self._player_id,
+                'version': version
+            }
+        )
+        save_points: list[tuple] = self._cur.fetchall()
+        self._conn.commit()
+        if not save_points or save_points[-1][0] != version:
+            return None
+        snapshot: bytes = bytes(save_points[0][1])
+        for _, delta in save_points[1:]:
+            snapshot = apply_delta(snapshot, bytes(delta))
+        return version, snapshot
+
+    def _delete_games(self, game_ids: list[str]) -> set[str]:
+        """Delete saved games and return ids of the deleted ones."""
+        self._cur.execute(
+            """WITH deleted AS (
+                DELETE FROM game_data
+                WHERE game_id = ANY(%(game_ids)s::uuid[])
+                AND player_id = %(player_id)s
+                RETURNING game_id, player_id
+            )
+            SELECT game_id, CASE WHEN %(channel)s <> '' THEN pg_notify(
+                %(channel)s, json_build_object(
+                    'origin', %(origin)s,
+                    'event', 'delete',
+                    'game_id', game_id,
+                    'player_id', player_id
+                )::text
+            ) END
+            FROM deleted""",
+            {
+                'game_ids': game_ids,
+                'player_id': self._player_id,
+                'channel': SAVED_GAMES_CHANNEL,
+                'origin': NOTIFICATIONS_ORIGIN
+            }
+        )
+        deleted_game_ids: set[str] = {row[0] for row in self._cur.fetchall()}
+        self._conn.commit()
+        return deleted_game_ids
+
+    def _select_saved_games(self) -> SavedGames:
+        """Return data about saved games."""
+        # The column order must match the 'SavedGame' tuple.
+        self._cur.execute(
+            """SELECT game_id, games_lost, games_won FROM game_data
+            WHERE player_id = %s
+            ORDER BY created_at""",
+            (self._player_id,)
+        )
+        saved_games: SavedGames = SavedGames(self._cur.fetchall())
+        self._conn.commit()
+        return saved_games
 
-        cur.execute(
-            'DELETE FROM game_data WHERE game_id = %s', (game_id,)
+    def _select_saved_games_with_created_at(self) -> list[tuple]:
+        """Return data about saved games followed by the time
+        they were created at, the oldest games go first.
+        """
+        self._cur.execute(
+            """SELECT game_id, games_lost, games_won, created_at
+            FROM game_data
+            WHERE player_id = %s
+            ORDER BY created_at""",
+            (self._player_id,)
         )
+        saved_games: list[tuple] = self._cur.fetchall()
+        self._conn.commit()
+        return saved_games
+
 
-        conn.commit()
+class ShardedPostgres(Postgres):
+    """A subclass of the 'Postgres' class that spreads saved
+    games over several PostgreSQL databases.
 
-        game_cache.deleted_game_id = game_id
-        game_cache.saved_games.remove(
-            [tuple_ for tuple_ in game_cache.saved_games
-             if tuple_[0] == game_id][0]
+    Every game id belongs to one shard according to the hash ring,
+    so saving, loading and deleting a game touches only that shard.
+    Counting and listing saved games are sent to all the shards in
+    parallel and their results are merged.
+    """
+
+    __shards: list[Postgres]
+    __ring: HashRing
+    __executor: ThreadPoolExecutor
+
+    def __init__(self, dsns: tuple[str, ...],
+                 player_name: str = PLAYER_NAME) -> None:
+        # The queries go to the shards, the first one stands
+        # for the whole DB where one is needed.
+        super().__init__(functools.partial(connect, dsns[0]), player_name)
+        self.__shards = []
+        for dsn in dsns:
+            self.__shards.append(
+                Postgres(functools.partial(connect, dsn), player_name)
+            )
+        self.__ring = HashRing(len(dsns))
+        self.__executor = ThreadPoolExecutor(
+            max_workers=len(dsns), thread_name_prefix='shard'
         )
-        game_cache.update_saved_games_count()
-        return None
 
-    def get_saved_games_data(self) -> SavedGames:
-        cur.execute('SELECT game_id, games_won, games_lost FROM game_data')
-        data: list = cur.fetchall()
-        game_cache.saved_games = SavedGames(data)
-        return SavedGames(data)
+    def __get_shard(self, game_id: str) -> Postgres:
+        return self.__shards[self.__ring.get_shard(game_id)]
+
+    def _set_player(self, player_name: str) -> None:
+        self._player_id = get_player_id(player_name)
+        for shard in self.__shards:
+            shard._set_player(player_name)
+
+    def _close_connections(self) -> None:
+        self.__executor.shutdown()
+        for shard in self.__shards:
+            shard._close_connections()
+
+    def _rollback(self) -> None:
+        for shard in self.__shards:
+            shard._rollback()
+
+    def _select_max_saved_games(self) -> Optional[int]:
+        # The limit is written to every shard and resharding copies
+        # the players to the new shards, so any shard has it.
+        return self.__shards[0]._select_max_saved_games()
+
+    def _count_saved_games(self) -> int:
+        return sum(self.__executor.map(
+            Postgres._count_saved_games, self.__shards
+        ))
+
+    def _upsert_game(self, game_data: dict[str, Any]) -> tuple[bool, int]:
+        return self.__get_shard(game_data['game_id'])._upsert_game(game_data)
+
+    def _load_snapshot(self, game_id: str) -> Optional[tuple[int, bytes]]:
+        return self.__get_shard(game_id)._load_snapshot(game_id)
+
+    def _load_save_point(
+            self, game_id: str, version: int) -> Optional[tuple[int, bytes]]:
+        return self.__get_shard(game_id)._load_save_point(game_id, version)
+
+    def _delete_games(self, game_ids: list[str]) -> set[str]:
+        shard_game_ids: dict[int, list[str]] = {}
+        for game_id in game_ids:
+            shard_game_ids.setdefault(
+                self.__ring.get_shard(game_id), []
+            ).append(game_id)
+        deleted_game_ids: set[str] = set()
+        for shard_deleted_game_ids in self.__executor.map(
+                lambda shard_idx: (
+                    self.__shards[shard_idx]
+                    ._delete_games(shard_game_ids[shard_idx])
+                ),
+                shard_game_ids):
+            deleted_game_ids |= shard_deleted_game_ids
+        return deleted_game_ids
+
+    def _select_saved_games(self) -> SavedGames:
+        # Every shard returns its games in the creation order,
+        # so they are merged into one list in the same order.
+        return [
+            saved_game[:3]
+            for saved_game in heapq.merge(
+                *self.__executor.map(
+                    Postgres._select_saved_games_with_created_at,
+                    self.__shards
+                ),
+                key=lambda saved_game: saved_game[3]
+            )
+        ]
 
 
-game_cache: Cache = GameCache()
-dbms: DBMS = Postgres()
+scoreboard: Scoreboard = (
+    SharedScoreboard(SCOREBOARD_NAME, list(game_rules.moves))
+    if SCOREBOARD_NAME else NullScoreboard()
+)
+atexit.register(scoreboard.close)
 
-game_cache.set_saved_games_count()
+game_cache: Cache = GameCache()
+save_points: SavePoints = SavePoints()
+dbms: DBMS = metrics.instrument(
+    ShardedPostgres(SHARD_DSNS) if SHARD_DSNS else Postgres(connect),
+    DBMS_SECONDS, 'method'
+)
+
+autosaver: Autosaver = NullAutosaver()
+if AUTOSAVE_EVERY_ROUNDS or AUTOSAVE_EVERY_SECONDS:
+    # Autosaves are written with their own connections, so that
+    # their transactions don't mix with the game ones.
+    autosaver = BackgroundAutosaver(
+        (
+            ShardedPostgres(SHARD_DSNS) if SHARD_DSNS
+            else Postgres(functools.partial(psycopg2.connect, dsn=DSN))
+        ).write_autosave
+    )
+atexit.register(autosaver.close)
+
+
+def start_background_jobs() -> None:
+    """Start the jobs that keep the saved games of this process
+    in sync with the DB, if they are configured.
+
+    They connect to the DB, so the entry points (the game and the
+    game server) start them, importing the model doesn't.
+    """
+    if SAVED_GAMES_CHANNEL:
+        # The listener starts after the saved games are loaded, so the
+        # changes it queues are applied on top of them and never twice.
+        dbms.get_saved_games_data()
+        SavedGamesListener(
+            SHARD_DSNS or (DSN,),
+            on_saved=game_cache.queue_saved_game,
+            on_deleted=game_cache.queue_deleted_saved_games
+        ).start()
+
+    if SAVED_GAMES_TTL_SECONDS:
+        # The job gets its own connections, so that its
+        # transactions don't mix with the game ones.
+        for dsn in SHARD_DSNS or (DSN,):
+            SavedGamesJanitor(
+                functools.partial(psycopg2.connect, dsn=dsn),
+                on_expired=game_cache.queue_deleted_saved_games
+            ).start()
@@ -0,0 +1,113 @@
+import json
+import select
+import threading
+import uuid
+
+from typing import Callable, Final
+
+import psycopg2
+
+from psycopg2 import sql
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT, connection
+
+from .constants import NOTIFICATIONS_POLL_SECONDS, SAVED_GAMES_CHANNEL
+from .custom_dtypes import GameId, GamesLost, GamesWon, SavedGame
+
+
+# Every notification carries the id of the process that has sent it,
+# so a process can skip the changes it has already applied itself.
+ORIGIN: Final[str] = uuid.uuid4().hex
+
+
+class SavedGamesListener:
+    """Apply saves and deletes made by other game processes
+    to the saved games cache of this process.
+
+    Saves and deletes publish a notification in the same statement
+    that changes the row, so a notification is delivered only if the
+    change has been committed. The listener waits for them on its own
+    connections and passes the changes to the callbacks together
+    with the ids of the players whose games have changed.
+    """
+
+    __dsns: tuple[str, ...]
+    __channel: str
+    __on_saved: Callable[[str, SavedGame, bool], None]
+    __on_deleted: Callable[[str, list[str]], None]
+    __conns: list[connection]
+    __stopped: threading.Event
+
+    def __init__(
+            self, dsns: tuple[str, ...],
+            on_saved: Callable[[str, SavedGame, bool], None],
+            on_deleted: Callable[[str, list[str]], None],
+            channel: str = SAVED_GAMES_CHANNEL) -> None:
+        self.__dsns = dsns
+        self.__channel = channel
+        self.__on_saved = on_saved
+        self.__on_deleted = on_deleted
+        self.__conns = []
+        self.__stopped = threading.Event()
+
+    def listen(self) -> None:
+        """Start listening on the channel of every DB."""
+        for dsn in self.__dsns:
+            listen_conn: connection = psycopg2.connect(dsn=dsn)
+            listen_conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with listen_conn.cursor() as cur:
+                cur.execute(
+                    sql.SQL('LISTEN {}').format(sql.Identifier(self.__channel))
+                )
+            self.__conns.append(listen_conn)
+
+    def handle_notifications(self, timeout: float) -> None:
+        """Wait for notifications and pass them to the callbacks."""
+        ready_conns, _, _ = select.select(self.__conns, [], [], timeout)
+        for listen_conn in ready_conns:
+            listen_conn.poll()
+            while listen_conn.notifies:
+                self.__handle(listen_conn.notifies.pop(0).payload)
+
+    def __handle(self, payload: str) -> None:
+        change: dict = json.loads(payload)
+        if change['origin'] == ORIGIN:
+            return
+        match change['event']:
+            case 'save':
+                self.__on_saved(
+                    change['player_id'],
+                    (
+                        GameId(change['game_id']),
+                        GamesLost(change['games_lost']),
+                        GamesWon(change['games_won'])
+                    ),
+                    change['inserted']
+                )
+            case 'delete':
+                self.__on_deleted(change['player_id'], [change['game_id']])
+
+    def run(self) -> None:
+        """Apply notifications until stopped."""
+        if not self.__conns:
+            self.listen()
+        try:
+            while not self.__stopped.is_set():
+                self.handle_notifications(NOTIFICATIONS_POLL_SECONDS)
+        finally:
+            for listen_conn in self.__conns:
+                listen_conn.close()
+
+    def start(self) -> threading.Thread:
+        """Run the listener in a background thread."""
+        # Listening starts right away, so no change made after
+        # this call is missed while the thread is starting.
+        self.listen()
+        thread = threading.Thread(
+            target=self.run, name='saved-games-listener', daemon=True
+        )
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        """Stop the listener after the current wait."""
+        self.__stopped.set()
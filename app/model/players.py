@@ -0,0 +1,71 @@
+import argparse
+import uuid
+
+from typing import Final, Optional
+
+from psycopg2.extensions import connection
+
+from .constants import DSN, PLAYER_NAME_MAX_LENGTH, SHARD_DSNS
+
+
+# Player ids are derived from player names, so every shard
+# knows the id of a player without asking the others.
+PLAYERS_NAMESPACE: Final[uuid.UUID] = uuid.UUID(
+    'a4f0c1de-58a4-4a83-9d3c-5d2f3c1b7e61'
+)
+
+
+def get_player_id(player_name: str) -> str:
+    """Return the id of a player with this name."""
+    return str(uuid.uuid5(PLAYERS_NAMESPACE, player_name))
+
+
+def is_valid_player_name(player_name: str) -> bool:
+    """Return 'True' if a user can play under this name."""
+    return (
+        0 < len(player_name) <= PLAYER_NAME_MAX_LENGTH
+        and player_name.isprintable()
+    )
+
+
+def set_max_saved_games(player_name: str,
+                        max_saved_games: Optional[int],
+                        dsns: tuple[str, ...] = SHARD_DSNS or (DSN,)) -> None:
+    """Set how many games a player can keep, 'None' resets
+    the limit to the default one.
+
+    The limit is written to every shard, so any of them can check it.
+    """
+    # The schema module needs the player ids from this one.
+    from .db_config import connect
+
+    for dsn in dsns:
+        conn: connection = connect(dsn)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """INSERT INTO players (player_id, name, max_saved_games)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (player_id) DO UPDATE SET
+                        max_saved_games = EXCLUDED.max_saved_games""",
+                    (get_player_id(player_name), player_name,
+                     max_saved_games)
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    # python -m app.model.players <player> --max-saved-games 10
+    parser = argparse.ArgumentParser(
+        description='Change how many games a player can keep.'
+    )
+    parser.add_argument('player', help='the player name')
+    parser.add_argument(
+        '--max-saved-games', type=int, default=None,
+        help='the max number of saved games, the default limit '
+             'is used if it is not set'
+    )
+    args = parser.parse_args()
+    set_max_saved_games(args.player, args.max_saved_games)
@@ -0,0 +1,242 @@
+import atexit
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+
+from abc import ABC, abstractmethod
+from functools import wraps
+from typing import Callable, ContextManager, Final, Iterator, Optional
+
+from .constants import (
+    PROFILE_DIR,
+    PROFILE_EVERY_COMMANDS,
+    PROFILE_MODES,
+    PROFILE_TOP,
+    PROFILE_TRACEMALLOC_FRAMES
+)
+
+LOOP_PROFILE: Final[str] = 'loop'
+# Allocations of the profiler itself aren't reported.
+OWN_FILES: Final[frozenset[str]] = frozenset((tracemalloc.__file__, __file__))
+
+Route = Callable[[str], Optional[str]]
+
+
+class Profiler(ABC):
+    """An abstract profiler of the game loop."""
+
+    @abstractmethod
+    def wrap_dispatch(self, route: Route, panel: str) -> Route:
+        """Return the route of the panel that is profiled."""
+
+    @abstractmethod
+    def profile_loop(self) -> ContextManager[None]:
+        """Profile the game loop inside of the context."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Write the profiles for the last time and stop profiling."""
+
+
+class NullProfiler(Profiler):
+    """A profiler that doesn't profile anything.
+
+    Nothing is wrapped, so it costs nothing. It is used
+    when the profiles directory isn't set.
+    """
+
+    def wrap_dispatch(self, route: Route, panel: str) -> Route:
+        return route
+
+    def profile_loop(self) -> ContextManager[None]:
+        return contextlib.nullcontext()
+
+    def close(self) -> None:
+        return
+
+
+class GameProfiler(Profiler):
+    """Profile every panel with cProfile and/or tracemalloc.
+
+    Every panel's dispatches get their own cProfile profile. The game
+    loop has one too, it is paused while a command is dispatched, so
+    it has the rest of the loop -> rendering the panels and waiting
+    for the user's input. Only one profile can be active in a thread.
+
+    Allocations are traced from the start, and the first dispatch
+    of every panel after a dump is sampled -> the allocation sites that
+    grew during it are kept as the panel's top allocation sites.
+    A sample snapshots the whole heap twice, which takes a fraction
+    of a second, so 'every_commands' shouldn't be too small.
+
+    Every 'every_commands' commands the profiles ('.prof' files that
+    'pstats' and snakeviz can read), a tracemalloc snapshot and
+    a summary with the top functions and allocation sites of every
+    panel are written into 'directory', the files are numbered, e.g.
+    '1234-0002-ingame_panel.prof' or '1234-0002-summary.txt'.
+    """
+
+    __directory: str
+    __every_commands: int
+    __top: int
+    __profiles: Optional[dict[str, cProfile.Profile]]
+    __loop_profile: Optional[cProfile.Profile]
+    __traces_memory: bool
+    __panels_to_sample: set[str]
+    __allocations: dict[str, list[tracemalloc.StatisticDiff]]
+    __commands: dict[str, int]
+    __commands_count: int
+    __dumps_count: int
+
+    def __init__(self, directory: str,
+                 modes: frozenset[str] = PROFILE_MODES,
+                 every_commands: int = PROFILE_EVERY_COMMANDS,
+                 top: int = PROFILE_TOP) -> None:
+        self.__directory = directory
+        self.__every_commands = every_commands
+        self.__top = top
+        self.__profiles = {} if 'cpu' in modes else None
+        self.__loop_profile = None
+        self.__traces_memory = 'memory' in modes
+        self.__panels_to_sample = set()
+        self.__allocations = {}
+        self.__commands = {}
+        self.__commands_count = 0
+        self.__dumps_count = 0
+        os.makedirs(directory, exist_ok=True)
+        if self.__traces_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+
+    def wrap_dispatch(self, route: Route, panel: str) -> Route:
+        profile: Optional[cProfile.Profile] = None
+        if self.__profiles is not None:
+            profile = self.__profiles[panel] = cProfile.Profile()
+        self.__commands[panel] = 0
+        if self.__traces_memory:
+            self.__panels_to_sample.add(panel)
+
+        @wraps(route)
+        def profiled(user_input: str) -> Optional[str]:
+            loop_profile: Optional[cProfile.Profile] = self.__loop_profile
+            if loop_profile is not None:
+                loop_profile.disable()
+            before: Optional[tracemalloc.Snapshot] = None
+            if panel in self.__panels_to_sample:
+                before = tracemalloc.take_snapshot()
+            if profile is not None:
+                profile.enable()
+            try:
+                return route(user_input)
+            finally:
+                if profile is not None:
+                    profile.disable()
+                if before is not None:
+                    self.__sample_allocations(panel, before)
+                self.__count_command(panel)
+                if loop_profile is not None:
+                    loop_profile.enable()
+
+        return profiled
+
+    @contextlib.contextmanager
+    def profile_loop(self) -> Iterator[None]:
+        if self.__profiles is None:
+            yield
+            return
+        profile: cProfile.Profile = self.__profiles.setdefault(
+            LOOP_PROFILE, cProfile.Profile()
+        )
+        self.__loop_profile = profile
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self.__loop_profile = None
+
+    def close(self) -> None:
+        if self.__commands_count % self.__every_commands:
+            self.__dump()
+        self.__commands_count = 0
+        if self.__traces_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def __sample_allocations(self, panel: str,
+                             before: tracemalloc.Snapshot) -> None:
+        self.__panels_to_sample.discard(panel)
+        self.__allocations[panel] = get_top_allocation_sites(
+            tracemalloc.take_snapshot().compare_to(before, 'lineno'),
+            self.__top
+        )
+
+    def __count_command(self, panel: str) -> None:
+        self.__commands[panel] += 1
+        self.__commands_count += 1
+        if self.__commands_count % self.__every_commands == 0:
+            self.__dump()
+
+    def __dump(self) -> None:
+        self.__dumps_count += 1
+        path_prefix: str = os.path.join(
+            self.__directory, f'{os.getpid()}-{self.__dumps_count:04}'
+        )
+        summary = io.StringIO()
+        summary.write(f'{self.__commands_count} commands\n')
+        for panel, profile in (self.__profiles or {}).items():
+            commands: Optional[int] = self.__commands.get(panel)
+            if commands == 0:
+                continue
+            # 'Stats' disables the profile, the loop profile
+            # is enabled again by the dispatch that dumps it.
+            stats = pstats.Stats(profile, stream=summary)
+            stats.dump_stats(f'{path_prefix}-{panel}.prof')
+            summary.write(
+                f'\n== {panel}: top functions'
+                f'{"" if commands is None else f" ({commands} commands)"}'
+                f' ==\n'
+            )
+            stats.strip_dirs().sort_stats('cumulative').print_stats(
+                self.__top
+            )
+        if self.__traces_memory:
+            snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+            snapshot.dump(f'{path_prefix}.tracemalloc')
+            for panel, allocations in sorted(self.__allocations.items()):
+                summary.write(
+                    f'\n== {panel}: top allocation sites of one command ==\n'
+                )
+                summary.writelines(f'{stat}\n' for stat in allocations)
+            summary.write('\n== all panels: top allocation sites ==\n')
+            summary.writelines(
+                f'{stat}\n'
+                for stat in get_top_allocation_sites(
+                    snapshot.statistics('lineno'), self.__top
+                )
+            )
+            self.__panels_to_sample.update(self.__commands)
+        with open(f'{path_prefix}-summary.txt', 'w') as summary_file:
+            summary_file.write(summary.getvalue())
+
+
+def get_top_allocation_sites(
+        stats: list[tracemalloc.Statistic | tracemalloc.StatisticDiff],
+        top: int) -> list[tracemalloc.Statistic | tracemalloc.StatisticDiff]:
+    """Return the sites that have allocated the most memory.
+
+    The stats are filtered rather than the snapshots,
+    'Snapshot.filter_traces' takes seconds for a big heap.
+    """
+    return [
+        stat for stat in stats
+        if getattr(stat, 'size_diff', stat.size) > 0
+        and stat.traceback[0].filename not in OWN_FILES
+    ][:top]
+
+
+profiler: Profiler = (
+    GameProfiler(PROFILE_DIR) if PROFILE_DIR else NullProfiler()
+)
+atexit.register(profiler.close)
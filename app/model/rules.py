@@ -0,0 +1,177 @@
+import random
+import re
+
+from functools import lru_cache
+from typing import Final
+
+from .constants import GAME_VARIANT
+from .enums import RoundOutcome as RO
+from .snapshot import CHOICE_MAX_BYTES, VARIANT_MAX_BYTES
+
+
+# Moves of every variant are listed in the cyclic order,
+# so that each move beats the (N - 1) / 2 moves that go right
+# before it (wrapping around) and loses to the ones after it.
+GAME_VARIANTS: Final[dict[str, tuple[tuple[str, str], ...]]] = {
+    'classic': (
+        ('r', 'rock'),
+        ('p', 'paper'),
+        ('s', 'scissors'),
+    ),
+    'rpsls': (
+        ('r', 'rock'),
+        ('k', 'Spock'),
+        ('p', 'paper'),
+        ('l', 'lizard'),
+        ('s', 'scissors'),
+    ),
+}
+CYCLIC_VARIANT_PREFIX: Final[str] = 'cyclic-'
+
+
+class GameRules:
+    """Resolve rounds of a game with N moves.
+
+    The outcome of every pair of moves is calculated once, when
+    the rules are created, so resolving a round is a single dict
+    lookup no matter how many moves the game has. The same rules
+    provide the input pattern for the router and the descriptions
+    of the moves for the view.
+    """
+
+    __variant: str
+    __moves: tuple[str, ...]
+    __move_names: dict[str, str]
+    __outcome_matrix: tuple[tuple[str, ...], ...]
+    __outcomes: dict[tuple[str, str], str]
+    __input_pattern: str
+
+    def __init__(self, variant: str,
+                 moves: tuple[tuple[str, str], ...]) -> None:
+        if len(moves) < 3 or len(moves) % 2 == 0:
+            raise ValueError(
+                f'A game needs an odd number (at least 3) of moves, '
+                f'{variant} has {len(moves)}'
+            )
+        # Saved games keep the variant and the last choices
+        # in fixed-size fields, see 'model.snapshot.py'.
+        if len(variant.encode()) > VARIANT_MAX_BYTES:
+            raise ValueError(
+                f'A variant name can be up to {VARIANT_MAX_BYTES} bytes '
+                f'long -> {variant}'
+            )
+        for move, _ in moves:
+            if len(move.encode()) > CHOICE_MAX_BYTES:
+                raise ValueError(
+                    f'A move can be up to {CHOICE_MAX_BYTES} bytes '
+                    f'long, {variant} has -> {move}'
+                )
+        self.__variant = variant
+        self.__moves = tuple(key for key, _ in moves)
+        self.__move_names = dict(moves)
+        n_moves: int = len(moves)
+        self.__outcome_matrix = tuple(
+            tuple(
+                self.calculate_outcome(user_idx, computer_idx, n_moves)
+                for computer_idx in range(n_moves)
+            )
+            for user_idx in range(n_moves)
+        )
+        self.__outcomes = {
+            (user_choice, computer_choice):
+                self.__outcome_matrix[user_idx][computer_idx]
+            for user_idx, user_choice in enumerate(self.__moves)
+            for computer_idx, computer_choice in enumerate(self.__moves)
+        }
+        # Longer keys go first, otherwise '1' would shadow '11'.
+        self.__input_pattern = '({})'.format('|'.join(
+            re.escape(move)
+            for move in sorted(self.__moves, key=len, reverse=True)
+        ))
+
+    @staticmethod
+    def calculate_outcome(user_idx: int, computer_idx: int,
+                          n_moves: int) -> str:
+        """Return the round outcome for the user."""
+        if user_idx == computer_idx:
+            return RO.DRAW.value
+        if (user_idx - computer_idx) % n_moves <= n_moves // 2:
+            return RO.WON.value
+        return RO.LOST.value
+
+    @property
+    def variant(self) -> str:
+        """Return the variant name."""
+        return self.__variant
+
+    @property
+    def moves(self) -> tuple[str, ...]:
+        """Return the keys of the moves."""
+        return self.__moves
+
+    @property
+    def move_names(self) -> dict[str, str]:
+        """Return the move names by their keys."""
+        return self.__move_names
+
+    @property
+    def outcome_matrix(self) -> tuple[tuple[str, ...], ...]:
+        """Return round outcomes for the user, the rows are the user's
+        moves and the columns are the computer's moves.
+        """
+        return self.__outcome_matrix
+
+    @property
+    def input_pattern(self) -> str:
+        """Return a regex pattern that matches any move."""
+        return self.__input_pattern
+
+    def resolve_round(self, user_choice: str, computer_choice: str) -> str:
+        """Return the round outcome for the user."""
+        return self.__outcomes[(user_choice, computer_choice)]
+
+    def get_beaten_moves(self, move: str) -> list[str]:
+        """Return the keys of the moves that the move beats."""
+        user_idx: int = self.__moves.index(move)
+        return [
+            computer_choice
+            for computer_choice, outcome in zip(
+                self.__moves, self.__outcome_matrix[user_idx]
+            )
+            if outcome == RO.WON.value
+        ]
+
+    def play_random_rounds(
+            self, n_rounds: int, rng: random.Random) -> dict[str, int]:
+        """Play rounds between two random players and
+        count the outcomes for the first one.
+        """
+        outcomes: dict[tuple[str, str], str] = self.__outcomes
+        user_choices: list[str] = rng.choices(self.__moves, k=n_rounds)
+        computer_choices: list[str] = rng.choices(self.__moves, k=n_rounds)
+        counts: dict[str, int] = {outcome.value: 0 for outcome in RO}
+        for choices in zip(user_choices, computer_choices):
+            counts[outcomes[choices]] += 1
+        return counts
+
+
+@lru_cache(maxsize=None)
+def get_game_rules(variant: str) -> GameRules:
+    """Return the rules of a variant.
+
+    Besides the named variants, any 'cyclic-N' variant with an odd N
+    is supported, its moves are numbered from 1 to N.
+    """
+    if variant in GAME_VARIANTS:
+        return GameRules(variant, GAME_VARIANTS[variant])
+    if variant.startswith(CYCLIC_VARIANT_PREFIX):
+        n_moves: int = int(variant.removeprefix(CYCLIC_VARIANT_PREFIX))
+        return GameRules(
+            variant,
+            tuple((str(idx), f'weapon {idx}')
+                  for idx in range(1, n_moves + 1))
+        )
+    raise ValueError(f'There is no game variant -> {variant}')
+
+
+game_rules: GameRules = get_game_rules(GAME_VARIANT)
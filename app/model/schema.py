@@ -0,0 +1,123 @@
+from psycopg2.extensions import connection
+
+from .constants import DEFAULT_PLAYER_NAME
+from .players import get_player_id
+from .snapshot import pack_snapshot
+
+
+def create_schema(conn: connection) -> None:
+    """Create or update the game tables in a database."""
+    cur = conn.cursor()
+
+    cur.execute("""create table if not exists game_data (
+        game_id uuid primary key,
+        games_won smallint not null,
+        games_lost smallint not null,
+        max_rounds_per_game smallint not null,
+        snapshot bytea
+    );
+    """)
+
+    # The whole game session is stored as a packed snapshot,
+    # the other columns are kept for the saved games listing.
+    cur.execute("""alter table game_data
+        add column if not exists snapshot bytea;
+    """)
+
+    # Saved games that haven't been loaded or saved for a long
+    # time are removed by the expiry job, see 'model.expiry.py'.
+    cur.execute("""alter table game_data
+        add column if not exists last_accessed timestamptz
+            not null default now();
+    """)
+    cur.execute("""create index if not exists game_data_last_accessed_idx
+        on game_data (last_accessed);
+    """)
+
+    # Every game belongs to a player, and saved games are counted
+    # and listed per player through the '(player_id, created_at)' index.
+    cur.execute("""create table if not exists players (
+        player_id uuid primary key,
+        name text not null,
+        max_saved_games smallint
+    );
+    """)
+    cur.execute("""alter table game_data
+        add column if not exists player_id uuid,
+        add column if not exists created_at timestamptz
+            not null default now();
+    """)
+    cur.execute("""create index if not exists game_data_player_id_created_at_idx
+        on game_data (player_id, created_at);
+    """)
+    cur.execute(
+        """insert into players (player_id, name) values (%s, %s)
+        on conflict (player_id) do nothing
+        """,
+        (get_player_id(DEFAULT_PLAYER_NAME), DEFAULT_PLAYER_NAME)
+    )
+    cur.execute(
+        'update game_data set player_id = %s where player_id is null',
+        (get_player_id(DEFAULT_PLAYER_NAME),)
+    )
+
+    # Games saved before snapshots were introduced kept
+    # their round stats in a separate 'round_data' table.
+    cur.execute("select to_regclass('round_data') is not null")
+    if cur.fetchone()[0]:
+        cur.execute("""select
+            game_id,
+            max_rounds_per_game,
+            games_won,
+            games_lost,
+            round,
+            rounds_won,
+            rounds_lost,
+            total_draws,
+            user_choice,
+            computer_choice
+        from game_data join round_data using(game_id)
+        where snapshot is null
+        """)
+        columns: list[str] = [column.name for column in cur.description]
+        cur.executemany(
+            'update game_data set snapshot = %s where game_id = %s',
+            [
+                (
+                    pack_snapshot({
+                        **dict(zip(columns, row)),
+                        'variant': 'classic',
+                        'current_game_winner': '',
+                    }),
+                    row[0],
+                )
+                for row in cur.fetchall()
+            ]
+        )
+
+    # Every save of a game is a save point in 'game_history', see
+    # 'Postgres._upsert_game'. 'game_data.version' is the latest one.
+    cur.execute("""alter table game_data
+        add column if not exists version integer not null default 0;
+    """)
+    cur.execute("select to_regclass('game_history') is null")
+    history_is_new: bool = cur.fetchone()[0]
+    cur.execute("""create table if not exists game_history (
+        game_id uuid references game_data on delete cascade,
+        version integer,
+        keyframe boolean not null,
+        data bytea not null,
+        primary key (game_id, version)
+    );
+    """)
+    if history_is_new:
+        # The current snapshots of the games saved before
+        # the history was introduced are their first save points.
+        cur.execute("""insert into game_history
+        select game_id, version, true, snapshot
+        from game_data
+        where snapshot is not null
+        """)
+
+    conn.commit()
+    cur.close()
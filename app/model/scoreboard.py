@@ -0,0 +1,282 @@
+import argparse
+import fcntl
+import os
+import struct
+import tempfile
+import time
+
+from abc import ABC, abstractmethod
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Final, Optional
+
+from .constants import SCOREBOARD_NAME, SCOREBOARD_SLOTS
+from .enums import RoundOutcome as RO, ScoreboardCounter as SC
+
+
+class Scoreboard(ABC):
+    """An abstract scoreboard shared by the game processes."""
+
+    @abstractmethod
+    def record_round(self, round_outcome: str,
+                     user_choice: str, computer_choice: str) -> None:
+        """Count a resolved round."""
+
+    @abstractmethod
+    def record_game(self, user_has_won: bool) -> None:
+        """Count a finished game."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Detach from the scoreboard."""
+
+
+class NullScoreboard(Scoreboard):
+    """A scoreboard that doesn't count anything.
+
+    It is used when the shared scoreboard is disabled.
+    """
+
+    def record_round(self, round_outcome: str,
+                     user_choice: str, computer_choice: str) -> None:
+        return
+
+    def record_game(self, user_has_won: bool) -> None:
+        return
+
+    def close(self) -> None:
+        return
+
+
+class SharedScoreboard(Scoreboard):
+    """Keep game counters in a shared memory block.
+
+    The block has a fixed layout -> a header, labels of the moves
+    and a number of worker slots. Every slot is an array of unsigned
+    64-bit integers: the pid of the process that owns the slot, the
+    'ScoreboardCounter' counters and per-move counters for the user
+    and for the computer. The header keeps the number of the slots
+    and of the moves, so the slots are as big as the game needs.
+
+    Every process writes only into its own slot, so an increment is
+    a plain memory write that can't be lost because of another
+    process, and readers just sum all the slots up. A slot is claimed
+    under a file lock, and slots of dead processes are reused
+    together with their counters, so nothing is lost from the totals.
+    """
+
+    _HEADER: Final[struct.Struct] = struct.Struct('<4sHHH6x')
+    _MAGIC: Final[bytes] = b'RPSB'
+    _VERSION: Final[int] = 2
+    _MOVE_LABEL_SIZE: Final[int] = 8
+
+    __name: str
+    __shm: SharedMemory
+    __counters: memoryview
+    __n_slots: int
+    __slot_size: int
+    __moves: list[str]
+    __move_indexes: dict[str, int]
+    __slot_base: Optional[int]
+
+    def __init__(self, name: str, moves: Optional[list[str]] = None,
+                 n_slots: int = SCOREBOARD_SLOTS,
+                 claim_slot: bool = True) -> None:
+        self.__name = name
+        with open(
+                os.path.join(tempfile.gettempdir(), f'{name}.lock'),
+                'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self.__attach(moves, n_slots)
+            self.__slot_base = self.__claim_slot() if claim_slot else None
+
+    @classmethod
+    def _get_counters_offset(cls, n_moves: int) -> int:
+        return cls._HEADER.size + n_moves * cls._MOVE_LABEL_SIZE
+
+    @staticmethod
+    def _get_slot_size(n_moves: int) -> int:
+        return 1 + len(SC) + 2 * n_moves
+
+    @classmethod
+    def _get_size(cls, n_slots: int, n_moves: int) -> int:
+        return (
+            cls._get_counters_offset(n_moves)
+            + n_slots * cls._get_slot_size(n_moves) * 8
+        )
+
+    def __attach(self, moves: Optional[list[str]], n_slots: int) -> None:
+        if moves is None:
+            self.__shm = SharedMemory(self.__name)
+        else:
+            try:
+                self.__shm = SharedMemory(
+                    self.__name, create=True,
+                    size=self._get_size(n_slots, len(moves))
+                )
+                self.__write_header(moves, n_slots)
+            except FileExistsError:
+                self.__shm = SharedMemory(self.__name)
+        # The block must outlive the process that created it,
+        # it is removed only by the 'unlink' method.
+        resource_tracker.unregister(self.__shm._name, 'shared_memory')
+
+        magic, version, n_slots, n_moves = self._HEADER.unpack_from(
+            self.__shm.buf
+        )
+        if magic != self._MAGIC or version != self._VERSION:
+            self.__shm.close()
+            raise ValueError(
+                f'{self.__name} is not a version {self._VERSION} scoreboard'
+            )
+        self.__n_slots = n_slots
+        self.__slot_size = self._get_slot_size(n_moves)
+        self.__moves = [
+            bytes(self.__shm.buf[offset:offset + self._MOVE_LABEL_SIZE])
+            .rstrip(b'\0').decode()
+            for offset in range(
+                self._HEADER.size,
+                self._HEADER.size + n_moves * self._MOVE_LABEL_SIZE,
+                self._MOVE_LABEL_SIZE
+            )
+        ]
+        if moves is not None and moves != self.__moves:
+            self.__shm.close()
+            raise ValueError(
+                f'{self.__name} counts other moves -> {self.__moves}'
+            )
+        self.__move_indexes = {
+            move: idx for idx, move in enumerate(self.__moves)
+        }
+        self.__counters = (
+            self.__shm.buf[
+                self._get_counters_offset(n_moves):
+                self._get_size(n_slots, n_moves)
+            ]
+            .cast('Q')
+        )
+
+    def __write_header(self, moves: list[str], n_slots: int) -> None:
+        self._HEADER.pack_into(
+            self.__shm.buf, 0,
+            self._MAGIC, self._VERSION, n_slots, len(moves)
+        )
+        for idx, move in enumerate(moves):
+            offset: int = self._HEADER.size + idx * self._MOVE_LABEL_SIZE
+            self.__shm.buf[offset:offset + self._MOVE_LABEL_SIZE] = (
+                move.encode().ljust(self._MOVE_LABEL_SIZE, b'\0')
+            )
+
+    def __claim_slot(self) -> int:
+        pid: int = os.getpid()
+        free_slot_base: Optional[int] = None
+        for slot_base in range(0, len(self.__counters), self.__slot_size):
+            owner_pid: int = self.__counters[slot_base]
+            if owner_pid == pid:
+                return slot_base
+            if free_slot_base is None and not self.__is_alive(owner_pid):
+                free_slot_base = slot_base
+        if free_slot_base is None:
+            raise RuntimeError(
+                f'All {self.__n_slots} slots of {self.__name} are taken'
+            )
+        self.__counters[free_slot_base] = pid
+        return free_slot_base
+
+    @staticmethod
+    def __is_alive(pid: int) -> bool:
+        if pid == 0:
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def record_round(self, round_outcome: str,
+                     user_choice: str, computer_choice: str) -> None:
+        counters: memoryview = self.__counters
+        slot_base: int = self.__slot_base + 1
+        counters[slot_base + SC.ROUNDS] += 1
+        match round_outcome:
+            case RO.WON.value:
+                counters[slot_base + SC.ROUNDS_WON] += 1
+            case RO.LOST.value:
+                counters[slot_base + SC.ROUNDS_LOST] += 1
+            case _:
+                counters[slot_base + SC.DRAWS] += 1
+        moves_base: int = slot_base + len(SC)
+        counters[moves_base + self.__move_indexes[user_choice]] += 1
+        counters[
+            moves_base + len(self.__moves)
+            + self.__move_indexes[computer_choice]
+        ] += 1
+
+    def record_game(self, user_has_won: bool) -> None:
+        self.__counters[
+            self.__slot_base + 1
+            + (SC.GAMES_WON if user_has_won else SC.GAMES_LOST)
+        ] += 1
+
+    def get_totals(self) -> dict[str, Any]:
+        """Return the counters summed up over all the slots."""
+        counters: list[int] = self.__counters.tolist()
+        slot_size: int = self.__slot_size
+        totals: dict[str, Any] = {
+            counter.name.lower(): sum(counters[1 + counter::slot_size])
+            for counter in SC
+        }
+        moves_base: int = 1 + len(SC)
+        for player, offset in (('user', 0),
+                               ('computer', len(self.__moves))):
+            totals[f'{player}_moves'] = {
+                move: sum(counters[moves_base + offset + idx::slot_size])
+                for idx, move in enumerate(self.__moves)
+            }
+        totals['workers'] = sum(
+            self.__is_alive(pid) for pid in counters[::slot_size]
+        )
+        return totals
+
+    def close(self) -> None:
+        if self.__slot_base is not None:
+            self.__counters[self.__slot_base] = 0
+            self.__slot_base = None
+        self.__counters.release()
+        self.__shm.close()
+
+    def unlink(self) -> None:
+        """Remove the shared memory block."""
+        self.__shm.unlink()
+
+
+if __name__ == '__main__':
+    # A monitor that prints the totals without touching the DB ->
+    # python -m app.model.scoreboard [--interval 1] [--unlink]
+    parser = argparse.ArgumentParser(
+        description='Print the shared scoreboard totals.'
+    )
+    parser.add_argument('--name', default=SCOREBOARD_NAME or 'rps_scoreboard')
+    parser.add_argument(
+        '--interval', type=float, default=0,
+        help='print the totals every N seconds instead of once'
+    )
+    parser.add_argument(
+        '--unlink', action='store_true',
+        help='remove the scoreboard after printing the totals'
+    )
+    args = parser.parse_args()
+    monitored_scoreboard = SharedScoreboard(args.name, claim_slot=False)
+    try:
+        while True:
+            print(monitored_scoreboard.get_totals(), flush=True)
+            if not args.interval:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    if args.unlink:
+        monitored_scoreboard.unlink()
+    monitored_scoreboard.close()
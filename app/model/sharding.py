@@ -0,0 +1,170 @@
+import argparse
+import bisect
+import hashlib
+
+import psycopg2
+import psycopg2.extras
+
+from psycopg2.extensions import connection
+
+from .constants import SHARD_MOVE_BATCH_SIZE, SHARD_VIRTUAL_NODES
+from .schema import create_schema
+
+
+class HashRing:
+    """Map game ids to shards with consistent hashing.
+
+    Every shard is placed on the ring many times (virtual nodes), and
+    a game id belongs to the first shard that goes after its hash.
+    Shards are named after their position in the DSN list, so adding
+    a shard at the end of the list only moves about 1/N of the games.
+    """
+
+    __hashes: list[int]
+    __shards: list[int]
+
+    def __init__(self, n_shards: int,
+                 virtual_nodes: int = SHARD_VIRTUAL_NODES) -> None:
+        ring: list[tuple[int, int]] = sorted(
+            (self.get_hash(f'shard{shard}#{node}'), shard)
+            for shard in range(n_shards)
+            for node in range(virtual_nodes)
+        )
+        self.__hashes = [hash_ for hash_, _ in ring]
+        self.__shards = [shard for _, shard in ring]
+
+    @staticmethod
+    def get_hash(key: str) -> int:
+        """Return a stable 64-bit hash of the key."""
+        return int.from_bytes(
+            hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big'
+        )
+
+    def get_shard(self, game_id: str) -> int:
+        """Return the index of the shard that stores the game."""
+        idx: int = bisect.bisect(self.__hashes, self.get_hash(game_id))
+        return self.__shards[idx % len(self.__shards)]
+
+
+def reshard(old_dsns: list[str], new_dsns: list[str],
+            batch_size: int = SHARD_MOVE_BATCH_SIZE) -> int:
+    """Move saved games to the shards that own them in the new
+    DSN list and return how many games were moved.
+
+    Games are copied and committed on the new shard before they are
+    deleted from the old one, so the tool can be stopped and started
+    again at any moment without losing games.
+
+    The players aren't moved, every shard keeps all of them with their
+    limits, so they are copied from the first old shard to the new ones.
+    """
+    new_ring = HashRing(len(new_dsns))
+    new_conns: dict[str, connection] = {}
+    for dsn in new_dsns:
+        new_conns[dsn] = psycopg2.connect(dsn=dsn)
+        create_schema(new_conns[dsn])
+    moved_games_count: int = 0
+
+    players_conn: connection = psycopg2.connect(dsn=old_dsns[0])
+    with players_conn.cursor() as cur:
+        cur.execute('SELECT player_id, name, max_saved_games FROM players')
+        players: list[tuple] = cur.fetchall()
+    players_conn.close()
+    for new_conn in new_conns.values():
+        with new_conn.cursor() as cur:
+            psycopg2.extras.execute_values(
+                cur,
+                'INSERT INTO players (player_id, name, max_saved_games) '
+                'VALUES %s ON CONFLICT (player_id) DO UPDATE SET '
+                'max_saved_games = EXCLUDED.max_saved_games',
+                players
+            )
+        new_conn.commit()
+
+    for old_dsn in old_dsns:
+        old_conn: connection = new_conns.get(old_dsn) or psycopg2.connect(
+            dsn=old_dsn
+        )
+        last_game_id: str = '00000000-0000-0000-0000-000000000000'
+        while True:
+            with old_conn.cursor() as cur:
+                cur.execute(
+                    """SELECT * FROM game_data
+                    WHERE game_id > %s
+                    ORDER BY game_id
+                    LIMIT %s""",
+                    (last_game_id, batch_size)
+                )
+                columns: list[str] = [column.name for column in cur.description]
+                rows: list[tuple] = cur.fetchall()
+            old_conn.commit()
+            if not rows:
+                break
+            last_game_id = rows[-1][0]
+
+            moving_rows: dict[str, list[tuple]] = {}
+            for row in rows:
+                new_dsn: str = new_dsns[new_ring.get_shard(row[0])]
+                if new_dsn != old_dsn:
+                    moving_rows.setdefault(new_dsn, []).append(row)
+            for new_dsn, rows_to_move in moving_rows.items():
+                game_ids: list[str] = [row[0] for row in rows_to_move]
+                # The save points go with the games, deleting
+                # a game deletes its history as well.
+                with old_conn.cursor() as cur:
+                    cur.execute(
+                        'SELECT * FROM game_history '
+                        'WHERE game_id = ANY(%s::uuid[])',
+                        (game_ids,)
+                    )
+                    history_rows: list[tuple] = cur.fetchall()
+                old_conn.commit()
+                with new_conns[new_dsn].cursor() as cur:
+                    psycopg2.extras.execute_values(
+                        cur,
+                        f'INSERT INTO game_data ({", ".join(columns)}) '
+                        'VALUES %s ON CONFLICT (game_id) DO NOTHING',
+                        rows_to_move
+                    )
+                    psycopg2.extras.execute_values(
+                        cur,
+                        'INSERT INTO game_history VALUES %s '
+                        'ON CONFLICT (game_id, version) DO NOTHING',
+                        history_rows
+                    )
+                new_conns[new_dsn].commit()
+                with old_conn.cursor() as cur:
+                    cur.execute(
+                        'DELETE FROM game_data WHERE game_id = ANY(%s::uuid[])',
+                        (game_ids,)
+                    )
+                old_conn.commit()
+                moved_games_count += len(rows_to_move)
+
+        if old_dsn not in new_conns:
+            old_conn.close()
+    for new_conn in new_conns.values():
+        new_conn.close()
+    return moved_games_count
+
+
+if __name__ == '__main__':
+    # python -m app.model.sharding --from 'dsn1;dsn2' --to 'dsn1;dsn2;dsn3'
+    parser = argparse.ArgumentParser(
+        description='Move saved games between shards after the list '
+                    'of shards has changed.'
+    )
+    parser.add_argument(
+        '--from', dest='old_dsns', required=True,
+        help='the current shard DSNs separated with semicolons'
+    )
+    parser.add_argument(
+        '--to', dest='new_dsns', required=True,
+        help='the new shard DSNs separated with semicolons'
+    )
+    args = parser.parse_args()
+    moved_games_count: int = reshard(
+        [dsn.strip() for dsn in args.old_dsns.split(';') if dsn.strip()],
+        [dsn.strip() for dsn in args.new_dsns.split(';') if dsn.strip()]
+    )
+    print(f'Moved {moved_games_count} saved games')
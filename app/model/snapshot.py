@@ -0,0 +1,204 @@
+import struct
+import threading
+import uuid
+
+from collections import OrderedDict
+from typing import Any, Final, Iterable, Optional
+
+from .constants import SAVE_POINTS_MAX_GAMES
+
+
+# Every layout starts with a version byte, so a snapshot written by
+# an older version of the game can still be read after the layout changes.
+SNAPSHOT_VERSION: Final[int] = 1
+SNAPSHOT_LAYOUTS: Final[dict[int, struct.Struct]] = {
+    # version, session game id, variant, max rounds per game,
+    # games won, games lost, round, rounds won, rounds lost,
+    # total draws, user choice, computer choice, current game winner.
+    1: struct.Struct('<B16s16s7H8s8sB'),
+}
+GAME_WINNERS: Final[tuple[str, ...]] = ('', 'user', 'computer')
+# The sizes of the text fields in the layout, struct would silently
+# cut longer values, so they are rejected instead.
+VARIANT_MAX_BYTES: Final[int] = 16
+CHOICE_MAX_BYTES: Final[int] = 8
+
+
+def _encode_field(value: str, max_bytes: int, field: str) -> bytes:
+    """Encode a text field of a snapshot, raise 'ValueError'
+    if it doesn't fit into the layout.
+    """
+    encoded_value: bytes = value.encode()
+    if len(encoded_value) > max_bytes:
+        raise ValueError(
+            f'The {field} -> {value} is longer than {max_bytes} bytes'
+        )
+    return encoded_value
+
+
+def pack_snapshot(state: dict[str, Any]) -> bytes:
+    """Pack a game session state into a snapshot."""
+    return SNAPSHOT_LAYOUTS[SNAPSHOT_VERSION].pack(
+        SNAPSHOT_VERSION,
+        uuid.UUID(state['game_id']).bytes if state['game_id'] else bytes(16),
+        _encode_field(state['variant'], VARIANT_MAX_BYTES, 'variant'),
+        state['max_rounds_per_game'],
+        state['games_won'],
+        state['games_lost'],
+        state['round'],
+        state['rounds_won'],
+        state['rounds_lost'],
+        state['total_draws'],
+        _encode_field(state['user_choice'], CHOICE_MAX_BYTES, 'user choice'),
+        _encode_field(
+            state['computer_choice'], CHOICE_MAX_BYTES, 'computer choice'
+        ),
+        GAME_WINNERS.index(state['current_game_winner']),
+    )
+
+
+def unpack_snapshot(snapshot: bytes) -> dict[str, Any]:
+    """Unpack a snapshot into a game session state."""
+    layout: struct.Struct = SNAPSHOT_LAYOUTS[snapshot[0]]
+    (_, game_id, variant, max_rounds_per_game,
+     games_won, games_lost, round_, rounds_won, rounds_lost, total_draws,
+     user_choice, computer_choice, current_game_winner) = layout.unpack(
+        snapshot
+    )
+    return {
+        'game_id': (
+            str(uuid.UUID(bytes=game_id)) if any(game_id) else ''
+        ),
+        'variant': variant.rstrip(b'\0').decode(),
+        'max_rounds_per_game': max_rounds_per_game,
+        'games_won': games_won,
+        'games_lost': games_lost,
+        'round': round_,
+        'rounds_won': rounds_won,
+        'rounds_lost': rounds_lost,
+        'total_draws': total_draws,
+        'user_choice': user_choice.rstrip(b'\0').decode(),
+        'computer_choice': computer_choice.rstrip(b'\0').decode(),
+        'current_game_winner': GAME_WINNERS[current_game_winner],
+    }
+
+
+# Fields that can change between two saves of the same game,
+# the game id and the variant never change.
+DELTA_FIELDS: Final[tuple[str, ...]] = (
+    'max_rounds_per_game',
+    'games_won',
+    'games_lost',
+    'round',
+    'rounds_won',
+    'rounds_lost',
+    'total_draws',
+    'user_choice',
+    'computer_choice',
+    'current_game_winner',
+)
+
+
+def _pack_varint(value: int) -> bytes:
+    packed = bytearray()
+    while value > 0x7f:
+        packed.append(value & 0x7f | 0x80)
+        value >>= 7
+    packed.append(value)
+    return bytes(packed)
+
+
+def _unpack_varint(data: bytes, offset: int) -> tuple[int, int]:
+    value: int = 0
+    shift: int = 0
+    while True:
+        byte: int = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def pack_delta(old_snapshot: bytes, new_snapshot: bytes) -> bytes:
+    """Pack the fields that differ between two snapshots of a game.
+
+    A delta is a bit mask of the changed fields followed by their
+    new values, numbers are varints and strings are prefixed with
+    their length, so a save after a round takes a few bytes.
+    """
+    old_state: dict[str, Any] = unpack_snapshot(old_snapshot)
+    new_state: dict[str, Any] = unpack_snapshot(new_snapshot)
+    mask: int = 0
+    values = bytearray()
+    for bit, field in enumerate(DELTA_FIELDS):
+        if old_state[field] == new_state[field]:
+            continue
+        mask |= 1 << bit
+        value: int | str = new_state[field]
+        if isinstance(value, str):
+            encoded_value: bytes = value.encode()
+            values += _pack_varint(len(encoded_value)) + encoded_value
+        else:
+            values += _pack_varint(value)
+    return _pack_varint(mask) + bytes(values)
+
+
+def apply_delta(snapshot: bytes, delta: bytes) -> bytes:
+    """Return the snapshot with the delta applied to it."""
+    state: dict[str, Any] = unpack_snapshot(snapshot)
+    mask, offset = _unpack_varint(delta, 0)
+    for bit, field in enumerate(DELTA_FIELDS):
+        if not mask & 1 << bit:
+            continue
+        value, offset = _unpack_varint(delta, offset)
+        if isinstance(state[field], str):
+            state[field] = delta[offset:offset + value].decode()
+            offset += value
+        else:
+            state[field] = value
+    return pack_snapshot(state)
+
+
+class SavePoints:
+    """Keep the latest save point of the games this process has
+    saved or loaded, the next save of a game is packed as a delta
+    from it.
+
+    The game and the autosave writer share one instance, so a delta
+    is always packed from the save point that was written or loaded
+    last, no matter who did it. The DB still makes a full snapshot
+    if the base isn't the previous version of the game, e.g. another
+    process has saved it in the meantime, see 'Postgres._upsert_game'.
+    The least recently saved games are forgotten after 'max_games'.
+    """
+
+    __save_points: OrderedDict[str, tuple[int, bytes]]
+    __max_games: int
+    __lock: threading.Lock
+
+    def __init__(self, max_games: int = SAVE_POINTS_MAX_GAMES) -> None:
+        self.__save_points = OrderedDict()
+        self.__max_games = max_games
+        self.__lock = threading.Lock()
+
+    def get(self, game_id: str) -> Optional[tuple[int, bytes]]:
+        """Return the version and the snapshot of the latest
+        save point of the game.
+        """
+        with self.__lock:
+            return self.__save_points.get(game_id)
+
+    def put(self, game_id: str, version: int, snapshot: bytes) -> None:
+        """Remember the save point that was just written or loaded."""
+        with self.__lock:
+            self.__save_points[game_id] = (version, snapshot)
+            self.__save_points.move_to_end(game_id)
+            if len(self.__save_points) > self.__max_games:
+                self.__save_points.popitem(last=False)
+
+    def discard(self, game_ids: Iterable[str]) -> None:
+        """Forget the save points of deleted games."""
+        with self.__lock:
+            for game_id in game_ids:
+                self.__save_points.pop(game_id, None)
@@ -0,0 +1,336 @@
+import argparse
+import atexit
+import hashlib
+import json
+import re
+import signal
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from typing import Any, Final, Optional, TextIO
+
+import psycopg2
+
+from psycopg2.extensions import cursor
+
+from .constants import (
+    METRICS_BUCKETS,
+    SLOW_QUERY_EXPLAIN,
+    SLOW_QUERY_LOG_PATH,
+    SLOW_QUERY_MS
+)
+from .metrics import QUERY_ROWS_TOTAL, QUERY_SECONDS, LatencyHistogram, metrics
+
+FINGERPRINT_PATTERNS: Final[tuple[tuple[re.Pattern[str], str], ...]] = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'%\(\w+\)s|%s'), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\s+'), ' '),
+)
+# 'EXPLAIN' can't be run for the other statements.
+EXPLAINABLE_STATEMENT: Final[re.Pattern[str]] = re.compile(
+    r'\s*(?:SELECT|INSERT|UPDATE|DELETE|WITH|VALUES)\b', re.IGNORECASE
+)
+
+
+class QueryTracer(ABC):
+    """An abstract tracer of the SQL statements of the game."""
+
+    @property
+    @abstractmethod
+    def cursor_factory(self) -> type[cursor]:
+        """Return the class of the cursors whose statements are traced."""
+
+    @abstractmethod
+    def switch_explain(self) -> None:
+        """Start or stop capturing the plans of slow statements."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Write the stats of the statements and release the log."""
+
+
+class NullQueryTracer(QueryTracer):
+    """A tracer that doesn't trace anything.
+
+    The cursors are plain psycopg2 cursors, so it costs nothing.
+    It is used when the slow query log is disabled.
+    """
+
+    @property
+    def cursor_factory(self) -> type[cursor]:
+        return cursor
+
+    def switch_explain(self) -> None:
+        return
+
+    def close(self) -> None:
+        return
+
+
+class StatementStats:
+    """The stats of the statements with the same fingerprint."""
+
+    __slots__ = ('fingerprint', 'calls', 'rows', 'max_seconds', 'histogram')
+
+    fingerprint: str
+    calls: int
+    rows: int
+    max_seconds: float
+    histogram: LatencyHistogram
+
+    def __init__(self, fingerprint: str,
+                 buckets: tuple[float, ...]) -> None:
+        self.fingerprint = fingerprint
+        self.calls = 0
+        self.rows = 0
+        self.max_seconds = 0.0
+        self.histogram = LatencyHistogram(buckets)
+
+
+class SlowQueryTracer(QueryTracer):
+    """Time every statement executed with the cursors of
+    'cursor_factory' and write the slow ones into a log.
+
+    Statements are grouped by fingerprints -> the query with literals
+    and placeholders replaced with '?', and the fingerprint id is a
+    short hash of it. The latency histogram, the number of calls and
+    rows are kept for every fingerprint, they are written into the log
+    when the game exits and exported as metrics, see 'metrics.py'.
+
+    The log is a JSON lines file. A statement that took 'threshold_ms'
+    or longer gets a line with its time, rows and fingerprint, and its
+    plan if 'explain' is on. The plan is captured by running the
+    statement again with 'EXPLAIN (ANALYZE, FORMAT JSON)' inside
+    a savepoint that is rolled back, so the data isn't changed twice,
+    and it is an error message if the second run fails.
+
+    Statements that raise aren't traced. Shards are queried in
+    parallel, so the stats are updated under a lock.
+    """
+
+    __threshold_seconds: float
+    __explain: bool
+    __buckets: tuple[float, ...]
+    __lock: threading.Lock
+    __log_file: Optional[TextIO]
+    __fingerprints: dict[str, tuple[str, str]]
+    __stats: dict[str, StatementStats]
+    __cursor_factory: type[cursor]
+
+    def __init__(self, log_path: str,
+                 threshold_ms: float = SLOW_QUERY_MS,
+                 explain: bool = SLOW_QUERY_EXPLAIN,
+                 buckets: tuple[float, ...] = METRICS_BUCKETS) -> None:
+        self.__threshold_seconds = threshold_ms / 1000
+        self.__explain = explain
+        self.__buckets = buckets
+        self.__lock = threading.Lock()
+        self.__log_file = open(log_path, 'a', buffering=1)
+        self.__fingerprints = {}
+        self.__stats = {}
+        self.__cursor_factory = self.__get_cursor_factory()
+
+    @property
+    def cursor_factory(self) -> type[cursor]:
+        return self.__cursor_factory
+
+    def record(self, cur: cursor, query: Any, query_vars: Any,
+               seconds: float) -> None:
+        """Add an executed statement to the stats,
+        this method is called by the cursors.
+        """
+        query_text: str = get_query_text(cur, query)
+        rows: int = max(cur.rowcount, 0)
+        with self.__lock:
+            fingerprint: Optional[tuple[str, str]] = (
+                self.__fingerprints.get(query_text)
+            )
+            if fingerprint is None:
+                fingerprint = self.__fingerprints[query_text] = (
+                    get_fingerprint(query_text)
+                )
+            query_id, fingerprint_text = fingerprint
+            stats: Optional[StatementStats] = self.__stats.get(query_id)
+            if stats is None:
+                stats = self.__stats[query_id] = StatementStats(
+                    fingerprint_text, self.__buckets
+                )
+            stats.calls += 1
+            stats.rows += rows
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.histogram.observe(seconds)
+            metrics.observe(QUERY_SECONDS, 'query', query_id, seconds)
+            metrics.count(QUERY_ROWS_TOTAL, 'query', query_id, rows)
+            explain: bool = self.__explain
+        if seconds < self.__threshold_seconds:
+            return
+        entry: dict[str, Any] = {
+            'ts': time.time(),
+            'event': 'slow_query',
+            'query_id': query_id,
+            'ms': round(seconds * 1000, 3),
+            'rows': rows,
+            'fingerprint': fingerprint_text,
+        }
+        if explain and EXPLAINABLE_STATEMENT.match(query_text):
+            entry['plan'] = get_plan(cur, query_text, query_vars)
+        self.__write(entry)
+
+    def switch_explain(self) -> None:
+        with self.__lock:
+            self.__explain = not self.__explain
+        self.__write({
+            'ts': time.time(), 'event': 'explain', 'on': self.__explain
+        })
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__log_file is None:
+                return
+            for query_id, stats in sorted(
+                    self.__stats.items(),
+                    key=lambda item: item[1].histogram.sum, reverse=True):
+                self.__log_file.write(json.dumps({
+                    'ts': time.time(),
+                    'event': 'query_stats',
+                    'query_id': query_id,
+                    'calls': stats.calls,
+                    'rows': stats.rows,
+                    'total_ms': round(stats.histogram.sum * 1000, 3),
+                    'max_ms': round(stats.max_seconds * 1000, 3),
+                    # Percentiles are the upper bounds of their buckets.
+                    **{
+                        f'p{percent}_ms': round(min(
+                            stats.histogram.get_upper_bound(percent),
+                            stats.max_seconds
+                        ) * 1000, 3)
+                        for percent in (50, 90, 99)
+                    },
+                    'fingerprint': stats.fingerprint,
+                }) + '\n')
+            self.__log_file.close()
+            self.__log_file = None
+
+    def __write(self, entry: dict[str, Any]) -> None:
+        line: str = json.dumps(entry, default=str) + '\n'
+        with self.__lock:
+            if self.__log_file is not None:
+                self.__log_file.write(line)
+
+    def __get_cursor_factory(self) -> type[cursor]:
+        tracer: SlowQueryTracer = self
+
+        class TracingCursor(cursor):
+            def execute(self, query: Any, vars: Any = None) -> None:
+                started_at: float = time.perf_counter()
+                super().execute(query, vars)
+                tracer.record(
+                    self, query, vars, time.perf_counter() - started_at
+                )
+
+        return TracingCursor
+
+
+def get_query_text(cur: cursor, query: Any) -> str:
+    if isinstance(query, str):
+        return query
+    if isinstance(query, bytes):
+        return query.decode()
+    # A 'psycopg2.sql' composed query.
+    return query.as_string(cur)
+
+
+def get_fingerprint(query_text: str) -> tuple[str, str]:
+    """Return the id and the fingerprint of the query."""
+    fingerprint: str = query_text
+    for pattern, replacement in FINGERPRINT_PATTERNS:
+        fingerprint = pattern.sub(replacement, fingerprint)
+    fingerprint = fingerprint.strip()
+    return (
+        hashlib.blake2b(fingerprint.encode(), digest_size=6).hexdigest(),
+        fingerprint
+    )
+
+
+def get_plan(cur: cursor, query_text: str, query_vars: Any) -> Any:
+    """Run the statement again with 'EXPLAIN ANALYZE'
+    and roll it back, return the plan.
+    """
+    conn = cur.connection
+    with conn.cursor(cursor_factory=cursor) as explain_cur:
+        explain_cur.execute(
+            'BEGIN' if conn.autocommit else 'SAVEPOINT explain'
+        )
+        try:
+            explain_cur.execute(
+                f'EXPLAIN (ANALYZE, FORMAT JSON) {query_text}', query_vars
+            )
+            return explain_cur.fetchone()[0]
+        except psycopg2.Error as error:
+            return str(error).strip()
+        finally:
+            if conn.autocommit:
+                explain_cur.execute('ROLLBACK')
+            else:
+                explain_cur.execute('ROLLBACK TO SAVEPOINT explain')
+                explain_cur.execute('RELEASE SAVEPOINT explain')
+
+
+query_tracer: QueryTracer = (
+    SlowQueryTracer(SLOW_QUERY_LOG_PATH) if SLOW_QUERY_LOG_PATH
+    else NullQueryTracer()
+)
+atexit.register(query_tracer.close)
+# Signal handlers can be set only in the main thread.
+if (SLOW_QUERY_LOG_PATH and hasattr(signal, 'SIGUSR1')
+        and threading.current_thread() is threading.main_thread()):
+    signal.signal(
+        signal.SIGUSR1, lambda signum, frame: query_tracer.switch_explain()
+    )
+
+
+if __name__ == '__main__':
+    # Sum up the statement stats of all the runs in a slow query log ->
+    # python -m app.model.tracing slow_queries.jsonl [--top 10]
+    parser = argparse.ArgumentParser(
+        description='Show the statements that took the most time.'
+    )
+    parser.add_argument('log', help='a slow query log of the game')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    totals: dict[str, dict[str, Any]] = {}
+    with open(args.log) as log_file:
+        for line in log_file:
+            entry: dict[str, Any] = json.loads(line)
+            if entry['event'] not in ('slow_query', 'query_stats'):
+                continue
+            total: dict[str, Any] = totals.setdefault(entry['query_id'], {
+                'calls': 0, 'rows': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                'p99_ms': 0.0, 'slow': 0,
+                'fingerprint': entry['fingerprint'],
+            })
+            if entry['event'] == 'slow_query':
+                total['slow'] += 1
+                continue
+            for key in ('calls', 'rows', 'total_ms'):
+                total[key] += entry[key]
+            for key in ('max_ms', 'p99_ms'):
+                total[key] = max(total[key], entry[key])
+
+    print(
+        f'{"query id":<14}{"calls":>8}{"rows":>8}{"total, ms":>12}'
+        f'{"mean, ms":>10}{"p99, ms":>10}{"max, ms":>10}{"slow":>6}  query'
+    )
+    for query_id, total in sorted(
+            totals.items(), key=lambda item: item[1]['total_ms'],
+            reverse=True)[:args.top]:
+        print(
+            f'{query_id:<14}{total["calls"]:>8}{total["rows"]:>8}'
+            f'{total["total_ms"]:>12.1f}'
+            f'{total["total_ms"] / (total["calls"] or 1):>10.3f}'
+            f'{total["p99_ms"]:>10.3f}{total["max_ms"]:>10.3f}'
+            f'{total["slow"]:>6}  {total["fingerprint"][:60]}'
+        )
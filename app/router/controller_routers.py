@@ -1,3 +1,4 @@
+import inspect
 import re
 
 from abc import ABC, abstractmethod
@@ -22,10 +23,11 @@ from ..controller.enums import (
 )
 from ..controller.regex_patterns import (
     MAX_ROUNDS_PER_GAME,
-    ROCK_PAPER_SCISSORS,
-    UUID_
+    GAME_IDS
 )
-from .custom_dtypes import PathOptions
+from ..model.metrics import CONTROLLER_SECONDS, metrics
+from ..model.rules import game_rules
+from .custom_dtypes import PathOptions, Route
 from .enums import GamePanel as GP
 
 
@@ -35,26 +37,64 @@ class ControllerRouter(ABC):
 
     Subclasses combine input values that they must
     handle with the corresponding methods of the 
-    appropriate controller in a list of tuples.
+    appropriate controller in a list of tuples,
+    and call 'compile_path_options' after that.
+
+    Path options are compiled once: options that are plain
+    strings (like 'q' or a menu number) go into a dict, so they
+    are found with one lookup, the others are compiled regexes
+    that are tried in order. Whether a method takes the user's
+    input is decided here as well, not on every call, and so is
+    whether its calls are timed, see 'model.metrics.py'.
     """
 
+    __literal_routes: dict[str, Route]
+    __pattern_routes: list[tuple[re.Pattern[str], Route]]
+
     @property
     @abstractmethod
     def path_options(self) -> PathOptions:
         """Return path options."""
 
+    def compile_path_options(self) -> None:
+        """Build the dispatch table from the path options."""
+        self.__literal_routes = {}
+        self.__pattern_routes = []
+        for input_option, logic in self.path_options:
+            route: Route = (
+                metrics.time_calls(
+                    logic, CONTROLLER_SECONDS, 'action', logic.__qualname__
+                ),
+                bool(inspect.signature(logic).parameters)
+            )
+            # A plain string can go into the dict only if none
+            # of the patterns before it match the same input,
+            # so the first matching option still wins.
+            if (re.escape(input_option) == input_option
+                    and not any(
+                        pattern.fullmatch(input_option)
+                        for pattern, _ in self.__pattern_routes
+                    )):
+                self.__literal_routes.setdefault(input_option, route)
+            else:
+                self.__pattern_routes.append(
+                    (re.compile(input_option), route)
+                )
+
     def route_user_input(self, user_input: str) -> Optional[str]:
         """Route the user's input to the appropriate method of the controller."""
-        for input_option, logic in self.path_options:
-            if re.fullmatch(input_option, user_input):
-                # I use 'try-except' because I don't wanna
-                # add 'if user_input...' in particular
-                # methods of the controller classes.
-                try:
-                    return logic(user_input)
-                except TypeError:
-                    return logic()
-        return get_invalid_user_input_message(user_input)
+        route: Optional[Route] = self.__literal_routes.get(user_input)
+        if route is None:
+            for pattern, pattern_route in self.__pattern_routes:
+                if pattern.fullmatch(user_input):
+                    route = pattern_route
+                    break
+            else:
+                return get_invalid_user_input_message(user_input)
+        logic, takes_user_input = route
+        if takes_user_input:
+            return logic(user_input)
+        return logic()
 
 
 class MainMenuPanelRouter(ControllerRouter):
@@ -92,6 +132,7 @@ class MainMenuPanelRouter(ControllerRouter):
                 main_menu_panel_controller.quit_game_from_main_menu
             ),
         ]
+        self.compile_path_options()
 
     @property
     def path_options(self) -> PathOptions:
@@ -114,10 +155,11 @@ class GameIdInputPanelRouter(ControllerRouter):
                 .quit_to_main_menu_from_game_id_input_panel
             ),
             (
-                UUID_,
+                GAME_IDS,
                 game_id_input_panel_controller.process_user_intentions
             ),
         ]
+        self.compile_path_options()
 
     @property
     def path_options(self) -> PathOptions:
@@ -147,10 +189,11 @@ class IngamePanelRouter(ControllerRouter):
                 ingame_panel_controller.quit_to_main_menu
             ),
             (
-                ROCK_PAPER_SCISSORS,
+                game_rules.input_pattern,
                 ingame_panel_controller.continue_default_game
             ),
         ]
+        self.compile_path_options()
 
     @property
     def path_options(self) -> PathOptions:
@@ -180,6 +223,7 @@ class ContinueGamePanelRoute(ControllerRouter):
                 continue_game_panel_controller.continue_playing
             ),
         ]
+        self.compile_path_options()
 
     @property
     def path_options(self) -> PathOptions:
@@ -205,6 +249,7 @@ class RoundAmountPanelRouter(ControllerRouter):
                 round_amount_panel_controller.start_game
             ),
         ]
+        self.compile_path_options()
 
     @property
     def path_options(self) -> PathOptions:
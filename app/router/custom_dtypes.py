@@ -2,3 +2,5 @@ from typing import Callable, Optional
 
 
 PathOptions = list[tuple[str, Callable[..., Optional[str]]]]
+# A handler and whether it takes the user's input.
+Route = tuple[Callable[..., Optional[str]], bool]
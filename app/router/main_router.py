@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Callable, Optional
 
 from .controller_routers import (ControllerRouter, continue_game_panel_router,
                                  game_id_input_panel_router,
@@ -6,6 +6,8 @@ from .controller_routers import (ControllerRouter, continue_game_panel_router,
                                  round_amount_panel_router,
                                  static_panel_router)
 from .enums import GamePanel as GP
+from ..model.metrics import ROUTER_SECONDS, metrics
+from ..model.profiling import profiler
 
 
 class MainRouter:
@@ -16,20 +18,27 @@ class MainRouter:
     to route the user's input to those objects.
     """
 
-    __controller_routers: dict[str, ControllerRouter]
+    __routes: dict[str, Callable[[str], Optional[str]]]
 
     def __init__(self):
-        self.__controller_routers = {
+        controller_routers: dict[str, ControllerRouter] = {
             GP.MAIN_MENU_PANEL.value: main_menu_panel_router,
             GP.GAME_ID_INPUT_PANEL.value: game_id_input_panel_router,
             GP.INGAME_PANEL.value: ingame_panel_router,
             GP.CONTINUE_GAME_PANEL.value: continue_game_panel_router,
             GP.ROUND_AMOUNT_PANEL.value: round_amount_panel_router,
         }
+        self.__routes = {
+            panel: metrics.time_calls(
+                profiler.wrap_dispatch(router.route_user_input, panel),
+                ROUTER_SECONDS, 'panel', panel
+            )
+            for panel, router in controller_routers.items()
+        }
 
     def route_user_input(self, user_input: str, action: str) -> Optional[str]:
         """Route the user's input to the appropriate controller router."""
-        return self.__controller_routers[action].route_user_input(user_input)
+        return self.__routes[action](user_input)
 
     # I can combine this function with the function above and remove
     # the static controller, but I think that it is better to separate them.
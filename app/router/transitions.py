@@ -0,0 +1,40 @@
+from typing import Final
+
+from ..controller.enums import GameEvent as GE
+from .enums import GamePanel as GP
+
+
+# (the current panel, what the input has led to) -> the next panel.
+# The session stays on the panel if the input hasn't led to any event
+# (an invalid input, a round that isn't the last one, a save,
+# listing saved games or displaying the game rules).
+TRANSITIONS: Final[dict[tuple[str, GE], str]] = {
+    (GP.MAIN_MENU_PANEL.value, GE.START_NEW_GAME):
+        GP.ROUND_AMOUNT_PANEL.value,
+    (GP.MAIN_MENU_PANEL.value, GE.LOAD_SAVED_GAME):
+        GP.GAME_ID_INPUT_PANEL.value,
+    (GP.MAIN_MENU_PANEL.value, GE.DELETE_SAVED_GAME):
+        GP.GAME_ID_INPUT_PANEL.value,
+
+    (GP.GAME_ID_INPUT_PANEL.value, GE.GAME_LOADED):
+        GP.INGAME_PANEL.value,
+    (GP.GAME_ID_INPUT_PANEL.value, GE.GAMES_DELETED):
+        GP.MAIN_MENU_PANEL.value,
+    (GP.GAME_ID_INPUT_PANEL.value, GE.QUIT_TO_MAIN_MENU):
+        GP.MAIN_MENU_PANEL.value,
+
+    (GP.ROUND_AMOUNT_PANEL.value, GE.ROUNDS_SET):
+        GP.INGAME_PANEL.value,
+    (GP.ROUND_AMOUNT_PANEL.value, GE.QUIT_TO_MAIN_MENU):
+        GP.MAIN_MENU_PANEL.value,
+
+    (GP.INGAME_PANEL.value, GE.GAME_OVER):
+        GP.CONTINUE_GAME_PANEL.value,
+    (GP.INGAME_PANEL.value, GE.QUIT_TO_MAIN_MENU):
+        GP.MAIN_MENU_PANEL.value,
+
+    (GP.CONTINUE_GAME_PANEL.value, GE.PLAY_AGAIN):
+        GP.ROUND_AMOUNT_PANEL.value,
+    (GP.CONTINUE_GAME_PANEL.value, GE.QUIT_TO_MAIN_MENU):
+        GP.MAIN_MENU_PANEL.value,
+}
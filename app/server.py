@@ -0,0 +1,186 @@
+import argparse
+import asyncio
+import contextlib
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Final, Optional
+
+import psycopg2
+
+from .model.constants import (
+    SERVER_HOST,
+    SERVER_MAX_LINE_BYTES,
+    SERVER_PORT,
+    SERVER_SCREEN_ROWS
+)
+from .model.model import dbms, start_background_jobs
+from .model.players import is_valid_player_name
+from .session import GameSession
+from .view.terminal import DiffRenderer
+from .view.view import message_renderer
+
+
+# Every response ends with this byte, so a client knows when to send
+# the next command. Terminals don't show it, so the game can be played
+# with 'nc' or 'telnet' as well.
+END_OF_RESPONSE: Final[bytes] = b'\0'
+
+
+class GameServer:
+    """Serve the game to many users over TCP at once.
+
+    Every connection has its own game session. The user sends their
+    player name first, the session's games are saved, listed and
+    loaded as that player. After that the user sends one command
+    per line and gets the next panel back. The sessions
+    share the routers, controllers and the DB connection of the
+    process, so the game steps run one at a time in a single worker
+    thread: the state of a session is resumed before its step and
+    suspended after it. The event loop itself only waits for
+    the sockets, so idle connections cost next to nothing.
+
+    If 'ansi' is set, every connection gets only the changes
+    of its screen, see 'DiffRenderer'.
+    """
+
+    __executor: ThreadPoolExecutor
+    __connections_count: int
+    __ansi: bool
+
+    def __init__(self, ansi: bool = False) -> None:
+        self.__executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='game-step'
+        )
+        self.__connections_count = 0
+        self.__ansi = ansi
+
+    @property
+    def connections_count(self) -> int:
+        """Return the number of open connections."""
+        return self.__connections_count
+
+    async def serve(self, host: str = SERVER_HOST,
+                    port: int = SERVER_PORT) -> None:
+        """Accept connections until cancelled."""
+        server = await asyncio.start_server(
+            self.handle_connection, host, port,
+            limit=SERVER_MAX_LINE_BYTES, backlog=1024
+        )
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """Play one game session with the user on the other end."""
+        self.__connections_count += 1
+        renderer: Optional[DiffRenderer] = (
+            DiffRenderer() if self.__ansi else None
+        )
+        loop = asyncio.get_running_loop()
+        try:
+            player_name: Optional[str] = await self.__ask_player_name(
+                reader, writer, renderer
+            )
+            if player_name is None:
+                return
+            session = GameSession(player_name)
+            response, quit_game = await loop.run_in_executor(
+                self.__executor, self.__step, session, None
+            )
+            while not quit_game:
+                writer.write(self.__encode(response, renderer))
+                await writer.drain()
+                line: bytes = await reader.readline()
+                if not line:
+                    return
+                response, quit_game = await loop.run_in_executor(
+                    self.__executor, self.__step, session,
+                    line.decode(errors='replace').rstrip('\r\n')
+                )
+            writer.write(self.__encode(response, renderer))
+            await writer.drain()
+        except (ConnectionError, ValueError):
+            # The client has gone away or sent a line over the limit.
+            pass
+        finally:
+            self.__connections_count -= 1
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def __ask_player_name(
+            self, reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter,
+            renderer: Optional[DiffRenderer]) -> Optional[str]:
+        """Ask the user for their player name until they send a valid
+        one, 'None' is returned if they have gone away.
+        """
+        prompt: str = message_renderer.render_player_name_prompt()
+        while True:
+            writer.write(self.__encode(prompt, renderer))
+            await writer.drain()
+            line: bytes = await reader.readline()
+            if not line:
+                return None
+            player_name: str = line.decode(errors='replace').strip()
+            if is_valid_player_name(player_name):
+                return player_name
+            prompt = (
+                message_renderer.render_invalid_player_name_message()
+                + message_renderer.render_player_name_prompt()
+            )
+
+    @staticmethod
+    def __encode(response: str, renderer: Optional[DiffRenderer]) -> bytes:
+        if renderer is not None:
+            response = renderer.render(response, SERVER_SCREEN_ROWS)
+        return response.encode() + END_OF_RESPONSE
+
+    def __step(self, session: GameSession,
+               user_input: Optional[str]) -> tuple[str, bool]:
+        """Handle the input of a session (or just render its panel
+        if there isn't any) and return the response and
+        whether the user has quit the game.
+        """
+        try:
+            # Switching the player may register them in the DB.
+            session.resume()
+            return session.respond(user_input)
+        except psycopg2.Error:
+            # The sessions share the connection, so the failed
+            # transaction must not abort the statements of the others.
+            dbms.rollback()
+            return (
+                f'{message_renderer.render_database_error_message()}\n',
+                False
+            )
+        finally:
+            session.suspend()
+
+    def close(self) -> None:
+        """Wait for the current step and close the DB connection."""
+        self.__executor.shutdown()
+        dbms.close_db_connection()
+
+
+if __name__ == '__main__':
+    # Play with -> nc 127.0.0.1 7777
+    parser = argparse.ArgumentParser(
+        description='Serve the game to many users over TCP.'
+    )
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument(
+        '--ansi', action='store_true',
+        help='send only the changed lines of the screen'
+    )
+    args = parser.parse_args()
+
+    game_server = GameServer(args.ansi)
+    try:
+        start_background_jobs()
+        asyncio.run(game_server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        game_server.close()
@@ -0,0 +1,88 @@
+from typing import Optional
+
+from .controller.controller import QuitGame, UserState
+from .controller.session_state import SessionState
+from .model.constants import PLAYER_NAME
+from .model.model import autosaver, dbms, game_cache
+from .router import main_router as mr
+from .router.enums import GamePanel as GP
+from .router.transitions import TRANSITIONS
+
+
+class GameSession:
+    """Walk one user through the game panels.
+
+    'render_panel' returns the panel the session is waiting for
+    the input on, and 'handle' routes the input and moves
+    the session to the next panel, see 'router.transitions.py'.
+
+    The controllers, the game cache, the autosaver and the DB layer
+    are shared by the whole process, so a server that runs many
+    sessions resumes a session before handling its input and
+    suspends it after that. The session's games are saved
+    as 'player_name'.
+    """
+
+    __state: SessionState
+    __player_name: str
+
+    def __init__(self, player_name: str = PLAYER_NAME) -> None:
+        self.__state = SessionState(GP.MAIN_MENU_PANEL.value)
+        self.__player_name = player_name
+
+    @property
+    def panel(self) -> str:
+        """Return the name of the current panel."""
+        return self.__state.panel
+
+    def render_panel(self) -> str:
+        """Return the current panel."""
+        return mr.main_router_obj.route_static_panel(self.__state.panel)
+
+    def handle(self, user_input: str) -> Optional[str]:
+        """Route the user's input and move to the next panel,
+        an error message is returned if the input is rejected.
+        """
+        state: SessionState = self.__state
+        state.event = None
+        error: Optional[str] = mr.main_router_obj.route_user_input(
+            user_input=user_input,
+            action=state.panel
+        )
+        if error:
+            return error
+        if state.event is not None:
+            state.panel = TRANSITIONS.get(
+                (state.panel, state.event), state.panel
+            )
+        return None
+
+    def respond(self, user_input: Optional[str]) -> tuple[str, bool]:
+        """Handle the input (or nothing if there isn't any) and return
+        what the user gets back -> the error message and the next
+        panel, or the good bye message, and whether the user has quit.
+        """
+        try:
+            error: Optional[str] = (
+                None if user_input is None else self.handle(user_input)
+            )
+            panel: str = self.render_panel()
+        except QuitGame as game_quit:
+            return f'{game_quit.message}\n', True
+        if error:
+            return f'{error}\n{panel}', False
+        return panel, False
+
+    def suspend(self) -> None:
+        """Take the session's parts of the game cache
+        and of the autosaver.
+        """
+        self.__state.cache = game_cache.get_session_state()
+        self.__state.autosave = autosaver.get_session_state()
+
+    def resume(self) -> None:
+        """Make the session the current one."""
+        UserState.use_session_state(self.__state)
+        dbms.use_player(self.__player_name)
+        game_cache.set_session_state(self.__state.cache)
+        autosaver.set_session_state(self.__state.autosave)
@@ -0,0 +1,78 @@
+import operator
+import string
+
+from typing import Any, Callable, Optional
+
+
+class PanelTemplate:
+    """A panel template that is parsed once.
+
+    The template is a 'str.format' string with named slots. It's
+    turned into a '%' format string with the static text in it once,
+    when the template is created, so building a panel is a single
+    formatting operation with the values in the order of 'slots'.
+    A slot that is used several times gets its value copied into
+    every place of the template. '%' is used rather than 'str.format',
+    because it doesn't have to scan the static text for slot names.
+
+    If 'cache_size' is set, the last 'cache_size' distinct panels are
+    kept, so a panel that hasn't changed isn't built again. It only
+    pays off for panels that have few distinct values, like the
+    continue game one, a panel whose values keep changing, like the
+    ingame one, would only pay for the lookups.
+    """
+
+    __slots: tuple[str, ...]
+    __template: str
+    __arrange: Optional[Callable[[tuple], tuple]]
+    __panels: dict[tuple, str]
+    __cache_size: int
+
+    def __init__(self, template: str, cache_size: int = 0) -> None:
+        body: list[str] = []
+        slots: list[str] = []
+        positions: list[int] = []
+        for literal, slot, format_spec, conversion in (
+                string.Formatter().parse(template)):
+            body.append(literal.replace('%', '%%'))
+            if slot is None:
+                continue
+            if not slot.isidentifier() or format_spec or conversion:
+                raise ValueError(f'Invalid slot -> {slot!r}')
+            if slot not in slots:
+                slots.append(slot)
+            positions.append(slots.index(slot))
+            body.append('%s')
+        self.__slots = tuple(slots)
+        self.__template = ''.join(body)
+        # The values are formatted as they are
+        # if every slot is used once, in order.
+        self.__arrange = None
+        if positions != list(range(len(slots))):
+            get_values: Callable[[tuple], Any] = operator.itemgetter(
+                *positions
+            )
+            self.__arrange = (
+                get_values if len(positions) > 1
+                else lambda values: (get_values(values),)
+            )
+        self.__panels = {}
+        self.__cache_size = cache_size
+
+    @property
+    def slots(self) -> tuple[str, ...]:
+        """Return the slot names in the order 'render' takes them."""
+        return self.__slots
+
+    def render(self, *values: Any) -> str:
+        """Return the panel with the slots filled with the values."""
+        if self.__arrange is not None:
+            values = self.__arrange(values)
+        if not self.__cache_size:
+            return self.__template % values
+        panel: str | None = self.__panels.get(values)
+        if panel is None:
+            if len(self.__panels) >= self.__cache_size:
+                self.__panels.clear()
+            panel = self.__panels[values] = self.__template % values
+        return panel
@@ -0,0 +1,100 @@
+import shutil
+import sys
+
+from typing import Final, Optional, TextIO
+
+
+CURSOR_HOME_AND_CLEAR_SCREEN: Final[str] = '\x1b[H\x1b[2J'
+CLEAR_TO_END_OF_LINE: Final[str] = '\x1b[K'
+CLEAR_TO_END_OF_SCREEN: Final[str] = '\x1b[J'
+
+
+def move_cursor(row: int, column: int) -> str:
+    """Return the sequence that moves the cursor,
+    'row' and 'column' start from 0.
+    """
+    return f'\x1b[{row + 1};{column + 1}H'
+
+
+class DiffRenderer:
+    """Turn the frames of one game session into ANSI sequences that
+    change the previous frame on the screen into the next one.
+
+    Only the lines that have changed are written, and only from the
+    first changed character, e.g. the round counter or the stats.
+    The user's input is typed after the prompt on the last line, so
+    that line and everything below the frame are always cleared.
+    A frame that doesn't fit on the screen scrolls it, so such a
+    frame and the next one are written in full.
+    """
+
+    __lines: list[str]
+
+    def __init__(self) -> None:
+        self.__lines = []
+
+    def render(self, frame: str, screen_rows: int) -> str:
+        """Return what has to be written to show the frame."""
+        lines: list[str] = frame.split('\n')
+        if not self.__lines or len(lines) >= screen_rows:
+            self.__lines = [] if len(lines) >= screen_rows else lines
+            return CURSOR_HOME_AND_CLEAR_SCREEN + '\r\n'.join(lines)
+
+        previous_lines: list[str] = self.__lines
+        prompt_row: int = len(previous_lines) - 1
+        changes: list[str] = []
+        for row, line in enumerate(lines):
+            previous_line: Optional[str] = (
+                previous_lines[row] if row < len(previous_lines) else None
+            )
+            if line == previous_line and row != prompt_row:
+                continue
+            column: int = 0
+            if previous_line is not None:
+                for column, (char, previous_char) in enumerate(
+                        zip(line, previous_line)):
+                    if char != previous_char:
+                        break
+                else:
+                    column = min(len(line), len(previous_line))
+            changes.append(
+                move_cursor(row, column) + line[column:]
+                + CLEAR_TO_END_OF_LINE
+            )
+        changes.append(move_cursor(len(lines), 0) + CLEAR_TO_END_OF_SCREEN)
+        changes.append(move_cursor(len(lines) - 1, len(lines[-1])))
+        self.__lines = lines
+        return ''.join(changes)
+
+
+class AnsiTerminal:
+    """Play the game in a terminal that redraws only what has changed.
+
+    It's a drop-in for 'input' and 'print' in 'run_game_loop': an error
+    is kept until the next panel is shown, and the error and the panel
+    are written as one frame with one flush.
+    """
+
+    __output: TextIO
+    __renderer: DiffRenderer
+    __error: str
+
+    def __init__(self, output: TextIO = sys.stdout) -> None:
+        self.__output = output
+        self.__renderer = DiffRenderer()
+        self.__error = ''
+
+    def read_user_input(self, panel: str) -> str:
+        """Show the frame and return the user's input."""
+        # 'print' ends the error with a new line, so does the frame.
+        frame: str = f'{self.__error}\n{panel}' if self.__error else panel
+        self.__error = ''
+        self.__output.write(self.__renderer.render(
+            frame, shutil.get_terminal_size().lines
+        ))
+        self.__output.flush()
+        return input()
+
+    def show_error(self, error: str) -> None:
+        """Show the error with the next panel."""
+        self.__error = error
@@ -1,7 +1,17 @@
+import json
+import weakref
+
 from abc import ABC, abstractmethod
+from typing import Optional
 
 from .enums import GameIdMessage as GIM
-from ..model.custom_dtypes import SavedGames
+from .template import PanelTemplate
+from ..controller.constants import QUIT_GAME, QUIT_TO_MAIN_MENU, SAVE_GAME, YES
+from ..controller.enums import MainMenuPanelChoice
+from ..model.catalog import SavedGamesCatalog
+from ..model.constants import PLAYER_NAME_MAX_LENGTH, VIEW_FORMAT
+from ..model.metrics import RENDER_SECONDS, metrics
+from ..model.rules import GameRules, game_rules
 
 
 class Panel(ABC):
@@ -17,6 +27,7 @@ class Panel(ABC):
                           game_stats: dict,
                           max_rounds_per_game: int,
                           saved_games_count: int,
+                          max_saved_games: int,
                           saved_game_id: str) -> str:
         """Return the ingame input panel."""
 
@@ -27,7 +38,7 @@ class Panel(ABC):
 
     @abstractmethod
     def render_main_menu_panel_with_saved_game_list(
-            self, saved_games: SavedGames) -> str:
+            self, saved_games: SavedGamesCatalog) -> str:
         """Return the main menu panel with the injected saved game list."""
 
     @abstractmethod
@@ -39,8 +50,9 @@ class Panel(ABC):
         """Return the main menu panel."""
 
     @abstractmethod
-    def render_main_menu_panel_with_game_id(self, deleted_game_id: str) -> str:
-        """Return the main menu panel with the injected game id."""
+    def render_main_menu_panel_with_game_ids(
+            self, deleted_game_ids: list[str]) -> str:
+        """Return the main menu panel with the injected game ids."""
 
     @abstractmethod
     def render_game_id_input_panel(self) -> str:
@@ -55,11 +67,28 @@ class MainGamePanel(Panel):
     """A subclass of the 'Panel' class.
 
     It provides methods to render the game panels.
+
+    Static panels are built once. The ingame panel is a new one
+    after almost every round, so it is built with an f-string,
+    the continue game panel is parsed into a template that keeps
+    the few panels a game ends with, see 'PanelTemplate'.
     """
 
     __main_menu_base_panel: str
-
-    def __init__(self) -> None:
+    __main_menu_panel_with_game_rules: Optional[str]
+    __game_id_input_panel: str
+    __round_amount_input_panel: str
+    __moves_hint: str
+    __continue_game_input_panel: PanelTemplate
+
+    def __init__(self, game_rules: GameRules) -> None:
+        # A move description looks like '"r"(ock)' when
+        # the move name starts with its key.
+        self.__moves_hint = ', '.join(
+            f'"{move}"({name[len(move):]})' if name.startswith(move)
+            else f'"{move}" ({name})'
+            for move, name in game_rules.move_names.items()
+        )
         self.__main_menu_base_panel = (
             '\nWelcome to the main menu!'
             '\nPick an option (number) and type it below:'
@@ -71,14 +100,44 @@ class MainGamePanel(Panel):
             '\n6) Quit the game'
             '\nType here: '
         )
+        # The rules are injected by the message renderer,
+        # which is created after this one.
+        self.__main_menu_panel_with_game_rules = None
+        self.__game_id_input_panel = (
+            '\nEnter the game id here; to delete several games at once '
+            'separate their ids with spaces or commas, to load an earlier '
+            'save point add "@" and its number to the game id, '
+            'e.g. <id>@0 is the first save '
+            '(type "qm" to go back to the main menu): '
+        )
+        self.__round_amount_input_panel = (
+            '\nType the number of rounds (3, 5, 7 or 9) '
+            'that you wanna set for one game'
+            '\nor type "qm" to go back to the main menu.'
+            '\nType here: '
+        )
+        self.__continue_game_input_panel = PanelTemplate(
+            '\nYour choice: [ {user_choice} ], '
+            'PC choice: [ {computer_choice} ]'
+            '\nRounds won: {rounds_won}, '
+            'Rounds lost: {rounds_lost}, '
+            'Total draws: {total_draws}'
+            '\n[ {current_game_winner} ] has won!'
+            '\nWanna play again?'
+            '\nIf yes, then type -> "y", else -> "qm"(uit to the main '
+            'menu, also clears the game stats) or "q"(uit the game): ',
+            # A game ends with a few distinct panels.
+            cache_size=1024
+        )
 
     def render_game_panel(self,
                           round_stats: dict,
                           game_stats: dict,
                           max_rounds_per_game: int,
                           saved_games_count: int,
+                          max_saved_games: int,
                           saved_game_id: str) -> str:
-        base_panel = (
+        base_panel: str = (
             f'\nGame stats: won {game_stats["games_won"]}, '
             f'lost {game_stats["games_lost"]}'
             f'\nRound: {round_stats["round"]}/{max_rounds_per_game}'
@@ -91,11 +150,12 @@ class MainGamePanel(Panel):
             f'Rounds lost: {round_stats["rounds_lost"]}, '
             f'Total draws: {round_stats["total_draws"]}'
             '\nType ->'
-            '\n"r"(ock), "p"(aper), "s"(cissors),'
+            f'\n{self.__moves_hint},'
             '\n"q"(uit the game), "qm"(uit to the main menu, '
             'also clears the game stats),'
-            '\n"S"(ave the game; you can save at most 5 games), '
-            f'the number of currently saved games -> {saved_games_count}/5'
+            '\n"S"(ave the game; you can save at most '
+            f'{max_saved_games} games), the number of currently '
+            f'saved games -> {saved_games_count}/{max_saved_games}'
             '\nType here: '
         )
         if not saved_game_id:
@@ -108,49 +168,52 @@ class MainGamePanel(Panel):
 
     def render_continue_game_input_panel(
             self, round_stats: dict, current_game_winner: str) -> str:
-        return (
-            f'\nYour choice: [ {round_stats["user_choice"]} ], '
-            f'PC choice: [ {round_stats["computer_choice"]} ]'
-            f'\nRounds won: {round_stats["rounds_won"]}, '
-            f'Rounds lost: {round_stats["rounds_lost"]}, '
-            f'Total draws: {round_stats["total_draws"]}'
-            f'\n[ {current_game_winner.upper()} ] has won!'
-            '\nWanna play again?'
-            '\nIf yes, then type -> "y", else -> "qm"(uit to the main '
-            'menu, also clears the game stats) or "q"(uit the game): '
+        return self.__continue_game_input_panel.render(
+            round_stats['user_choice'],
+            round_stats['computer_choice'],
+            round_stats['rounds_won'],
+            round_stats['rounds_lost'],
+            round_stats['total_draws'],
+            current_game_winner.upper(),
         )
 
     def render_main_menu_panel_with_saved_game_list(
-            self, saved_games: SavedGames) -> str:
+            self, saved_games: SavedGamesCatalog) -> str:
         return message_renderer.inject_saved_games_list(
             self.__main_menu_base_panel,
             saved_games
         )
 
     def render_main_menu_panel_with_game_rules(self) -> str:
-        return message_renderer.inject_game_rules(
-            self.__main_menu_base_panel
-        )
+        if self.__main_menu_panel_with_game_rules is None:
+            self.__main_menu_panel_with_game_rules = (
+                message_renderer.inject_game_rules(
+                    self.__main_menu_base_panel
+                )
+            )
+        return self.__main_menu_panel_with_game_rules
 
     def render_main_menu_panel(self) -> str:
         return self.__main_menu_base_panel
 
-    def render_main_menu_panel_with_game_id(self, deleted_game_id: str) -> str:
-        return message_renderer.inject_game_id_related_dynamic_message(
-            self.__main_menu_base_panel,
-            GIM.GAME_DELETED.value,
-            deleted_game_id
-        )
+    def render_main_menu_panel_with_game_ids(
+            self, deleted_game_ids: list[str]) -> str:
+        panel: str = self.__main_menu_base_panel
+        # Every message is injected in front of the panel,
+        # so I go from the end to keep the order of the ids.
+        for deleted_game_id in reversed(deleted_game_ids):
+            panel = message_renderer.inject_game_id_related_dynamic_message(
+                panel,
+                GIM.GAME_DELETED.value,
+                deleted_game_id
+            )
+        return panel
 
     def render_game_id_input_panel(self) -> str:
-        return ('\nEnter the game id here '
-                '(type "qm" to go back to the main menu): ')
+        return self.__game_id_input_panel
 
     def render_round_amound_input_panel(self) -> str:
-        return ('\nType the number of rounds (3, 5, 7 or 9) '
-                'that you wanna set for one game'
-                '\nor type "qm" to go back to the main menu.'
-                '\nType here: ')
+        return self.__round_amount_input_panel
 
 
 class Message(ABC):
@@ -186,10 +249,30 @@ class Message(ABC):
             self, error_message: str) -> str:
         """Return the error message for loading a saved game."""
 
+    @abstractmethod
+    def render_save_game_error_message(self, error_message: str) -> str:
+        """Return the error message for saving a game."""
+
+    @abstractmethod
+    def render_database_error_message(self) -> str:
+        """Return the error message for a failed DB statement."""
+
+    @abstractmethod
+    def render_player_name_prompt(self) -> str:
+        """Return the prompt for the player name."""
+
+    @abstractmethod
+    def render_invalid_player_name_message(self) -> str:
+        """Return the invalid player name message."""
+
+    @abstractmethod
+    def render_saved_games_list(self, saved_games: SavedGamesCatalog) -> str:
+        """Return the list of saved games."""
+
     @abstractmethod
     def inject_saved_games_list(
             self, base_pannel: str,
-            saved_games: SavedGames) -> str:
+            saved_games: SavedGamesCatalog) -> str:
         """Inject a list of saved games if it is not empty."""
 
     @abstractmethod
@@ -212,8 +295,20 @@ class GameMessage(Message):
 
     __game_id_related_dynamic_messages: dict[str, str]
     __game_rules: str
-
-    def __init__(self) -> None:
+    __saved_games: weakref.WeakKeyDictionary[
+        SavedGamesCatalog, tuple[int, str]
+    ]
+
+    def __init__(self, game_rules: GameRules) -> None:
+        move_names: dict[str, str] = game_rules.move_names
+        moves_rules: str = '\n'.join(
+            f'{move_names[move].capitalize()} beats '
+            + ', '.join(
+                move_names[beaten_move]
+                for beaten_move in game_rules.get_beaten_moves(move)
+            )
+            for move in game_rules.moves
+        )
         self.__game_id_related_dynamic_messages = {
             GIM.GAME_SAVED.value: (
                 '\n**The game saved successfully! Here is the game id**: %s\n'
@@ -234,8 +329,13 @@ class GameMessage(Message):
             'either you or the computer wins when '
             '\na "win condition" is reached. For example, '
             'in a 5-round game, it cound be -> '
-            '3/0-2 etc.\n'
+            '3/0-2 etc.'
+            f'\n{moves_rules}\n'
         )
+        # The rendered saved games list of every player's catalog
+        # with its version, a list is rendered again only after
+        # its catalog has changed.
+        self.__saved_games = weakref.WeakKeyDictionary()
 
     def render_generic_error_message(self, invalid_input: str) -> str:
         return f'\nThis input -> [ {invalid_input} ] is invalid, try again!'
@@ -261,20 +361,52 @@ class GameMessage(Message):
             self, error_message: str) -> str:
         return f'\n{error_message}'
 
-    def inject_saved_games_list(
-            self, base_pannel: str,
-            saved_games: SavedGames) -> str:
-        if not saved_games:
-            return '\n**You don\'t have any saved games yet!**\n' + base_pannel
-        formatted_games = '\n'.join(
-            [f'{idx}) [ {tuple_[0]} ]; The game stats -> '
-             f'won: {tuple_[2]} lost: {tuple_[1]}' 
-             for idx, tuple_ in enumerate(saved_games, 1)]
-        )
+    def render_save_game_error_message(self, error_message: str) -> str:
+        return f'\n**{error_message}**'
+
+    def render_database_error_message(self) -> str:
+        return '\n**The game data could not be read or saved, try again!**'
+
+    def render_player_name_prompt(self) -> str:
         return (
-            '\nYour saved game ids:'
-            f'\n{formatted_games}\n{base_pannel}'
+            'Enter your player name '
+            f'(up to {PLAYER_NAME_MAX_LENGTH} characters): '
+        )
+
+    def render_invalid_player_name_message(self) -> str:
+        return '\nThis player name is invalid, try again!\n'
+
+    def render_saved_games_list(self, saved_games: SavedGamesCatalog) -> str:
+        version, rendered_saved_games = self.__saved_games.get(
+            saved_games, (None, '')
         )
+        if version == saved_games.version:
+            return rendered_saved_games
+        if not len(saved_games):
+            rendered_saved_games = (
+                '\n**You don\'t have any saved games yet!**\n'
+            )
+        else:
+            rendered_saved_games = ''.join((
+                '\nYour saved game ids:',
+                *(
+                    f'\n{idx}) [ {game_id} ]; The game stats -> '
+                    f'won: {games_won} lost: {games_lost}'
+                    for idx, (game_id, games_lost, games_won) in enumerate(
+                        saved_games, 1
+                    )
+                ),
+                '\n',
+            ))
+        self.__saved_games[saved_games] = (
+            saved_games.version, rendered_saved_games
+        )
+        return rendered_saved_games
+
+    def inject_saved_games_list(
+            self, base_pannel: str,
+            saved_games: SavedGamesCatalog) -> str:
+        return self.render_saved_games_list(saved_games) + base_pannel
 
     def inject_game_id_related_dynamic_message(
             self, base_pannel: str,
@@ -287,5 +419,255 @@ class GameMessage(Message):
         return self.__game_rules + base_pannel
 
 
-panel_renderer = MainGamePanel()
-message_renderer = GameMessage()
+def to_json(data: object) -> str:
+    """Return the data as compact JSON."""
+    return json.dumps(data, separators=(',', ':'))
+
+
+def to_json_line(data: object) -> str:
+    """Return the data as a JSON line, panels and the fragments
+    injected into them are lines, the messages are printed.
+    """
+    return to_json(data) + '\n'
+
+
+class JsonGamePanel(Panel):
+    """A subclass of the 'Panel' class for bots.
+
+    Every panel is one JSON object on its own line with the state
+    the text panel shows, e.g.
+    {"panel":"ingame","games_won":0,...,"commands":{...}}.
+    The parts that never change (the static panels, the moves and
+    the commands) are encoded once, the stats are written
+    into the lines as they are.
+    """
+
+    __main_menu_panel: str
+    __game_id_input_panel: str
+    __round_amount_input_panel: str
+    __game_panel_tail: str
+    __continue_game_input_panel_tail: str
+    __choices: dict[str, str]
+
+    def __init__(self, game_rules: GameRules) -> None:
+        self.__main_menu_panel = to_json_line({
+            'panel': 'main_menu',
+            'options': {
+                choice.value: choice.name.lower()
+                for choice in MainMenuPanelChoice
+            },
+        })
+        self.__game_id_input_panel = to_json_line({
+            'panel': 'game_id_input',
+            'commands': {'main_menu': QUIT_TO_MAIN_MENU},
+        })
+        self.__round_amount_input_panel = to_json_line({
+            'panel': 'round_amount',
+            'options': [3, 5, 7, 9],
+            'commands': {'main_menu': QUIT_TO_MAIN_MENU},
+        })
+        # The closing part of the object, after the stats.
+        self.__game_panel_tail = to_json_line({
+            'moves': game_rules.move_names,
+            'commands': {
+                'quit': QUIT_GAME,
+                'main_menu': QUIT_TO_MAIN_MENU,
+                'save': SAVE_GAME,
+            },
+        })[1:]
+        self.__continue_game_input_panel_tail = to_json_line({
+            'commands': {
+                'play_again': YES,
+                'quit': QUIT_GAME,
+                'main_menu': QUIT_TO_MAIN_MENU,
+            },
+        })[1:]
+        # A choice that isn't made yet is 'null'.
+        self.__choices = {'': 'null'} | {
+            move: json.dumps(move) for move in game_rules.moves
+        }
+
+    def render_game_panel(self,
+                          round_stats: dict,
+                          game_stats: dict,
+                          max_rounds_per_game: int,
+                          saved_games_count: int,
+                          max_saved_games: int,
+                          saved_game_id: str) -> str:
+        panel: str = (
+            '{"panel":"ingame"'
+            f',"games_won":{game_stats["games_won"]}'
+            f',"games_lost":{game_stats["games_lost"]}'
+            f',"round":{round_stats["round"]}'
+            f',"max_rounds":{max_rounds_per_game}'
+            f',"user_choice":{self.__choices[round_stats["user_choice"]]}'
+            ',"computer_choice":'
+            f'{self.__choices[round_stats["computer_choice"]]}'
+            f',"rounds_won":{round_stats["rounds_won"]}'
+            f',"rounds_lost":{round_stats["rounds_lost"]}'
+            f',"total_draws":{round_stats["total_draws"]}'
+            f',"saved_games_count":{saved_games_count}'
+            f',"max_saved_games":{max_saved_games},'
+            f'{self.__game_panel_tail}'
+        )
+        if not saved_game_id:
+            return panel
+        return to_json_line({
+            'event': GIM.GAME_SAVED.value, 'game_id': saved_game_id
+        }) + panel
+
+    def render_continue_game_input_panel(
+            self, round_stats: dict, current_game_winner: str) -> str:
+        return (
+            '{"panel":"continue_game"'
+            f',"user_choice":{self.__choices[round_stats["user_choice"]]}'
+            ',"computer_choice":'
+            f'{self.__choices[round_stats["computer_choice"]]}'
+            f',"rounds_won":{round_stats["rounds_won"]}'
+            f',"rounds_lost":{round_stats["rounds_lost"]}'
+            f',"total_draws":{round_stats["total_draws"]}'
+            f',"winner":{json.dumps(current_game_winner)},'
+            f'{self.__continue_game_input_panel_tail}'
+        )
+
+    def render_main_menu_panel_with_saved_game_list(
+            self, saved_games: SavedGamesCatalog) -> str:
+        return message_renderer.inject_saved_games_list(
+            self.__main_menu_panel, saved_games
+        )
+
+    def render_main_menu_panel_with_game_rules(self) -> str:
+        return message_renderer.inject_game_rules(self.__main_menu_panel)
+
+    def render_main_menu_panel(self) -> str:
+        return self.__main_menu_panel
+
+    def render_main_menu_panel_with_game_ids(
+            self, deleted_game_ids: list[str]) -> str:
+        return ''.join(
+            to_json_line({
+                'event': GIM.GAME_DELETED.value, 'game_id': game_id
+            })
+            for game_id in deleted_game_ids
+        ) + self.__main_menu_panel
+
+    def render_game_id_input_panel(self) -> str:
+        return self.__game_id_input_panel
+
+    def render_round_amound_input_panel(self) -> str:
+        return self.__round_amount_input_panel
+
+
+class JsonGameMessage(Message):
+    """A subclass of the 'Message' class for bots.
+
+    Errors and events are JSON objects on their own lines,
+    the game rules are encoded once and the saved games list
+    is encoded again only after the catalog has changed.
+    """
+
+    __game_rules: str
+    __saved_games: weakref.WeakKeyDictionary[
+        SavedGamesCatalog, tuple[int, str]
+    ]
+
+    def __init__(self, game_rules: GameRules) -> None:
+        self.__game_rules = to_json_line({
+            'rules': {
+                move: game_rules.get_beaten_moves(move)
+                for move in game_rules.moves
+            },
+        })
+        self.__saved_games = weakref.WeakKeyDictionary()
+
+    def render_generic_error_message(self, invalid_input: str) -> str:
+        return to_json({
+            'error': 'invalid_input', 'input': invalid_input
+        })
+
+    def render_exit_message(self, game_stats: dict[str, int]) -> str:
+        return to_json({'event': 'exit', **game_stats})
+
+    def render_main_menu_exit_message(self) -> str:
+        return to_json({'event': 'exit'})
+
+    def render_invalid_game_id_message(self) -> str:
+        return to_json({'error': 'invalid_game_id'})
+
+    def render_delete_saved_game_error_message(
+            self, error_message: str) -> str:
+        return to_json({
+            'error': 'delete_failed', 'message': error_message
+        })
+
+    def render_load_saved_game_error_message(
+            self, error_message: str) -> str:
+        return to_json({
+            'error': 'load_failed', 'message': error_message
+        })
+
+    def render_save_game_error_message(self, error_message: str) -> str:
+        return to_json({
+            'error': 'save_failed', 'message': error_message
+        })
+
+    def render_database_error_message(self) -> str:
+        return to_json({'error': 'database_error'})
+
+    def render_player_name_prompt(self) -> str:
+        return to_json_line({
+            'prompt': 'player_name', 'max_length': PLAYER_NAME_MAX_LENGTH
+        })
+
+    def render_invalid_player_name_message(self) -> str:
+        return to_json_line({'error': 'invalid_player_name'})
+
+    def render_saved_games_list(self, saved_games: SavedGamesCatalog) -> str:
+        version, rendered_saved_games = self.__saved_games.get(
+            saved_games, (None, '')
+        )
+        if version != saved_games.version:
+            rendered_saved_games = to_json_line({
+                'saved_games': [
+                    {
+                        'game_id': game_id,
+                        'games_won': games_won,
+                        'games_lost': games_lost,
+                    }
+                    for game_id, games_lost, games_won in saved_games
+                ],
+            })
+            self.__saved_games[saved_games] = (
+                saved_games.version, rendered_saved_games
+            )
+        return rendered_saved_games
+
+    def inject_saved_games_list(
+            self, base_pannel: str,
+            saved_games: SavedGamesCatalog) -> str:
+        return self.render_saved_games_list(saved_games) + base_pannel
+
+    def inject_game_id_related_dynamic_message(
+            self, base_pannel: str,
+            message: str, game_id: str) -> str:
+        return to_json_line({
+            'event': message, 'game_id': game_id
+        }) + base_pannel
+
+    def inject_game_rules(self, base_pannel: str) -> str:
+        return self.__game_rules + base_pannel
+
+
+# The text view is for people, the JSON lines view is for bots.
+panel_renderer: Panel
+message_renderer: Message
+if VIEW_FORMAT == 'json':
+    panel_renderer = JsonGamePanel(game_rules)
+    message_renderer = JsonGameMessage(game_rules)
+else:
+    panel_renderer = MainGamePanel(game_rules)
+    message_renderer = GameMessage(game_rules)
+panel_renderer = metrics.instrument(panel_renderer, RENDER_SECONDS, 'method')
+message_renderer = metrics.instrument(
+    message_renderer, RENDER_SECONDS, 'method'
+)
@@ -0,0 +1,156 @@
+"""Measure how long rendering one panel takes.
+
+The ingame panel is rendered for a sequence of rounds, so some of
+its fields change from one panel to the next, with game stats that
+are never the same, and for the same round, like after an invalid
+input. The continue game panel is rendered for the ends of the games
+of a few rounds, which repeat. Both are compared with the f-strings
+they were built from before the panels were parsed into templates,
+the ingame one is an f-string again, because a template was slower
+for the panels that are never the same. The static panels are
+measured as they are.
+
+python -m benchmarks.panel_rendering [--number 100000]
+"""
+import argparse
+import itertools
+import timeit
+
+from typing import Callable
+
+from app.view.view import panel_renderer
+
+MOVES_HINT: str = '"r"(ock), "p"(aper), "s"(cissors)'
+MAX_ROUNDS_PER_GAME: int = 9
+# A game of 9 rounds: round stats after every round.
+ROUNDS: list[dict] = [
+    {
+        'round': round_,
+        'user_choice': 'rps'[round_ % 3],
+        'computer_choice': 'psr'[round_ % 3],
+        'rounds_won': round_ // 2,
+        'rounds_lost': round_ - round_ // 2,
+        'total_draws': round_ // 3,
+    }
+    for round_ in range(MAX_ROUNDS_PER_GAME + 1)
+]
+GAME_STATS: dict = {'games_won': 3, 'games_lost': 2}
+
+
+def render_game_panel_with_f_string(round_stats: dict, game_stats: dict,
+                                    max_rounds_per_game: int,
+                                    saved_games_count: int,
+                                    max_saved_games: int) -> str:
+    """Render the ingame panel the way it was done before."""
+    return (
+        f'\nGame stats: won {game_stats["games_won"]}, '
+        f'lost {game_stats["games_lost"]}'
+        f'\nRound: {round_stats["round"]}/{max_rounds_per_game}'
+        '\nRound stats:'
+        f'\nYour choice: '
+        f'[ {round_stats["user_choice"] or "Not set yet!"} ], '
+        'PC choice: '
+        f'[ {round_stats["computer_choice"] or "Not set yet!"} ]'
+        f'\nRounds won: {round_stats["rounds_won"]}, '
+        f'Rounds lost: {round_stats["rounds_lost"]}, '
+        f'Total draws: {round_stats["total_draws"]}'
+        '\nType ->'
+        f'\n{MOVES_HINT},'
+        '\n"q"(uit the game), "qm"(uit to the main menu, '
+        'also clears the game stats),'
+        '\n"S"(ave the game; you can save at most '
+        f'{max_saved_games} games), the number of currently '
+        f'saved games -> {saved_games_count}/{max_saved_games}'
+        '\nType here: '
+    )
+
+
+def render_continue_game_panel_with_f_string(
+        round_stats: dict, current_game_winner: str) -> str:
+    """Render the continue game panel the way it was done before."""
+    return (
+        f'\nYour choice: [ {round_stats["user_choice"]} ], '
+        f'PC choice: [ {round_stats["computer_choice"]} ]'
+        f'\nRounds won: {round_stats["rounds_won"]}, '
+        f'Rounds lost: {round_stats["rounds_lost"]}, '
+        f'Total draws: {round_stats["total_draws"]}'
+        f'\n[ {current_game_winner.upper()} ] has won!'
+        '\nWanna play again?'
+        '\nIf yes, then type -> "y", else -> "qm"(uit to the main '
+        'menu, also clears the game stats) or "q"(uit the game): '
+    )
+
+
+def measure(render: Callable[[], str], number: int) -> float:
+    """Return the time of one call in ns."""
+    return min(timeit.repeat(render, number=number, repeat=3)) / number * 1e9
+
+
+def main(number: int) -> None:
+    next_round = itertools.cycle(ROUNDS).__next__
+    same_round: dict = ROUNDS[4]
+    next_games_won = itertools.count().__next__
+    cases: dict[str, tuple[Callable[[], str], Callable[[], str]]] = {
+        'ingame, next round': (
+            lambda: render_game_panel_with_f_string(
+                next_round(), GAME_STATS, MAX_ROUNDS_PER_GAME, 2, 5
+            ),
+            lambda: panel_renderer.render_game_panel(
+                next_round(), GAME_STATS, MAX_ROUNDS_PER_GAME, 2, 5, ''
+            ),
+        ),
+        # Every panel is a new one.
+        'ingame, new stats': (
+            lambda: render_game_panel_with_f_string(
+                same_round, {'games_won': next_games_won(), 'games_lost': 2},
+                MAX_ROUNDS_PER_GAME, 2, 5
+            ),
+            lambda: panel_renderer.render_game_panel(
+                same_round, {'games_won': next_games_won(), 'games_lost': 2},
+                MAX_ROUNDS_PER_GAME, 2, 5, ''
+            ),
+        ),
+        'ingame, same round': (
+            lambda: render_game_panel_with_f_string(
+                same_round, GAME_STATS, MAX_ROUNDS_PER_GAME, 2, 5
+            ),
+            lambda: panel_renderer.render_game_panel(
+                same_round, GAME_STATS, MAX_ROUNDS_PER_GAME, 2, 5, ''
+            ),
+        ),
+        'continue game': (
+            lambda: render_continue_game_panel_with_f_string(
+                next_round(), 'user'
+            ),
+            lambda: panel_renderer.render_continue_game_input_panel(
+                next_round(), 'user'
+            ),
+        ),
+    }
+    print(f'{"panel":<20}{"before, ns":>12}{"after, ns":>12}'
+          f'{"panels/s":>12}{"speedup":>10}')
+    for panel, (before_render, after_render) in cases.items():
+        before: float = measure(before_render, number)
+        after: float = measure(after_render, number)
+        print(f'{panel:<20}{before:>12.0f}{after:>12.0f}'
+              f'{1e9 / after:>12.0f}{before / after:>9.1f}x')
+    static_panels: dict[str, Callable[[], str]] = {
+        'main menu': panel_renderer.render_main_menu_panel,
+        'game rules': panel_renderer.render_main_menu_panel_with_game_rules,
+        'game id input': panel_renderer.render_game_id_input_panel,
+        'round amount': panel_renderer.render_round_amound_input_panel,
+    }
+    for panel, render in static_panels.items():
+        after = measure(render, number)
+        print(f'{panel:<20}{"":>12}{after:>12.0f}{1e9 / after:>12.0f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Measure the panel rendering cost.'
+    )
+    parser.add_argument(
+        '--number', type=int, default=100_000,
+        help='how many times every panel is rendered'
+    )
+    main(parser.parse_args().number)
@@ -0,0 +1,120 @@
+"""Measure how long routing one command takes on every panel.
+
+The routers are built from the real path options, but the controller
+methods are replaced with ones that do nothing, so only the dispatch
+itself is measured. The linear scan that the routers used before the
+dispatch table was compiled is measured for comparison.
+
+python -m benchmarks.router_dispatch [--number 100000]
+"""
+import argparse
+import inspect
+import re
+import timeit
+
+from typing import Callable, Optional
+
+from app.controller.controller import get_invalid_user_input_message
+from app.model.rules import game_rules
+from app.router.controller_routers import (
+    ControllerRouter,
+    continue_game_panel_router,
+    game_id_input_panel_router,
+    ingame_panel_router,
+    main_menu_panel_router,
+    round_amount_panel_router
+)
+from app.router.custom_dtypes import PathOptions
+
+GAME_ID: str = '6e7ceb2e-5f00-4b75-bbfa-abf5fb465e12'
+PANEL_INPUTS: dict[str, tuple[ControllerRouter, list[str]]] = {
+    'main menu': (
+        main_menu_panel_router, ['1', '2', '3', '4', '5', '6', 'x']
+    ),
+    'game id input': (
+        game_id_input_panel_router,
+        ['qm', GAME_ID, f'{GAME_ID}@3 {GAME_ID}', 'x']
+    ),
+    'ingame': (
+        ingame_panel_router,
+        ['q', 'S', 'qm', *game_rules.moves, 'x']
+    ),
+    'continue game': (continue_game_panel_router, ['q', 'qm', 'y', 'x']),
+    'round amount': (round_amount_panel_router, ['qm', '3', '9', 'x']),
+}
+
+
+class BenchRouter(ControllerRouter):
+    """A router with the path options of another one
+    and controller methods that do nothing.
+    """
+
+    __path_options: PathOptions
+
+    def __init__(self, router: ControllerRouter) -> None:
+        self.__path_options = [
+            (input_option, self.get_noop(logic))
+            for input_option, logic in router.path_options
+        ]
+        self.compile_path_options()
+
+    @property
+    def path_options(self) -> PathOptions:
+        return self.__path_options
+
+    @staticmethod
+    def get_noop(
+            logic: Callable[..., Optional[str]]
+    ) -> Callable[..., Optional[str]]:
+        if inspect.signature(logic).parameters:
+            return lambda user_input: None
+        return lambda: None
+
+
+def route_linearly(path_options: PathOptions,
+                   user_input: str) -> Optional[str]:
+    """Route the input the way the routers did before."""
+    for input_option, logic in path_options:
+        if re.fullmatch(input_option, user_input):
+            try:
+                return logic(user_input)
+            except TypeError:
+                return logic()
+    return get_invalid_user_input_message(user_input)
+
+
+def main(number: int) -> None:
+    print(f'{"panel":<15}{"before, ns":>12}{"after, ns":>12}{"speedup":>10}')
+    for panel, (router, user_inputs) in PANEL_INPUTS.items():
+        bench_router = BenchRouter(router)
+        path_options: PathOptions = bench_router.path_options
+        before: float = min(timeit.repeat(
+            lambda: [
+                route_linearly(path_options, user_input)
+                for user_input in user_inputs
+            ],
+            number=number, repeat=3
+        ))
+        after: float = min(timeit.repeat(
+            lambda: [
+                bench_router.route_user_input(user_input)
+                for user_input in user_inputs
+            ],
+            number=number, repeat=3
+        ))
+        commands: int = number * len(user_inputs)
+        print(
+            f'{panel:<15}{before / commands * 1e9:>12.0f}'
+            f'{after / commands * 1e9:>12.0f}{before / after:>9.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Measure the router dispatch cost per panel.'
+    )
+    parser.add_argument(
+        '--number', type=int, default=100_000,
+        help='how many times every command is routed'
+    )
+    main(parser.parse_args().number)
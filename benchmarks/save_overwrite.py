@@ -0,0 +1,144 @@
+"""Measure what repeated saves of one session cost in the database.
+
+A session is saved '--saves' times, a round is played between the
+saves. It is done twice:
+
+- overwrite: every save overwrites the session's saved game, the way
+  the game saves a session that has been saved or loaded already
+- insert: every save is a new saved game, the way the game saved
+  before it remembered the session's game id
+
+Every session gets its game id before it is saved for the first time,
+so the saved games limit doesn't stop the insert run, but the saved
+games are still counted before every insert, as they were.
+
+For both the time of one save, the rows of the saved games, and how
+much the game tables and the WAL have grown are printed, then the
+saved games are deleted. Other clients of the database make the sizes
+and the WAL bigger, so it should be run against a database that isn't
+used by anything else. The sharded setup isn't measured, only the
+database of RPS_DSN.
+
+python -m benchmarks.save_overwrite [--saves 1000]
+"""
+import argparse
+import time
+
+from psycopg2.extensions import connection
+
+from app.model.db_config import connect
+from app.model.model import dbms, game_cache
+
+MAX_ROUNDS_PER_GAME: int = 9
+
+
+def get_db_stats(conn: connection,
+                 game_ids: list[str]) -> tuple[int, int, int, str]:
+    """Return the rows of the games in 'game_data' and 'game_history',
+    the size of both tables with their indexes and the current
+    WAL position.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            """SELECT
+                (SELECT count(*) FROM game_data
+                 WHERE game_id = ANY(%(game_ids)s::uuid[])),
+                (SELECT count(*) FROM game_history
+                 WHERE game_id = ANY(%(game_ids)s::uuid[])),
+                pg_total_relation_size('game_data')
+                    + pg_total_relation_size('game_history'),
+                pg_current_wal_insert_lsn()""",
+            {'game_ids': game_ids}
+        )
+        stats: tuple[int, int, int, str] = cur.fetchone()
+    conn.commit()
+    return stats
+
+
+def get_wal_bytes(conn: connection, start: str, end: str) -> int:
+    with conn.cursor() as cur:
+        cur.execute('SELECT pg_wal_lsn_diff(%s, %s)', (end, start))
+        wal_bytes: int = int(cur.fetchone()[0])
+    conn.commit()
+    return wal_bytes
+
+
+def start_session() -> None:
+    game_cache.session_game_id = dbms.str_uuid_value
+    game_cache.max_rounds_per_game = MAX_ROUNDS_PER_GAME
+    game_cache.set_win_condition(MAX_ROUNDS_PER_GAME)
+
+
+def play_round(round_: int) -> None:
+    game_cache.set_round_stats({
+        'round': round_ % MAX_ROUNDS_PER_GAME + 1,
+        'user_choice': 'rps'[round_ % 3],
+        'computer_choice': 'psr'[round_ % 3],
+        'rounds_won': round_ % 5,
+        'rounds_lost': round_ % 4,
+        'total_draws': round_ % 3,
+    })
+
+
+def measure(stats_conn: connection, saves: int,
+            overwrite: bool) -> dict[str, float]:
+    game_ids: list[str] = []
+    _, _, size, wal_position = get_db_stats(stats_conn, game_ids)
+    seconds: float = 0
+    try:
+        for round_ in range(saves):
+            if not game_ids or not overwrite:
+                start_session()
+                game_ids.append(game_cache.session_game_id)
+            play_round(round_)
+            started_at: float = time.perf_counter()
+            if not overwrite:
+                dbms.get_current_saved_games_count()
+            error: str | None = dbms.save_game_data()
+            seconds += time.perf_counter() - started_at
+            if error:
+                raise RuntimeError(error)
+        game_rows, history_rows, new_size, new_wal_position = (
+            get_db_stats(stats_conn, game_ids)
+        )
+    finally:
+        dbms.delete_saved_games(game_ids)
+    return {
+        'save, ms': seconds / saves * 1000,
+        'game_data rows': game_rows,
+        'game_history rows': history_rows,
+        'tables, KiB': (new_size - size) / 1024,
+        'WAL, KiB': get_wal_bytes(
+            stats_conn, wal_position, new_wal_position
+        ) / 1024,
+    }
+
+
+def main(saves: int) -> None:
+    stats_conn: connection = connect()
+    try:
+        results: dict[str, dict[str, float]] = {
+            'overwrite': measure(stats_conn, saves, overwrite=True),
+            'insert': measure(stats_conn, saves, overwrite=False),
+        }
+    finally:
+        stats_conn.close()
+        dbms.close_db_connection()
+    print(f'{saves} saves of one session')
+    print(f'{"":<20}' + ''.join(f'{mode:>12}' for mode in results))
+    for metric in results['overwrite']:
+        print(f'{metric:<20}' + ''.join(
+            f'{result[metric]:>12.1f}' for result in results.values()
+        ))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Compare overwriting the saved game of a session '
+                    'with saving every save as a new game.'
+    )
+    parser.add_argument(
+        '--saves', type=int, default=1000,
+        help='how many times the session is saved'
+    )
+    main(parser.parse_args().saves)
@@ -0,0 +1,139 @@
+"""Measure how the game server copes with many connections.
+
+Thousands of idle connections are opened first, then a few clients
+play games as fast as they can, and the latency of every command is
+reported. All the clients play as the 'load-test' player. The server
+runs in this process in its own thread unless the address of
+a running one is given.
+
+python -m benchmarks.server_load [--idle 5000] [--active 50]
+    [--seconds 10] [--ansi] [--host 127.0.0.1 --port 7777]
+"""
+import argparse
+import asyncio
+import resource
+import statistics
+import threading
+import time
+
+from typing import Optional
+
+from app.server import END_OF_RESPONSE, GameServer
+
+PLAYER_NAME: str = 'load-test'
+# A new game of 3 rounds and back to the main menu from
+# the continue game panel.
+GAME_SCRIPT: tuple[str, ...] = ('1', '3', 'r', 'p', 's', 'qm')
+
+
+async def open_session(
+        host: str, port: int
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    reader, writer = await asyncio.open_connection(host, port)
+    await reader.readuntil(END_OF_RESPONSE)
+    writer.write(f'{PLAYER_NAME}\n'.encode())
+    await reader.readuntil(END_OF_RESPONSE)
+    return reader, writer
+
+
+async def play(host: str, port: int, deadline: float,
+               latencies: list[float], received: list[int]) -> None:
+    reader, writer = await open_session(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            for command in GAME_SCRIPT:
+                started_at: float = time.perf_counter()
+                writer.write(f'{command}\n'.encode())
+                response: bytes = await reader.readuntil(END_OF_RESPONSE)
+                latencies.append(time.perf_counter() - started_at)
+                received.append(len(response))
+    finally:
+        writer.close()
+
+
+async def run(host: str, port: int, idle: int, active: int,
+              seconds: float) -> None:
+    idle_sessions: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+    started_at: float = time.perf_counter()
+    # Not all at once, so the listen backlog doesn't overflow.
+    for first in range(0, idle, 500):
+        idle_sessions += await asyncio.gather(*(
+            open_session(host, port)
+            for _ in range(first, min(first + 500, idle))
+        ))
+    print(f'Opened {len(idle_sessions)} idle connections '
+          f'in {time.perf_counter() - started_at:.2f}s')
+
+    latencies: list[float] = []
+    received: list[int] = []
+    started_at = time.perf_counter()
+    await asyncio.gather(*(
+        play(host, port, started_at + seconds, latencies, received)
+        for _ in range(active)
+    ))
+    elapsed_seconds: float = time.perf_counter() - started_at
+    for _, writer in idle_sessions:
+        writer.close()
+
+    percentiles: list[float] = statistics.quantiles(latencies, n=100)
+    print(f'{active} active clients: {len(latencies)} commands in '
+          f'{elapsed_seconds:.2f}s '
+          f'({len(latencies) / elapsed_seconds:.0f} commands/s)')
+    print('latency, ms: '
+          f'p50 {percentiles[49] * 1000:.2f}, '
+          f'p90 {percentiles[89] * 1000:.2f}, '
+          f'p99 {percentiles[98] * 1000:.2f}, '
+          f'max {max(latencies) * 1000:.2f}')
+    print(f'{sum(received) / len(received):.0f} bytes per response')
+
+
+def start_server(ansi: bool) -> tuple[GameServer, int]:
+    """Run a game server on a free port in a background thread."""
+    game_server = GameServer(ansi)
+    ready = threading.Event()
+    port: Optional[int] = None
+
+    async def serve() -> None:
+        nonlocal port
+        server = await asyncio.start_server(
+            game_server.handle_connection, '127.0.0.1', 0, backlog=1024
+        )
+        port = server.sockets[0].getsockname()[1]
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    threading.Thread(
+        target=asyncio.run, args=(serve(),), name='game-server', daemon=True
+    ).start()
+    ready.wait()
+    assert port is not None
+    return game_server, port
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Open many connections to the game server '
+                    'and measure the latency of the active ones.'
+    )
+    parser.add_argument('--idle', type=int, default=5000)
+    parser.add_argument('--active', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument(
+        '--ansi', action='store_true',
+        help='send only the changed lines of the screen, '
+             'for the server that runs here'
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int)
+    args = parser.parse_args()
+
+    # Both ends of every connection are in this process
+    # if the server runs here as well.
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard_limit, hard_limit))
+
+    port: int = args.port
+    if port is None:
+        game_server, port = start_server(args.ansi)
+    asyncio.run(run(args.host, port, args.idle, args.active, args.seconds))
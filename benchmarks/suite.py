@@ -0,0 +1,346 @@
+"""Benchmark every layer of the game.
+
+- cache: the round and the game winner logic of 'GameCache'
+- router: 'ControllerRouter.route_user_input' on every panel, with
+  controller methods that do nothing (see 'router_dispatch.py')
+- view: the text panels and messages
+- postgres: save, restore, delete and list against the database the
+  game is configured with, as a separate 'benchmark' player, whose
+  games are removed before and after the run
+
+Every benchmark is run for a few warmup samples first, then for
+'--samples' samples of 'inner' calls each, with the garbage collector
+off and the same random seed. The time of one call is reported as
+percentiles over the samples. '--json' writes the results together
+with the commit and the Python version, '--compare' prints the change
+of the medians against such a file from another run.
+
+python -m benchmarks.suite [--only cache,router,view,postgres]
+    [--samples 30] [--warmup 3] [--json results.json]
+    [--compare old.json]
+"""
+import argparse
+import datetime
+import gc
+import itertools
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+
+from typing import Any, Callable, Optional
+
+from app.model.catalog import SavedGamesCatalog
+from app.model.model import GameCache
+from app.model.rules import game_rules
+from app.view.view import GameMessage, MainGamePanel
+from benchmarks.router_dispatch import PANEL_INPUTS, BenchRouter
+
+SEED: int = 1
+BENCHMARK_PLAYER: str = 'benchmark'
+PERCENTILES: tuple[int, ...] = (50, 90, 99)
+
+
+class Benchmark:
+    """One measured operation.
+
+    'run' is called 'inner' times per sample, 'setup' is called
+    before every call and isn't measured.
+    """
+
+    name: str
+    run: Callable[[], Any]
+    inner: int
+    setup: Optional[Callable[[], Any]]
+
+    def __init__(self, name: str, run: Callable[[], Any], inner: int = 1,
+                 setup: Optional[Callable[[], Any]] = None) -> None:
+        self.name = name
+        self.run = run
+        self.inner = inner
+        self.setup = setup
+
+    def sample(self) -> float:
+        """Return the time of one call in seconds."""
+        run: Callable[[], Any] = self.run
+        if self.setup is None:
+            started_at: float = time.perf_counter()
+            for _ in range(self.inner):
+                run()
+            return (time.perf_counter() - started_at) / self.inner
+        elapsed_seconds: float = 0
+        for _ in range(self.inner):
+            self.setup()
+            started_at = time.perf_counter()
+            run()
+            elapsed_seconds += time.perf_counter() - started_at
+        return elapsed_seconds / self.inner
+
+
+def get_cache_benchmarks() -> list[Benchmark]:
+    cache = GameCache()
+    cache.max_rounds_per_game = 9
+    cache.set_win_condition(9)
+    next_move = itertools.cycle(game_rules.moves).__next__
+    return [
+        Benchmark(
+            'cache.get_round_winner',
+            lambda: cache.get_round_winner(next_move()), inner=1000
+        ),
+        Benchmark(
+            'cache.check_shortcut_game_winner',
+            cache.check_shortcut_game_winner, inner=1000
+        ),
+    ]
+
+
+def get_router_benchmarks() -> list[Benchmark]:
+    benchmarks: list[Benchmark] = []
+    for panel, (router, user_inputs) in PANEL_INPUTS.items():
+        bench_router = BenchRouter(router)
+        next_input = itertools.cycle(user_inputs).__next__
+        benchmarks.append(Benchmark(
+            f'router.{panel.replace(" ", "_")}',
+            lambda bench_router=bench_router, next_input=next_input: (
+                bench_router.route_user_input(next_input())
+            ),
+            inner=1000
+        ))
+    return benchmarks
+
+
+def get_view_benchmarks() -> list[Benchmark]:
+    panel_renderer = MainGamePanel(game_rules)
+    message_renderer = GameMessage(game_rules)
+    round_stats: dict = {
+        'round': 4, 'user_choice': 'r', 'computer_choice': 's',
+        'rounds_won': 2, 'rounds_lost': 2, 'total_draws': 1,
+    }
+    next_games_won = itertools.count().__next__
+    saved_games = SavedGamesCatalog()
+    saved_games.load([
+        (f'00000000-0000-4000-8000-{game:012}', game % 3, game % 4)
+        for game in range(5)
+    ])
+    return [
+        Benchmark(
+            'view.ingame_panel.new',
+            lambda: panel_renderer.render_game_panel(
+                round_stats,
+                {'games_won': next_games_won(), 'games_lost': 2},
+                9, 2, 5, ''
+            ),
+            inner=1000
+        ),
+        Benchmark(
+            'view.ingame_panel.repeated',
+            lambda: panel_renderer.render_game_panel(
+                round_stats, {'games_won': 3, 'games_lost': 2}, 9, 2, 5, ''
+            ),
+            inner=1000
+        ),
+        Benchmark(
+            'view.continue_game_panel',
+            lambda: panel_renderer.render_continue_game_input_panel(
+                round_stats, 'user'
+            ),
+            inner=1000
+        ),
+        Benchmark(
+            'view.main_menu_panel',
+            panel_renderer.render_main_menu_panel, inner=1000
+        ),
+        Benchmark(
+            'view.saved_games_list',
+            lambda: message_renderer.inject_saved_games_list(
+                panel_renderer.render_main_menu_panel(), saved_games
+            ),
+            inner=1000
+        ),
+        Benchmark(
+            'view.error_message',
+            lambda: message_renderer.render_generic_error_message('x'),
+            inner=1000
+        ),
+    ]
+
+
+def get_postgres_benchmarks() -> tuple[list[Benchmark], Callable[[], None]]:
+    """Return the benchmarks and the function that removes
+    the games they have saved.
+    """
+    # The DB layer is imported here, the other
+    # benchmarks don't need the database.
+    from app.model.constants import SHARD_DSNS
+    from app.model.db_config import connect
+    from app.model.model import Postgres, ShardedPostgres, game_cache
+
+    dbms: Postgres = (
+        ShardedPostgres(SHARD_DSNS, BENCHMARK_PLAYER) if SHARD_DSNS
+        else Postgres(connect, BENCHMARK_PLAYER)
+    )
+
+    def delete_all_games() -> None:
+        game_ids: list[str] = [
+            game_id for game_id, _, _ in dbms.get_saved_games_data()
+        ]
+        if game_ids:
+            dbms.delete_saved_games(game_ids)
+        game_cache.set_session_state(None)
+
+    def save_new_game() -> None:
+        game_cache.set_session_state(None)
+        game_cache.max_rounds_per_game = 9
+        game_cache.set_win_condition(9)
+        dbms.save_game_data()
+
+    delete_all_games()
+    save_new_game()
+    game_id: str = game_cache.session_game_id
+    return [
+        Benchmark('postgres.save', dbms.save_game_data),
+        Benchmark(
+            'postgres.restore',
+            lambda: dbms.restore_saved_game_session(game_id)
+        ),
+        Benchmark('postgres.list', dbms.get_saved_games_data),
+        Benchmark(
+            'postgres.delete',
+            lambda: dbms.delete_saved_games([game_cache.session_game_id]),
+            setup=save_new_game
+        ),
+    ], delete_all_games
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Return the percentile with linear interpolation."""
+    position: float = (len(sorted_values) - 1) * percent / 100
+    lower: int = int(position)
+    upper: int = min(lower + 1, len(sorted_values) - 1)
+    return (
+        sorted_values[lower]
+        + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+    )
+
+
+def run_benchmark(benchmark: Benchmark, samples: int,
+                  warmup: int) -> dict[str, Any]:
+    random.seed(SEED)
+    for _ in range(warmup):
+        benchmark.sample()
+    gc.collect()
+    gc.disable()
+    try:
+        times: list[float] = sorted(
+            benchmark.sample() for _ in range(samples)
+        )
+    finally:
+        gc.enable()
+    result: dict[str, Any] = {
+        'name': benchmark.name,
+        'samples': samples,
+        'inner': benchmark.inner,
+        'mean_ns': statistics.fmean(times) * 1e9,
+        'stdev_ns': statistics.stdev(times) * 1e9 if samples > 1 else 0.0,
+        'min_ns': times[0] * 1e9,
+        'max_ns': times[-1] * 1e9,
+    }
+    for percent in PERCENTILES:
+        result[f'p{percent}_ns'] = percentile(times, percent) * 1e9
+    return result
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def print_results(results: list[dict[str, Any]],
+                  baseline: dict[str, dict[str, Any]]) -> None:
+    header: str = f'{"benchmark":<36}' + ''.join(
+        f'{f"p{percent}, us":>12}' for percent in PERCENTILES
+    )
+    print(header + (f'{"p50 change":>12}' if baseline else ''))
+    for result in results:
+        line: str = f'{result["name"]:<36}' + ''.join(
+            f'{result[f"p{percent}_ns"] / 1000:>12.3f}'
+            for percent in PERCENTILES
+        )
+        if result['name'] in baseline:
+            old_p50: float = baseline[result['name']]['p50_ns']
+            line += f'{(result["p50_ns"] / old_p50 - 1) * 100:>+11.1f}%'
+        print(line)
+
+
+def main(layers: list[str], samples: int, warmup: int,
+         json_path: Optional[str], compare_path: Optional[str]) -> None:
+    benchmarks: list[Benchmark] = []
+    cleanup: Optional[Callable[[], None]] = None
+    if 'cache' in layers:
+        benchmarks += get_cache_benchmarks()
+    if 'router' in layers:
+        benchmarks += get_router_benchmarks()
+    if 'view' in layers:
+        benchmarks += get_view_benchmarks()
+    if 'postgres' in layers:
+        postgres_benchmarks, cleanup = get_postgres_benchmarks()
+        benchmarks += postgres_benchmarks
+    try:
+        results: list[dict[str, Any]] = [
+            run_benchmark(benchmark, samples, warmup)
+            for benchmark in benchmarks
+        ]
+    finally:
+        if cleanup is not None:
+            cleanup()
+
+    baseline: dict[str, dict[str, Any]] = {}
+    if compare_path:
+        with open(compare_path) as compare_file:
+            baseline = {
+                result['name']: result
+                for result in json.load(compare_file)['results']
+            }
+    print_results(results, baseline)
+    if json_path:
+        with open(json_path, 'w') as json_file:
+            json.dump({
+                'commit': get_commit(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'created_at': datetime.datetime.now(
+                    datetime.timezone.utc
+                ).isoformat(),
+                'samples': samples,
+                'warmup': warmup,
+                'seed': SEED,
+                'results': results,
+            }, json_file, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark the cache, the routers, the view '
+                    'and the DB layer of the game.'
+    )
+    parser.add_argument(
+        '--only', default='cache,router,view,postgres',
+        help='a comma separated list of the layers to benchmark'
+    )
+    parser.add_argument('--samples', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument(
+        '--compare', help='compare the medians with the results '
+                          'of another run written with --json'
+    )
+    args = parser.parse_args()
+    main(args.only.split(','), args.samples, args.warmup,
+         args.json, args.compare)
@@ -0,0 +1,94 @@
+"""Compare the text view with the JSON lines view.
+
+A game of 9 rounds is rendered with both views: the size of
+the ingame panel per round and the time it takes to render it.
+The game stats are different in every game, so the memoized text
+panels don't help here, and a bot also has to parse what it gets,
+so parsing is measured as well: a regex for the text panel, the
+way bots scrape it, and 'json.loads' for the JSON line.
+
+python -m benchmarks.view_formats [--games 20000]
+"""
+import argparse
+import itertools
+import json
+import re
+import time
+
+from typing import Callable
+
+from app.model.rules import game_rules
+from app.view.view import JsonGamePanel, MainGamePanel, Panel
+
+MAX_ROUNDS_PER_GAME: int = 9
+ROUNDS: list[dict] = [
+    {
+        'round': round_,
+        'user_choice': 'rps'[round_ % 3],
+        'computer_choice': 'psr'[round_ % 3],
+        'rounds_won': round_ // 2,
+        'rounds_lost': round_ - round_ // 2,
+        'total_draws': round_ // 3,
+    }
+    for round_ in range(1, MAX_ROUNDS_PER_GAME + 1)
+]
+TEXT_PANEL_PATTERN: re.Pattern[str] = re.compile(
+    r'won (\d+), lost (\d+)\nRound: (\d+)/(\d+).*?'
+    r'Your choice: \[ (.+?) \], PC choice: \[ (.+?) \]\n'
+    r'Rounds won: (\d+), Rounds lost: (\d+), Total draws: (\d+).*?'
+    r'saved games -> (\d+)/(\d+)',
+    re.DOTALL
+)
+
+
+def render_games(panel_renderer: Panel, games: int) -> list[str]:
+    next_games_won = itertools.count().__next__
+    return [
+        panel_renderer.render_game_panel(
+            round_stats,
+            {'games_won': next_games_won(), 'games_lost': 2},
+            MAX_ROUNDS_PER_GAME, 2, 5, ''
+        )
+        for _ in range(games)
+        for round_stats in ROUNDS
+    ]
+
+
+def measure(action: Callable[[], object]) -> float:
+    started_at: float = time.perf_counter()
+    action()
+    return time.perf_counter() - started_at
+
+
+def main(games: int) -> None:
+    rounds: int = games * MAX_ROUNDS_PER_GAME
+    print(f'{"view":<6}{"bytes/round":>13}{"render, ns":>12}'
+          f'{"parse, ns":>11}')
+    for view, panel_renderer, parse in (
+            ('text', MainGamePanel(game_rules), TEXT_PANEL_PATTERN.search),
+            ('json', JsonGamePanel(game_rules), json.loads)):
+        panels: list[str] = render_games(panel_renderer, games)
+        size: int = sum(len(panel.encode()) for panel in panels)
+        render_seconds: float = min(
+            measure(lambda: render_games(panel_renderer, games))
+            for _ in range(3)
+        )
+        parse_seconds: float = min(
+            measure(lambda: [parse(panel) for panel in panels])
+            for _ in range(3)
+        )
+        print(f'{view:<6}{size / rounds:>13.0f}'
+              f'{render_seconds / rounds * 1e9:>12.0f}'
+              f'{parse_seconds / rounds * 1e9:>11.0f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Compare the size and the cost of the text '
+                    'and the JSON lines views.'
+    )
+    parser.add_argument(
+        '--games', type=int, default=20_000,
+        help='how many games of 9 rounds are rendered'
+    )
+    main(parser.parse_args().games)
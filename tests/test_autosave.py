@@ -0,0 +1,68 @@
+import threading
+
+from app.model.autosave import BackgroundAutosaver
+
+
+def test_autosave_every_n_rounds():
+    autosaver = BackgroundAutosaver(lambda game_data: None, 2, 0)
+    assert not autosaver.has_unsaved_changes
+    assert not autosaver.round_played()
+    assert autosaver.round_played()
+    autosaver.save({'game_id': 'a'})
+    assert not autosaver.has_unsaved_changes
+    autosaver.close()
+
+
+def test_failed_write_does_not_stop_the_writer():
+    written: list[str] = []
+
+    def write(game_data: dict) -> None:
+        written.append(game_data['game_id'])
+        if len(written) == 1:
+            raise RuntimeError('the connection is closed')
+
+    autosaver = BackgroundAutosaver(write, 1, 0)
+    autosaver.save({'game_id': 'a'})
+    autosaver.flush()
+    autosaver.save({'game_id': 'b'})
+    autosaver.flush()
+    autosaver.close()
+    assert written == ['a', 'b']
+
+
+def test_sessions_count_their_own_rounds():
+    autosaver = BackgroundAutosaver(lambda game_data: None, 2, 0)
+    autosaver.round_played()
+    first_session: dict = autosaver.get_session_state()
+    autosaver.set_session_state(None)
+    assert not autosaver.has_unsaved_changes
+    assert not autosaver.round_played()
+    autosaver.set_session_state(first_session)
+    assert autosaver.round_played()
+    autosaver.close()
+
+
+def test_pending_autosaves_of_other_games_are_kept():
+    written: list[dict] = []
+    writing = threading.Event()
+    resume_writing = threading.Event()
+
+    def write(game_data: dict) -> None:
+        written.append(game_data)
+        writing.set()
+        resume_writing.wait()
+
+    autosaver = BackgroundAutosaver(write, 1, 0)
+    autosaver.save({'game_id': 'a', 'round': 1})
+    # The others are pending while the first autosave is written.
+    writing.wait()
+    autosaver.save({'game_id': 'b', 'round': 1})
+    autosaver.save({'game_id': 'c', 'round': 1})
+    autosaver.save({'game_id': 'b', 'round': 2})
+    resume_writing.set()
+    autosaver.close()
+    assert written == [
+        {'game_id': 'a', 'round': 1},
+        {'game_id': 'b', 'round': 2},
+        {'game_id': 'c', 'round': 1},
+    ]
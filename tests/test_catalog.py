@@ -0,0 +1,55 @@
+from app.model.catalog import SavedGamesCatalog
+from app.model.custom_dtypes import GameId, SavedGame
+
+
+def make_saved_game(game_id: str, games_lost: int = 0,
+                    games_won: int = 0) -> SavedGame:
+    return (GameId(game_id), games_lost, games_won)
+
+
+def test_new_catalog_is_empty_and_not_loaded():
+    catalog = SavedGamesCatalog()
+    assert len(catalog) == 0
+    assert not catalog.is_loaded
+    assert catalog.version == 0
+
+
+def test_load_replaces_games_and_bumps_version():
+    catalog = SavedGamesCatalog()
+    catalog.add(make_saved_game('a'))
+    catalog.load([make_saved_game('b'), make_saved_game('c')])
+    assert catalog.is_loaded
+    assert catalog.version == 2
+    assert 'a' not in catalog
+    assert [game_id for game_id, _, _ in catalog] == ['b', 'c']
+
+
+def test_add_replaces_game_with_same_id_in_place():
+    catalog = SavedGamesCatalog()
+    catalog.add(make_saved_game('a'))
+    catalog.add(make_saved_game('b'))
+    catalog.add(make_saved_game('a', games_won=1))
+    assert catalog.version == 3
+    assert catalog.to_list() == [
+        make_saved_game('a', games_won=1), make_saved_game('b')
+    ]
+    assert catalog.get(GameId('a')) == make_saved_game('a', games_won=1)
+
+
+def test_remove_returns_removed_ids_and_bumps_version_once():
+    catalog = SavedGamesCatalog()
+    catalog.load([make_saved_game('a'), make_saved_game('b')])
+    version: int = catalog.version
+    assert catalog.remove([GameId('a'), GameId('x'), GameId('b')]) == [
+        'a', 'b'
+    ]
+    assert catalog.version == version + 1
+    assert len(catalog) == 0
+
+
+def test_remove_of_unknown_ids_keeps_version():
+    catalog = SavedGamesCatalog()
+    catalog.load([make_saved_game('a')])
+    version: int = catalog.version
+    assert catalog.remove([GameId('x')]) == []
+    assert catalog.version == version
@@ -0,0 +1,56 @@
+from app.model.catalog import SavedGamesCatalog
+from app.model.custom_dtypes import GameId
+from app.model.model import GameCache
+from app.model.players import is_valid_player_name
+from app.model.rules import game_rules
+from app.view.view import GameMessage
+
+
+def test_player_names():
+    assert is_valid_player_name('alice')
+    assert not is_valid_player_name('')
+    assert not is_valid_player_name('a' * 33)
+    assert not is_valid_player_name('alice\x1b[2J')
+
+
+def test_changes_go_to_the_games_of_their_player():
+    cache = GameCache()
+    cache.use_player('alice')
+    cache.saved_games.load([])
+    cache.use_player('bob')
+    cache.saved_games.load([])
+    cache.queue_saved_game('alice', (GameId('a'), 0, 1), True)
+    # Nobody has played as 'carol' yet, so the change is skipped.
+    cache.queue_saved_game('carol', (GameId('c'), 0, 1), True)
+    assert cache.saved_games_count == 0
+    cache.use_player('alice')
+    assert cache.saved_games.to_list() == [('a', 0, 1)]
+    cache.queue_deleted_saved_games('bob', ['a'])
+    assert cache.saved_games_count == 1
+    cache.queue_deleted_saved_games('alice', ['a'])
+    assert cache.saved_games_count == 0
+
+
+def test_saved_games_list_of_another_player_is_rendered():
+    message_renderer = GameMessage(game_rules)
+    alice_games = SavedGamesCatalog()
+    alice_games.load([(GameId('a'), 0, 1)])
+    bob_games = SavedGamesCatalog()
+    bob_games.load([(GameId('b'), 2, 3)])
+    assert alice_games.version == bob_games.version
+    assert '[ a ]' in message_renderer.render_saved_games_list(alice_games)
+    assert '[ b ]' in message_renderer.render_saved_games_list(bob_games)
+
+
+def test_saved_games_lists_of_all_players_stay_rendered():
+    message_renderer = GameMessage(game_rules)
+    alice_games = SavedGamesCatalog()
+    alice_games.load([(GameId('a'), 0, 1)])
+    bob_games = SavedGamesCatalog()
+    bob_games.load([(GameId('b'), 2, 3)])
+    alice_list: str = message_renderer.render_saved_games_list(alice_games)
+    message_renderer.render_saved_games_list(bob_games)
+    # Bob's list doesn't push Alice's one out.
+    assert message_renderer.render_saved_games_list(alice_games) is alice_list
+    alice_games.add((GameId('c'), 4, 5))
+    assert '[ c ]' in message_renderer.render_saved_games_list(alice_games)
@@ -0,0 +1,70 @@
+import random
+import re
+
+import pytest
+
+from app.model.enums import RoundOutcome as RO
+from app.model.rules import GameRules, get_game_rules
+
+
+@pytest.mark.parametrize('variant', ['classic', 'rpsls', 'cyclic-7'])
+def test_outcome_matrix_is_fair(variant):
+    rules = get_game_rules(variant)
+    n_moves: int = len(rules.moves)
+    for user_idx, row in enumerate(rules.outcome_matrix):
+        assert row[user_idx] == RO.DRAW.value
+        assert row.count(RO.WON.value) == (n_moves - 1) // 2
+        assert row.count(RO.LOST.value) == (n_moves - 1) // 2
+        for computer_idx, outcome in enumerate(row):
+            opposite: str = rules.outcome_matrix[computer_idx][user_idx]
+            if outcome == RO.WON.value:
+                assert opposite == RO.LOST.value
+
+
+def test_classic_rules():
+    rules = get_game_rules('classic')
+    assert rules.moves == ('r', 'p', 's')
+    assert rules.resolve_round('r', 's') == RO.WON.value
+    assert rules.resolve_round('r', 'p') == RO.LOST.value
+    assert rules.resolve_round('p', 'p') == RO.DRAW.value
+    assert rules.get_beaten_moves('p') == ['r']
+
+
+def test_rpsls_rules():
+    rules = get_game_rules('rpsls')
+    assert rules.move_names['k'] == 'Spock'
+    assert sorted(rules.get_beaten_moves('k')) == ['r', 's']
+    assert sorted(rules.get_beaten_moves('l')) == ['k', 'p']
+
+
+def test_cyclic_variant_input_pattern_prefers_longer_moves():
+    rules = get_game_rules('cyclic-11')
+    assert rules.moves[-1] == '11'
+    assert rules.move_names['3'] == 'weapon 3'
+    assert re.match(rules.input_pattern, '11').group() == '11'
+
+
+@pytest.mark.parametrize('variant', ['cyclic-4', 'cyclic-1', 'lizard'])
+def test_invalid_variants_are_rejected(variant):
+    with pytest.raises(ValueError):
+        get_game_rules(variant)
+
+
+def test_even_number_of_moves_is_rejected():
+    with pytest.raises(ValueError):
+        GameRules('even', (('a', 'a'), ('b', 'b'), ('c', 'c'), ('d', 'd')))
+
+
+def test_names_that_dont_fit_into_snapshots_are_rejected():
+    with pytest.raises(ValueError):
+        GameRules('a' * 17, (('a', 'a'), ('b', 'b'), ('c', 'c')))
+    with pytest.raises(ValueError):
+        GameRules('long', (('a' * 9, 'a'), ('b', 'b'), ('c', 'c')))
+
+
+def test_random_rounds_are_counted():
+    counts = get_game_rules('rpsls').play_random_rounds(
+        1000, random.Random(0)
+    )
+    assert sum(counts.values()) == 1000
+    assert set(counts) == {outcome.value for outcome in RO}
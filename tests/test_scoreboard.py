@@ -0,0 +1,27 @@
+import uuid
+
+from app.model.enums import RoundOutcome as RO
+from app.model.rules import get_game_rules
+from app.model.scoreboard import SharedScoreboard
+
+
+def test_scoreboard_counts_every_move_of_a_big_game():
+    moves: list[str] = list(get_game_rules('cyclic-21').moves)
+    name: str = f'rps_test_{uuid.uuid4().hex[:8]}'
+    scoreboard = SharedScoreboard(name, moves, n_slots=2)
+    monitor = SharedScoreboard(name, claim_slot=False)
+    try:
+        scoreboard.record_round(RO.WON.value, '21', '1')
+        scoreboard.record_round(RO.DRAW.value, '21', '21')
+        scoreboard.record_game(True)
+        totals = monitor.get_totals()
+        assert totals['rounds'] == 2
+        assert totals['games_won'] == 1
+        assert totals['user_moves']['21'] == 2
+        assert totals['computer_moves'] == {
+            move: int(move in ('1', '21')) for move in moves
+        }
+    finally:
+        monitor.close()
+        scoreboard.close()
+        scoreboard.unlink()
@@ -0,0 +1,17 @@
+from app.controller.enums import MainMenuPanelChoice
+from app.session import GameSession
+
+
+def test_quitting_returns_the_good_bye_message():
+    session = GameSession()
+    session.resume()
+    try:
+        _, quit_game = session.respond(None)
+        assert not quit_game
+        response, quit_game = session.respond(
+            MainMenuPanelChoice.QUIT_GAME.value
+        )
+    finally:
+        session.suspend()
+    assert quit_game
+    assert 'Good bye!' in response
@@ -0,0 +1,142 @@
+import os
+import uuid
+
+import psycopg2
+import pytest
+
+from app.model.schema import create_schema
+from app.model.sharding import HashRing, reshard
+
+# Semicolon separated DSNs of at least two scratch databases.
+TEST_SHARD_DSNS: list[str] = [
+    dsn.strip()
+    for dsn in os.environ.get('RPS_TEST_SHARD_DSNS', '').split(';')
+    if dsn.strip()
+]
+GAME_IDS: list[str] = [str(uuid.UUID(int=idx * 7919)) for idx in range(1000)]
+
+
+def test_hash_is_stable():
+    # The hash must not depend on the process, e.g. on PYTHONHASHSEED.
+    assert HashRing.get_hash('game') == 6413123116545169195
+    assert [HashRing(3).get_shard(game_id) for game_id in GAME_IDS] == [
+        HashRing(3).get_shard(game_id) for game_id in GAME_IDS
+    ]
+
+
+def test_single_shard_owns_every_game():
+    ring = HashRing(1)
+    assert {ring.get_shard(game_id) for game_id in GAME_IDS} == {0}
+
+
+def test_games_are_spread_over_all_shards():
+    ring = HashRing(4)
+    counts: list[int] = [0] * 4
+    for game_id in GAME_IDS:
+        counts[ring.get_shard(game_id)] += 1
+    assert min(counts) > len(GAME_IDS) / 4 / 2
+
+
+def test_adding_a_shard_moves_games_only_to_it():
+    old_ring, new_ring = HashRing(3), HashRing(4)
+    moved_games_count: int = 0
+    for game_id in GAME_IDS:
+        old_shard: int = old_ring.get_shard(game_id)
+        new_shard: int = new_ring.get_shard(game_id)
+        if old_shard != new_shard:
+            assert new_shard == 3
+            moved_games_count += 1
+    # About a quarter of the games.
+    assert len(GAME_IDS) / 8 < moved_games_count < len(GAME_IDS) / 2
+
+
+@pytest.mark.skipif(
+    len(TEST_SHARD_DSNS) < 2, reason='RPS_TEST_SHARD_DSNS is not set'
+)
+def test_reshard_moves_games_with_their_history():
+    game_ids: list[str] = [str(uuid.uuid4()) for _ in range(50)]
+    conns = [psycopg2.connect(dsn=dsn) for dsn in TEST_SHARD_DSNS]
+    try:
+        for conn in conns:
+            create_schema(conn)
+            conn.commit()
+        with conns[0].cursor() as cur:
+            for game_id in game_ids:
+                cur.execute(
+                    """INSERT INTO game_data (game_id, games_won, games_lost,
+                    max_rounds_per_game, snapshot) VALUES (%s, 1, 2, 3, '')""",
+                    (game_id,)
+                )
+                cur.execute(
+                    """INSERT INTO game_history (game_id, version, keyframe,
+                    data) VALUES (%s, 0, true, '')""",
+                    (game_id,)
+                )
+        conns[0].commit()
+
+        reshard(TEST_SHARD_DSNS[:1], TEST_SHARD_DSNS, batch_size=7)
+
+        ring = HashRing(len(TEST_SHARD_DSNS))
+        for shard, conn in enumerate(conns):
+            with conn.cursor() as cur:
+                cur.execute(
+                    """SELECT game_id::text, count(game_history.version)
+                    FROM game_data
+                    JOIN game_history USING (game_id)
+                    WHERE game_id = ANY(%s::uuid[]) GROUP BY game_id""",
+                    (game_ids,)
+                )
+                rows: list[tuple] = cur.fetchall()
+            conn.commit()
+            assert sorted(rows) == sorted(
+                (game_id, 1) for game_id in game_ids
+                if ring.get_shard(game_id) == shard
+            )
+    finally:
+        for conn in conns:
+            with conn.cursor() as cur:
+                cur.execute(
+                    'DELETE FROM game_data WHERE game_id = ANY(%s::uuid[])',
+                    (game_ids,)
+                )
+            conn.commit()
+            conn.close()
+
+
+@pytest.mark.skipif(
+    len(TEST_SHARD_DSNS) < 2, reason='RPS_TEST_SHARD_DSNS is not set'
+)
+def test_reshard_copies_the_players_to_the_new_shards():
+    player_id: str = str(uuid.uuid4())
+    conns = [psycopg2.connect(dsn=dsn) for dsn in TEST_SHARD_DSNS]
+    try:
+        for conn in conns:
+            create_schema(conn)
+            conn.commit()
+        with conns[0].cursor() as cur:
+            cur.execute(
+                """INSERT INTO players (player_id, name, max_saved_games)
+                VALUES (%s, 'reshard-test', 7)""",
+                (player_id,)
+            )
+        conns[0].commit()
+
+        reshard(TEST_SHARD_DSNS[:1], TEST_SHARD_DSNS)
+
+        for conn in conns:
+            with conn.cursor() as cur:
+                cur.execute(
+                    'SELECT max_saved_games FROM players '
+                    'WHERE player_id = %s',
+                    (player_id,)
+                )
+                assert cur.fetchone() == (7,)
+            conn.commit()
+    finally:
+        for conn in conns:
+            with conn.cursor() as cur:
+                cur.execute(
+                    'DELETE FROM players WHERE player_id = %s', (player_id,)
+                )
+            conn.commit()
+            conn.close()
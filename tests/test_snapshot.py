@@ -0,0 +1,103 @@
+import uuid
+
+import pytest
+
+from app.model.snapshot import (
+    SavePoints,
+    apply_delta,
+    pack_delta,
+    pack_snapshot,
+    unpack_snapshot
+)
+
+
+def make_state(**changes) -> dict:
+    return {
+        'game_id': str(uuid.UUID(int=1)),
+        'variant': 'rpsls',
+        'max_rounds_per_game': 5,
+        'games_won': 2,
+        'games_lost': 1,
+        'round': 3,
+        'rounds_won': 2,
+        'rounds_lost': 1,
+        'total_draws': 4,
+        'user_choice': 'k',
+        'computer_choice': 'r',
+        'current_game_winner': '',
+    } | changes
+
+
+def test_snapshot_round_trip():
+    state = make_state()
+    assert unpack_snapshot(pack_snapshot(state)) == state
+
+
+def test_snapshot_of_a_game_without_id_and_choices():
+    state = make_state(game_id='', user_choice='', computer_choice='',
+                       current_game_winner='computer')
+    assert unpack_snapshot(pack_snapshot(state)) == state
+
+
+def test_delta_of_a_round_is_small():
+    old_snapshot: bytes = pack_snapshot(make_state())
+    new_snapshot: bytes = pack_snapshot(make_state(
+        round=4, rounds_won=3, user_choice='p'
+    ))
+    delta: bytes = pack_delta(old_snapshot, new_snapshot)
+    assert len(delta) < len(new_snapshot) // 4
+    assert apply_delta(old_snapshot, delta) == new_snapshot
+
+
+def test_empty_delta():
+    snapshot: bytes = pack_snapshot(make_state())
+    delta: bytes = pack_delta(snapshot, snapshot)
+    assert delta == b'\0'
+    assert apply_delta(snapshot, delta) == snapshot
+
+
+def test_delta_of_every_field_and_large_numbers():
+    old_snapshot: bytes = pack_snapshot(make_state())
+    new_snapshot: bytes = pack_snapshot(make_state(
+        max_rounds_per_game=9, games_won=60000, games_lost=300, round=0,
+        rounds_won=0, rounds_lost=0, total_draws=128, user_choice='',
+        computer_choice='l', current_game_winner='user'
+    ))
+    delta: bytes = pack_delta(old_snapshot, new_snapshot)
+    assert apply_delta(old_snapshot, delta) == new_snapshot
+
+
+def test_chained_deltas():
+    snapshots: list[bytes] = [
+        pack_snapshot(make_state(round=round_, rounds_won=round_))
+        for round_ in range(5)
+    ]
+    snapshot: bytes = snapshots[0]
+    for old_snapshot, new_snapshot in zip(snapshots, snapshots[1:]):
+        snapshot = apply_delta(snapshot, pack_delta(old_snapshot, new_snapshot))
+    assert snapshot == snapshots[-1]
+
+
+def test_save_points_keep_the_latest_save_of_every_game():
+    save_points = SavePoints(max_games=2)
+    save_points.put('a', 0, b'a0')
+    save_points.put('b', 0, b'b0')
+    save_points.put('a', 1, b'a1')
+    assert save_points.get('a') == (1, b'a1')
+    # 'b' is the least recently saved game.
+    save_points.put('c', 0, b'c0')
+    assert save_points.get('b') is None
+    assert save_points.get('a') == (1, b'a1')
+    save_points.discard(['a', 'x'])
+    assert save_points.get('a') is None
+    assert save_points.get('c') == (0, b'c0')
+
+
+@pytest.mark.parametrize('changes', [
+    {'variant': 'cyclic-' + '1' * 10},
+    {'user_choice': '123456789'},
+    {'computer_choice': 'ü' * 5},
+])
+def test_fields_that_dont_fit_are_rejected(changes):
+    with pytest.raises(ValueError):
+        pack_snapshot(make_state(**changes))
@@ -0,0 +1,57 @@
+from app.view.terminal import (
+    CLEAR_TO_END_OF_LINE,
+    CLEAR_TO_END_OF_SCREEN,
+    CURSOR_HOME_AND_CLEAR_SCREEN,
+    DiffRenderer,
+    move_cursor
+)
+
+SCREEN_ROWS: int = 24
+
+
+def test_move_cursor_is_one_based():
+    assert move_cursor(0, 0) == '\x1b[1;1H'
+    assert move_cursor(2, 9) == '\x1b[3;10H'
+
+
+def test_first_frame_is_written_in_full():
+    renderer = DiffRenderer()
+    assert renderer.render('a\nb', SCREEN_ROWS) == (
+        CURSOR_HOME_AND_CLEAR_SCREEN + 'a\r\nb'
+    )
+
+
+def test_only_changed_lines_are_written_from_first_changed_char():
+    renderer = DiffRenderer()
+    renderer.render('Round: 1/3\nstatic\nType here: ', SCREEN_ROWS)
+    assert renderer.render(
+        'Round: 2/3\nstatic\nType here: ', SCREEN_ROWS
+    ) == (
+        move_cursor(0, 7) + '2/3' + CLEAR_TO_END_OF_LINE
+        # The prompt line is always cleared, the input is typed there.
+        + move_cursor(2, 11) + CLEAR_TO_END_OF_LINE
+        + move_cursor(3, 0) + CLEAR_TO_END_OF_SCREEN
+        + move_cursor(2, 11)
+    )
+
+
+def test_shorter_frame_clears_the_rest_of_the_screen():
+    renderer = DiffRenderer()
+    renderer.render('a\nb\nc', SCREEN_ROWS)
+    assert renderer.render('a\nb', SCREEN_ROWS) == (
+        move_cursor(2, 0) + CLEAR_TO_END_OF_SCREEN
+        + move_cursor(1, 1)
+    )
+
+
+def test_frames_that_scroll_the_screen_are_written_in_full():
+    renderer = DiffRenderer()
+    tall_frame: str = '\n'.join(['x'] * SCREEN_ROWS)
+    renderer.render('a', SCREEN_ROWS)
+    assert renderer.render(tall_frame, SCREEN_ROWS).startswith(
+        CURSOR_HOME_AND_CLEAR_SCREEN
+    )
+    # The screen has scrolled, so the next frame is written in full too.
+    assert renderer.render('a', SCREEN_ROWS) == (
+        CURSOR_HOME_AND_CLEAR_SCREEN + 'a'
+    )
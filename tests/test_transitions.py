@@ -0,0 +1,41 @@
+from app.controller.enums import GameEvent as GE
+from app.router.enums import GamePanel as GP
+from app.router.transitions import TRANSITIONS
+
+
+def test_transitions_lead_to_known_panels():
+    panels: set[str] = {panel.value for panel in GP}
+    for (panel, event), next_panel in TRANSITIONS.items():
+        assert panel in panels
+        assert isinstance(event, GE)
+        assert next_panel in panels
+
+
+def test_every_panel_but_the_main_menu_leads_back_to_it():
+    for panel in GP:
+        if panel is GP.MAIN_MENU_PANEL:
+            continue
+        assert TRANSITIONS[(panel.value, GE.QUIT_TO_MAIN_MENU)] == (
+            GP.MAIN_MENU_PANEL.value
+        )
+
+
+def test_every_panel_is_reachable_from_the_main_menu():
+    reachable: set[str] = {GP.MAIN_MENU_PANEL.value}
+    while True:
+        next_panels: set[str] = {
+            next_panel for (panel, _), next_panel in TRANSITIONS.items()
+            if panel in reachable
+        }
+        if next_panels <= reachable:
+            break
+        reachable |= next_panels
+    assert reachable == {panel.value for panel in GP}
+
+
+def test_game_flow():
+    panel: str = GP.MAIN_MENU_PANEL.value
+    for event in (GE.START_NEW_GAME, GE.ROUNDS_SET, GE.GAME_OVER,
+                  GE.PLAY_AGAIN):
+        panel = TRANSITIONS[(panel, event)]
+    assert panel == GP.ROUND_AMOUNT_PANEL.value